@@ -0,0 +1,146 @@
+"""
+Backfills a synthetic universe through AsyncDataFetcher against a stubbed IBroker client.
+
+The stub answers reqHistoricalDataAsync with business-day bars after a fixed latency, so the
+benchmark measures the pipeline and its pacing, not the network. The serial estimate is what the
+one-connection-per-symbol DataFetcher loop would need: one round trip plus a 2 second sleep per chunk.
+A first check answers some chunks with no bars and verifies they are not marked as covered; a
+second times the requests for one contract and verifies no 2-second window holds 6 of them.
+
+Run from the repository root:
+    python -m Benchmarks.bench_async_fetcher
+"""
+import asyncio
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytz
+
+from Data.async_fetcher import AsyncDataFetcher
+from Data.coverage_index import CoverageIndex
+from Data.price_store import ColumnarPriceStore
+
+
+@dataclass
+class StubBar:
+    date: object
+    close: float
+
+
+class StubIB:
+    """
+    Minimal stand-in for ib_insync.IB that serves synthetic daily bars.
+    """
+
+    def __init__(self, latency=0.3, empty_every=None):
+        """
+        :param empty_every: Answer every n-th request with no bars, like a failed or timed-out request.
+        """
+        self.latency = latency
+        self.empty_every = empty_every
+        self.requests = 0
+        self.issue_times = defaultdict(list)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def isConnected(self):
+        return True
+
+    def disconnect(self):
+        pass
+
+    async def reqHistoricalDataAsync(self, contract, endDateTime, durationStr, barSizeSetting, **kwargs):
+        self.requests += 1
+        request = self.requests
+        self.issue_times[contract.symbol].append(asyncio.get_running_loop().time())
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        if self.empty_every and request % self.empty_every == 0:
+            return []
+
+        end = datetime.strptime(endDateTime, "%Y%m%d %H:%M:%S")
+        days = int(durationStr.split()[0])
+        dates = pd.bdate_range(end - timedelta(days=days), end)
+        return [StubBar(d.date(), 100 + d.toordinal() % 50) for d in dates]
+
+
+def check_coverage(start_date, end_date, n_symbols=4):
+    """
+    Empty chunks must stay uncovered: covered spans hold every bar, and a second run fetches the rest.
+    """
+    symbols = [f"SYM{i}" for i in range(n_symbols)]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = ColumnarPriceStore(tmp_dir)
+        coverage = CoverageIndex(f"{tmp_dir}/coverage.json")
+        AsyncDataFetcher(ib=StubIB(0.0, empty_every=3)).fetch_incremental_many(symbols, start_date, end_date,
+                                                                               store, coverage)
+        expected = pd.bdate_range(start_date.date(), end_date.date(), tz='America/New_York')
+        expected = expected[(expected >= start_date) & (expected <= end_date)]
+        for symbol in symbols:
+            assert coverage.missing(symbol, '1 day', start_date, end_date), symbol
+            stored = store.load(symbol, '1 day').index
+            for span_start, span_end in coverage.spans(symbol, '1 day'):
+                in_span = expected[(expected >= span_start) & (expected <= span_end)]
+                assert in_span.isin(stored).all(), (symbol, span_start, span_end)
+
+        data = AsyncDataFetcher(ib=StubIB(0.0)).fetch_incremental_many(symbols, start_date, end_date, store,
+                                                                       coverage)
+        for symbol in symbols:
+            assert data[symbol].index.equals(expected), symbol
+            # Only the edges before the first and after the last bar, which hold no bars, stay missing
+            for gap_start, gap_end in coverage.missing(symbol, '1 day', start_date, end_date):
+                assert not ((expected > gap_start) & (expected < gap_end)).any(), (symbol, gap_start, gap_end)
+
+
+def check_contract_pacing(end_date, years=16, period=2.0):
+    """
+    One symbol's chunks all go out at once: no 2-second window may hold 6 requests for the contract.
+    """
+    stub = StubIB(0.0)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        AsyncDataFetcher(ib=stub).fetch_incremental_many(['SYM'], end_date - timedelta(days=365 * years), end_date,
+                                                         ColumnarPriceStore(tmp_dir),
+                                                         CoverageIndex(f"{tmp_dir}/coverage.json"))
+    times = stub.issue_times['SYM']
+    busiest = max(sum(start <= t < start + period for t in times) for start in times)
+    assert busiest <= AsyncDataFetcher.MAX_CONTRACT_REQUESTS, busiest
+    return len(times), busiest, times[-1] - times[0]
+
+
+def run(n_symbols=20, years=5, latency=0.3):
+    timezone = pytz.timezone('America/New_York')
+    end_date = timezone.localize(datetime(2024, 6, 3, 16))
+    start_date = end_date - timedelta(days=365 * years)
+    check_coverage(start_date, end_date)
+    print("Coverage check passed: chunks without bars stay uncovered and are fetched by the next run.")
+    n_requests, busiest, spread = check_contract_pacing(end_date)
+    print(f"Pacing check passed: {n_requests} requests for one contract over {spread:.1f}s, "
+          f"at most {busiest} in any 2 seconds.")
+    symbols = [f"SYM{i}" for i in range(n_symbols)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = ColumnarPriceStore(tmp_dir)
+        coverage = CoverageIndex(f"{tmp_dir}/coverage.json")
+        stub = StubIB(latency)
+        fetcher = AsyncDataFetcher(ib=stub)
+
+        start = time.perf_counter()
+        data = fetcher.fetch_incremental_many(symbols, start_date, end_date, store, coverage)
+        elapsed = time.perf_counter() - start
+
+    serial_estimate = stub.requests * (latency + 2)
+    print(f"{n_symbols} symbols, {stub.requests} chunk requests, {sum(len(df) for df in data.values()):,} bars")
+    print(f"async: {elapsed:.1f}s ({stub.requests / elapsed:.1f} req/s, max {stub.max_in_flight} in flight)")
+    print(f"serial estimate: {serial_estimate:.0f}s")
+    print(f"projected 100-symbol backfill: async {elapsed * 100 / n_symbols / 60:.1f} min, "
+          f"serial {serial_estimate * 100 / n_symbols / 3600:.1f} h")
+
+
+if __name__ == "__main__":
+    run()
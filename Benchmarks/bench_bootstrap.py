@@ -0,0 +1,88 @@
+"""
+Times BootstrapEvaluator on 5 years of daily strategy returns against a per-resample Evaluator loop.
+
+Parity: the metrics of a few resamples are recomputed one by one with Evaluator on a frame of the
+resampled returns and their cumulative product, as Backtester would produce it. The resample
+indices are checked to follow the stationary bootstrap: blocks of consecutive rows (wrapping at
+the end) with mean length close to mean_block.
+
+Run from the repository root:
+    python -m Benchmarks.bench_bootstrap
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from Evaluation.evaluator import Evaluator
+from Evaluation.robustness import BootstrapEvaluator, stationary_bootstrap_indices
+
+TARGET_SECONDS = 1.0
+
+
+def make_results(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0004, 0.01, n_rows)
+    return pd.DataFrame({'Strategy_Return': returns, 'Cumulative_Return': np.cumprod(1 + returns)},
+                        index=pd.bdate_range('2019-01-01', periods=n_rows))
+
+
+def loop_metrics(returns, indices):
+    """
+    Metrics of each resample through Evaluator, one resample at a time.
+    """
+    rows = []
+    for row in indices:
+        resampled = returns[row]
+        evaluator = Evaluator(pd.DataFrame({'Strategy_Return': resampled,
+                                            'Cumulative_Return': np.cumprod(1 + resampled)}))
+        rows.append((evaluator.compute_sharpe_ratio(), evaluator.compute_max_drawdown()))
+    return np.array(rows)
+
+
+def check_indices(n_rows=1_000, n_resamples=2_000, mean_block=10):
+    indices = stationary_bootstrap_indices(n_rows, n_resamples, mean_block, np.random.default_rng(0))
+    assert indices.min() >= 0 and indices.max() < n_rows
+    breaks = (np.diff(indices, axis=1) % n_rows != 1).sum()
+    observed_block = indices.size / (breaks + n_resamples)
+    assert abs(observed_block / mean_block - 1) < 0.05, observed_block
+
+
+def check_parity(results, n_check=50, seed=7):
+    bootstrap = BootstrapEvaluator(results, n_resamples=n_check, seed=seed)
+    distributions = bootstrap.resample_metrics()
+    returns = results['Strategy_Return'].to_numpy()
+    n_rows = len(returns)
+    mean_block = max(1.0, round(n_rows ** (1 / 3)))
+    indices = stationary_bootstrap_indices(n_rows, n_check, mean_block, np.random.default_rng(seed))
+    expected = loop_metrics(returns, indices)
+    np.testing.assert_allclose(distributions[['Sharpe_Ratio', 'Max_Drawdown']].to_numpy(), expected, rtol=1e-12)
+
+
+def run(years=5, n_resamples=10_000, loop_resamples=500):
+    results = make_results(252 * years)
+    check_indices()
+    check_parity(results)
+    print("Parity check passed: batched metrics match Evaluator per resample.")
+
+    bootstrap = BootstrapEvaluator(results, n_resamples=n_resamples, seed=0)
+    start = time.perf_counter()
+    bootstrap.resample_metrics()
+    batched_time = time.perf_counter() - start
+
+    returns = results['Strategy_Return'].to_numpy()
+    indices = stationary_bootstrap_indices(len(returns), loop_resamples, round(len(returns) ** (1 / 3)),
+                                           np.random.default_rng(0))
+    start = time.perf_counter()
+    loop_metrics(returns, indices)
+    loop_time = (time.perf_counter() - start) * n_resamples / loop_resamples
+
+    print(f"{n_resamples:,} resamples of {len(returns):,} daily returns")
+    print(f"Evaluator loop (extrapolated): {loop_time:7.3f}s | BootstrapEvaluator: {batched_time:7.3f}s | "
+          f"speedup {loop_time / batched_time:5.1f}x | target {TARGET_SECONDS:.1f}s "
+          f"{'met' if batched_time < TARGET_SECONDS else 'MISSED'}")
+    print(bootstrap.confidence_intervals().to_string(float_format=lambda value: f"{value:.4f}"))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,116 @@
+"""
+Checks that ChunkedBacktester reproduces the in-memory pipeline exactly and that its memory stays
+flat as the history grows.
+
+Parity: a synthetic pair with missing bars is stored in a ColumnarPriceStore, then run through
+merge -> spread (window-local statistics) -> signals -> backtest on the whole history and through
+iter_merged_chunks + ChunkedBacktester with several chunk sizes (including ones smaller than the
+rolling window). Result rows and maximum drawdown must be bit-identical; the streamed Sharpe ratio
+must agree to rounding.
+
+Memory: peak traced allocations (tracemalloc) of both paths for growing histories, each in a fresh
+process. The chunked path reads memory-mapped files, whose pages are not traced allocations.
+
+Run from the repository root:
+    python -m Benchmarks.bench_chunked_backtest
+"""
+import multiprocessing
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from Benchmarks.synthetic import make_pair
+from Data.data_preprocessor import DataPreprocessor, iter_merged_chunks
+from Data.price_store import ColumnarPriceStore
+from Evaluation.backtester import Backtester
+from Evaluation.chunked_backtester import ChunkedBacktester
+from Evaluation.evaluator import Evaluator
+from Utils.signal_generator import SignalGenerator
+from Utils.spread_calculator import SpreadCalculator
+
+DEPENDENT, INDEPENDENT = 'Price_Y', 'Price_X'
+HEDGE_RATIO = 1.5
+BAR_SIZE = '1 min'
+
+
+def store_pair(store, n_rows, missing=0.0, seed=0):
+    dependent, independent = make_pair(n_rows, '1min', hedge_ratio=HEDGE_RATIO, seed=seed)
+    if missing:
+        rng = np.random.default_rng(seed)
+        dependent = dependent.iloc[rng.random(n_rows) >= missing]
+        independent = independent.iloc[rng.random(n_rows) >= missing]
+    store.save('Y', BAR_SIZE, dependent)
+    store.save('X', BAR_SIZE, independent)
+
+
+def in_memory(store, max_fill):
+    merged = DataPreprocessor(store.load_many(['Y', 'X'], BAR_SIZE)).merge_data(max_fill=max_fill)
+    spread_calculator = SpreadCalculator(merged, HEDGE_RATIO, DEPENDENT, INDEPENDENT, window=20, window_local=True)
+    spread_calculator.compute_spread()
+    signals = SignalGenerator(spread_calculator.compute_zscore()).generate_signals()
+    results = Backtester(signals, DEPENDENT, INDEPENDENT, HEDGE_RATIO).backtest()
+    evaluator = Evaluator(results)
+    return results, evaluator.compute_sharpe_ratio(), evaluator.compute_max_drawdown()
+
+
+def chunked(store, max_fill, chunk_rows, on_chunk=None):
+    backtester = ChunkedBacktester(DEPENDENT, INDEPENDENT, HEDGE_RATIO, window=20)
+    chunks = iter_merged_chunks(store, ['Y', 'X'], BAR_SIZE, chunk_rows, max_fill=max_fill)
+    return backtester.run(chunks, on_chunk)
+
+
+def check_parity(n_rows=30_000):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = ColumnarPriceStore(tmp_dir)
+        store_pair(store, n_rows, missing=0.05, seed=1)
+        for max_fill in (0, 5):
+            expected, sharpe, drawdown = in_memory(store, max_fill)
+            for chunk_rows in (13, 20, 997, 10_000, n_rows):
+                parts = []
+                metrics = chunked(store, max_fill, chunk_rows, parts.append)
+                pd.testing.assert_frame_equal(pd.concat(parts), expected, check_exact=True, check_freq=False)
+                assert metrics['Max_Drawdown'] == drawdown, (chunk_rows, metrics['Max_Drawdown'], drawdown)
+                assert np.isclose(metrics['Sharpe_Ratio'], sharpe, rtol=1e-9), (metrics['Sharpe_Ratio'], sharpe)
+
+
+def _measure(path, n_rows, chunk_rows, queue):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = ColumnarPriceStore(tmp_dir)
+        store_pair(store, n_rows)
+        tracemalloc.start()
+        start = time.perf_counter()
+        if path == 'in-memory':
+            in_memory(store, max_fill=0)
+        else:
+            chunked(store, 0, chunk_rows)
+        elapsed = time.perf_counter() - start
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    queue.put((elapsed, traced_peak / 2 ** 20))
+
+
+def measure(path, n_rows, chunk_rows):
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=_measure, args=(path, n_rows, chunk_rows, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def run(sizes=(1_000_000, 2_000_000, 4_000_000), chunk_rows=100_000):
+    check_parity()
+    print("Parity check passed: chunked results match the in-memory pipeline bit for bit.")
+    print(f"{'path':<10} {'bars':>10} {'time (s)':>10} {'traced peak (MB)':>18}")
+    for n_rows in sizes:
+        for path in ('in-memory', 'chunked'):
+            elapsed, traced_peak = measure(path, n_rows, chunk_rows)
+            print(f"{path:<10} {n_rows:>10,} {elapsed:>10.3f} {traced_peak:>18.1f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,86 @@
+"""
+Validates the compact float32 mode against the float64 pipeline: metric drift and memory saved.
+
+The float32 run goes through the whole compact path as PairsTradingStrategy runs it: prices are
+read from a full-precision ColumnarPriceStore, merged by DataPreprocessor(dtype=np.float32), then run through the
+spread -> signals -> backtest -> evaluation stages of both pipeline modes. Sharpe ratio and
+maximum drawdown must stay within tolerance of the float64 run; peak traced memory (tracemalloc)
+is measured in a fresh process per configuration.
+
+Run from the repository root:
+    python -m Benchmarks.bench_compact_dtype
+"""
+import multiprocessing
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from Benchmarks.bench_pipeline_memory import PAIR_PARAMS, run_pipeline
+from Benchmarks.synthetic import make_pair
+from Data.data_preprocessor import DataPreprocessor
+from Data.price_store import ColumnarPriceStore
+
+SHARPE_RTOL = 1e-3
+DRAWDOWN_ATOL = 1e-4
+
+
+def load_merged(n_rows, dtype, store_dir, seed=0):
+    """
+    Stores a synthetic pair in full precision and merges it back in dtype, as PairsTradingStrategy does.
+    """
+    store = ColumnarPriceStore(store_dir)
+    for symbol, frame in zip(('Y', 'X'), make_pair(n_rows, '1min', seed=seed, **PAIR_PARAMS)):
+        store.save(symbol, '1 min', frame)
+    return DataPreprocessor(store.load_many(['Y', 'X'], '1 min'), dtype=dtype).merge_data()
+
+
+def _measure(mode, dtype, n_rows, queue):
+    with tempfile.TemporaryDirectory() as store_dir:
+        merged = load_merged(n_rows, dtype, store_dir)
+    tracemalloc.start()
+    start = time.perf_counter()
+    outputs = run_pipeline(merged, mode)
+    elapsed = time.perf_counter() - start
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    queue.put((elapsed, traced_peak / 2 ** 20, [(metrics[1], metrics[2]) for metrics in outputs]))
+
+
+def measure(mode, dtype, n_rows):
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=_measure, args=(mode, dtype, n_rows, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def check_metrics(reference, compact):
+    """
+    Asserts that (sharpe, max drawdown) pairs of the train and test splits agree within tolerance.
+    """
+    for (sharpe, drawdown), (compact_sharpe, compact_drawdown) in zip(reference, compact):
+        assert np.isclose(compact_sharpe, sharpe, rtol=SHARPE_RTOL, atol=0), (sharpe, compact_sharpe)
+        assert np.isclose(compact_drawdown, drawdown, rtol=0, atol=DRAWDOWN_ATOL), (drawdown, compact_drawdown)
+
+
+def run(n_rows=2_000_000):
+    print(f"Train + test pipeline on {n_rows:,} minute bars")
+    print(f"{'mode':<10} {'dtype':<8} {'time (s)':>10} {'traced peak (MB)':>18} {'test Sharpe':>12} {'test MDD':>10}")
+    for mode in ('frame', 'columnar'):
+        results = {}
+        for dtype in ('float64', 'float32'):
+            results[dtype] = measure(mode, dtype, n_rows)
+            elapsed, traced_peak, metrics = results[dtype]
+            print(f"{mode:<10} {dtype:<8} {elapsed:>10.3f} {traced_peak:>18.1f} "
+                  f"{metrics[1][0]:>12.4f} {metrics[1][1]:>10.4f}")
+        check_metrics(results['float64'][2], results['float32'][2])
+        saved = 1 - results['float32'][1] / results['float64'][1]
+        print(f"{mode}: metrics within tolerance, peak memory {saved:.0%} lower in float32")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,111 @@
+"""
+Checks ExecutionBacktester against Backtester with the extra execution rules disabled and measures
+the kernel's throughput with every rule enabled.
+
+Run from the repository root:
+    python -m Benchmarks.bench_execution_backtester
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from Benchmarks.synthetic import make_merged_pair
+from Evaluation import execution_backtester
+from Evaluation.backtester import Backtester, pct_change
+from Evaluation.execution_backtester import ExecutionBacktester
+from Utils.signal_generator import SignalGenerator
+from Utils.spread_calculator import SpreadCalculator
+
+RULES = dict(cost_dependent=0.0005, cost_independent=0.0005, slippage=0.0002, borrow_rate=0.03, stop_loss=0.02,
+             max_holding=390)
+
+
+def make_signals(n_rows, hedge_ratio=1.5, seed=0):
+    data = make_merged_pair(n_rows, '1min', seed=seed, hedge_ratio=hedge_ratio, half_life=34, spread_sigma=0.05,
+                            volatility=5e-4)
+    calculator = SpreadCalculator(data, hedge_ratio, 'Price_Y', 'Price_X', window=20)
+    calculator.compute_spread()
+    return SignalGenerator(calculator.compute_zscore()).generate_signals()
+
+
+def check_parity(n_rows=100_000, hedge_ratio=1.5):
+    signals = make_signals(n_rows, hedge_ratio, seed=1)
+    hedge_series = pd.Series(hedge_ratio + 0.01 * np.sin(np.arange(len(signals)) / 500), index=signals.index)
+    engines = ['numpy'] + (['numba'] if execution_backtester.HAS_NUMBA else [])
+    for hedge in (hedge_ratio, hedge_series):
+        expected = Backtester(signals, 'Price_Y', 'Price_X', hedge).backtest()
+        for engine in engines:
+            results = ExecutionBacktester(signals, 'Price_Y', 'Price_X', hedge, engine=engine).backtest()
+            for column in ('Strategy_Return', 'Trade', 'Cumulative_Return'):
+                assert np.array_equal(expected[column].to_numpy(), results[column].to_numpy(), equal_nan=True), \
+                    (engine, column)
+
+    # With every rule enabled the compiled and interpreted loops must agree exactly
+    if 'numba' in engines:
+        subset = signals.iloc[:20_000]
+        compiled = ExecutionBacktester(subset, 'Price_Y', 'Price_X', hedge_ratio, engine='numba', **RULES).backtest()
+        interpreted = ExecutionBacktester(subset, 'Price_Y', 'Price_X', hedge_ratio, engine='numpy',
+                                          **RULES).backtest()
+        assert compiled.equals(interpreted)
+
+        # Costs without exits run the vectorized NumPy path, which must charge the same rebalancing costs
+        costs = {name: value for name, value in RULES.items() if name not in ('stop_loss', 'max_holding')}
+        compiled = ExecutionBacktester(subset, 'Price_Y', 'Price_X', hedge_ratio, engine='numba', **costs).backtest()
+        vectorized = ExecutionBacktester(subset, 'Price_Y', 'Price_X', hedge_ratio, engine='numpy',
+                                         **costs).backtest()
+        assert compiled.equals(vectorized)
+    return engines
+
+
+def kernel_throughput(n_rows, hedge_ratio=1.5, repeats=3):
+    """
+    Bars per second of the compiled kernel alone, on arrays tiled from a smaller run.
+    """
+    signals = make_signals(min(n_rows, 1_000_000), hedge_ratio)
+    reps = -(-n_rows // len(signals))
+    y = np.tile(signals['Price_Y'].to_numpy(), reps)[:n_rows]
+    x = np.tile(signals['Price_X'].to_numpy(), reps)[:n_rows]
+    target = np.tile(signals['Position'].to_numpy(), reps)[:n_rows]
+    ry, rx = pct_change(y), pct_change(x)
+    hedge = np.full(n_rows, hedge_ratio)
+    kernel = execution_backtester.compiled_execution_loop()
+    args = (y, x, ry, rx, hedge, target, 0.002, RULES['cost_dependent'], RULES['cost_independent'],
+            RULES['slippage'], RULES['borrow_rate'] / 252, RULES['stop_loss'], RULES['max_holding'], 100_000.0)
+    kernel(*(arg[:100] if isinstance(arg, np.ndarray) else arg for arg in args))  # compile
+
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        kernel(*args)
+        best = min(best, time.perf_counter() - start)
+    return n_rows / best
+
+
+def run(n_rows=10_000_000):
+    engines = check_parity()
+    print(f"Parity check passed ({', '.join(engines)}): default rules reproduce Backtester exactly.")
+
+    signals = make_signals(1_000_000)
+    print(f"{'path':<28} {'bars':>12} {'time (s)':>10} {'bars/s':>14}")
+    cases = [('Backtester', lambda: Backtester(signals, 'Price_Y', 'Price_X', 1.5).backtest()),
+             ('ExecutionBacktester numpy', lambda: ExecutionBacktester(signals, 'Price_Y', 'Price_X', 1.5,
+                                                                       engine='numpy').backtest())]
+    if 'numba' in engines:
+        cases.append(('ExecutionBacktester numba', lambda: ExecutionBacktester(signals, 'Price_Y', 'Price_X', 1.5,
+                                                                               engine='numba', **RULES).backtest()))
+    for name, backtest in cases:
+        backtest()
+        start = time.perf_counter()
+        backtest()
+        elapsed = time.perf_counter() - start
+        print(f"{name:<28} {len(signals):>12,} {elapsed:>10.3f} {len(signals) / elapsed:>14,.0f}")
+
+    if 'numba' in engines:
+        print(f"Compiled kernel, all rules on, {n_rows:,} bars: {kernel_throughput(n_rows):,.0f} bars/s")
+    else:
+        print("numba is not installed; skipping the compiled kernel throughput run.")
+
+
+if __name__ == "__main__":
+    run()
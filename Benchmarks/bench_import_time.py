@@ -0,0 +1,73 @@
+"""
+Measures the import time of the pipeline entry points with `python -X importtime` and checks that
+heavy optional dependencies stay out of them.
+
+Each module is imported in a fresh interpreter (best of --repeat runs). ib_insync, numba,
+matplotlib, statsmodels and scipy must only load on the code paths that use them (connecting to
+IBroker, compiling the execution kernel, plotting); the run exits with status 1 if any of them is
+imported eagerly.
+
+Run from the repository root:
+    python -m Benchmarks.bench_import_time
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ENTRY_POINTS = ['pairs_trading_strategy', 'Data.data_fetcher', 'Data.async_fetcher', 'Evaluation.walk_forward',
+                'Evaluation.portfolio_runner', 'Evaluation.execution_backtester']
+HEAVY_MODULES = ['ib_insync', 'numba', 'matplotlib', 'statsmodels', 'scipy']
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile(statement):
+    """
+    Runs statement in a fresh interpreter under -X importtime.
+
+    Returns:
+        tuple: (total import time in seconds, {module: cumulative seconds})
+    """
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=ROOT,
+                               capture_output=True, text=True, check=True)
+    modules = {}
+    total = 0.0
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        seconds = int(cumulative) / 1e6
+        modules[name.strip()] = seconds
+        # Top-level imports are not indented; their cumulative times add up to the total
+        if not name[1:].startswith(' '):
+            total += seconds
+    return total, modules
+
+
+def run():
+    parser = argparse.ArgumentParser(description='Import time of the pipeline entry points.')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    failures = 0
+    print(f"{'module':<34} {'import (s)':>10}  heavy dependencies loaded")
+    for module in ['pandas', 'main'] + ENTRY_POINTS:
+        # main only defines its argument parser at import; time its --help path instead
+        statement = (f"import sys; sys.argv = ['main.py', '--help']; import runpy; runpy.run_module('main', "
+                     f"run_name='__main__')") if module == 'main' else f"import {module}"
+        runs = [import_profile(statement) for _ in range(args.repeat)]
+        best = min(total for total, _ in runs)
+        modules = runs[-1][1]
+        heavy = [name for name in HEAVY_MODULES if name in modules]
+        label = 'main --help' if module == 'main' else module
+        print(f"{label:<34} {best:>10.3f}  {', '.join(heavy) or '-'}")
+        if heavy and module != 'pandas':
+            failures += 1
+
+    if failures:
+        print(f"{failures} entry point(s) import heavy dependencies eagerly.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,64 @@
+"""
+Measures session alignment and on-the-fly resampling of multi-year minute bars against the
+equivalent pandas groupby/resample calls, and checks that both give the same bars.
+
+Run from the repository root:
+    python -m Benchmarks.bench_minute_alignment
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from Data.data_preprocessor import DataPreprocessor, resample_bars
+
+
+def make_minute_bars(n_days, missing, seed):
+    """
+    Regular-session minute bars over n_days business days, with a fraction of minutes missing.
+    """
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range('2019-01-02', periods=n_days)
+    minutes = np.arange(390) * np.timedelta64(1, 'm') + np.timedelta64(570, 'm')
+    local = (days.values[:, None] + minutes[None, :]).ravel()
+    index = pd.DatetimeIndex(local, name='date').tz_localize('America/New_York')
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 1e-4, len(index))))
+    return pd.DataFrame({'Price': prices}, index=index).iloc[rng.random(len(index)) >= missing]
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def run(n_days=252 * 5, max_fill=5):
+    data = {'AAA': make_minute_bars(n_days, 0.05, 0), 'BBB': make_minute_bars(n_days, 0.2, 1)}
+    preprocessor = DataPreprocessor(data)
+    print(f"{n_days} sessions, {sum(len(df) for df in data.values()):,} minute bars")
+
+    inner, inner_time = timed(preprocessor.merge_data)
+    aligned, aligned_time = timed(lambda: preprocessor.merge_data(max_fill=max_fill))
+
+    def pandas_align():
+        merged = pd.concat([df.rename(columns={'Price': f'Price_{symbol}'}) for symbol, df in data.items()],
+                           axis=1).sort_index()
+        return merged.groupby(merged.index.date).ffill(limit=max_fill).dropna()
+
+    expected, pandas_time = timed(pandas_align)
+    assert expected.equals(aligned)
+    print(f"{'inner join':<28} {inner_time:>8.3f} s {len(inner):>12,} bars")
+    print(f"{'session fill (pandas)':<28} {pandas_time:>8.3f} s {len(expected):>12,} bars")
+    print(f"{'session fill':<28} {aligned_time:>8.3f} s {len(aligned):>12,} bars")
+
+    for frequency in ('5min', '15min', '1h'):
+        resampled, resample_time = timed(lambda: resample_bars(aligned, frequency))
+        expected, pandas_time = timed(lambda: aligned.resample(frequency).last().dropna())
+        assert expected.equals(resampled), frequency
+        print(f"{'resample ' + frequency:<28} {resample_time:>8.3f} s {len(resampled):>12,} bars"
+              f"   (pandas resample {pandas_time:.3f} s)")
+    print("Parity checks passed.")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,62 @@
+"""
+Runs a window x entry x exit grid through ParameterSweep on 5 years of synthetic daily bars.
+
+A few grid points are re-run through the stage classes (SpreadCalculator, SignalGenerator,
+Backtester, Evaluator) to check the sweep reproduces the pipeline's metrics; the z-scores it scores
+must equal SpreadCalculator's exactly.
+
+Run from the repository root:
+    python -m Benchmarks.bench_parameter_sweep
+"""
+import time
+
+import numpy as np
+
+from Benchmarks.synthetic import make_merged_pair
+from Evaluation.backtester import Backtester
+from Evaluation.evaluator import Evaluator
+from Evaluation.parameter_sweep import ParameterSweep
+from Utils.hedge_ratio_calculator import HedgeRatioCalculator
+from Utils.signal_generator import SignalGenerator
+from Utils.spread_calculator import SpreadCalculator
+
+
+def pipeline_metrics(data, hedge_ratio, window, entry, exit_):
+    calculator = SpreadCalculator(data, hedge_ratio, 'Price_Y', 'Price_X', window=window)
+    calculator.compute_spread()
+    signals = SignalGenerator(calculator.compute_zscore(), entry, exit_).generate_signals()
+    results = Backtester(signals, 'Price_Y', 'Price_X', hedge_ratio).backtest()
+    evaluator = Evaluator(results)
+    return evaluator.compute_sharpe_ratio(), evaluator.compute_max_drawdown()
+
+
+def run(windows=range(10, 65, 5), entries=np.round(np.arange(1.0, 3.05, 0.1), 2),
+        exits=np.round(np.arange(0.0, 1.05, 0.1), 2)):
+    data = make_merged_pair(1260, half_life=7, spread_sigma=1.0)
+    calculator = HedgeRatioCalculator(data, 'Price_Y', 'Price_X')
+    for label, hedge_ratio in (('static', calculator.calculate_hedge_ratio()),
+                               ('kalman', calculator.calculate_kalman_hedge_ratio())):
+        sweep = ParameterSweep(data, 'Price_Y', 'Price_X', hedge_ratio)
+
+        start = time.perf_counter()
+        results = sweep.run(windows, entries, exits)
+        elapsed = time.perf_counter() - start
+
+        for window in (windows[0], windows[-1]):
+            spread_calculator = SpreadCalculator(data, hedge_ratio, 'Price_Y', 'Price_X', window=window)
+            spread_calculator.compute_spread()
+            np.testing.assert_array_equal(sweep._window_inputs(window)[0],
+                                          spread_calculator.compute_zscore()['ZScore'])
+        for _, row in results.sample(5, random_state=0).iterrows():
+            expected = pipeline_metrics(data, hedge_ratio, int(row['Window']), row['Entry_Threshold'],
+                                        row['Exit_Threshold'])
+            np.testing.assert_allclose([row['Sharpe_Ratio'], row['Max_Drawdown']], expected, rtol=1e-9)
+
+        best = results.sort_values('Sharpe_Ratio', ascending=False).iloc[0]
+        print(f"{label}: {len(results):,} configs in {elapsed:.3f}s ({len(results) / elapsed:,.0f} configs/s); "
+              f"best Sharpe {best['Sharpe_Ratio']:.3f} at window={int(best['Window'])}, "
+              f"entry={best['Entry_Threshold']}, exit={best['Exit_Threshold']}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,118 @@
+"""
+Times performance_summary on many strategy columns at once against per-strategy reference code.
+
+The strategies are synthetic Backtester-like runs: positions that enter, hold and exit in runs of
+bars, flat stretches earning nothing, and returns with trading costs. The reference computes the
+same table per strategy with pandas rolling windows and a bar-by-bar loop for drawdown durations
+and round trips, as a straightforward implementation would. Both tables must agree.
+
+Run from the repository root:
+    python -m Benchmarks.bench_performance_analytics
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from Evaluation.evaluator import max_drawdown, performance_summary, sharpe_ratio
+
+TRANSACTION_COST = 0.002
+
+
+def make_strategies(n_strategies, n_rows, seed=0):
+    """
+    Positions of -1, 0 or 1 held for runs of bars, and the strategy returns they earn.
+    """
+    rng = np.random.default_rng(seed)
+    signals = rng.choice([-1.0, 0.0, 1.0], size=(n_strategies, n_rows), p=[0.02, 0.96, 0.02])
+    changes = signals != 0
+    changes[:, 0] = True
+    positions = np.where(changes, signals, np.nan)
+    positions = pd.DataFrame(positions.T).ffill().to_numpy().T
+    held = np.zeros_like(positions)
+    held[:, 1:] = positions[:, :-1]
+    trades = np.abs(positions - held)
+    returns = held * rng.normal(0.0002, 0.01, (n_strategies, n_rows)) - trades * TRANSACTION_COST
+    return positions, returns
+
+
+def reference_durations(cumulative):
+    peak, last_peak, longest = -np.inf, 0, 0
+    rolling_max = np.maximum.accumulate(cumulative)
+    for i, value in enumerate(cumulative):
+        if value >= peak:
+            peak, last_peak = value, i
+        longest = max(longest, i - last_peak)
+    trough = int(np.argmin((cumulative - rolling_max) / rolling_max))
+    if cumulative[trough] == rolling_max[trough]:
+        return longest, 0
+    for i in range(trough + 1, len(cumulative)):
+        if cumulative[i] >= rolling_max[trough]:
+            return longest, i - trough
+    return longest, np.nan
+
+
+def reference_trips(position, returns):
+    trips, direction, pending = [], 0.0, None
+    for t in range(len(position)):
+        held = np.sign(position[t - 1]) if t else 0.0
+        if held != 0:
+            if held != direction:
+                trips.append([pending if pending is not None else 1.0, 0])
+                pending = None
+            trips[-1][0] *= 1 + returns[t]
+            trips[-1][1] += 1
+        elif position[t] != 0 and t < len(position) - 1:
+            pending = 1 + returns[t]
+        direction = held
+    returns = np.array([growth - 1 for growth, _ in trips])
+    holding = np.array([bars for _, bars in trips])
+    return {'Round_Trips': len(trips), 'Win_Rate': (returns > 0).mean(), 'Avg_Trip_Return': returns.mean(),
+            'Avg_Holding_Bars': holding.mean()}
+
+
+def reference_summary(positions, returns, window, periods_per_year=252):
+    rows = []
+    for position, strategy_returns in zip(positions, returns):
+        series = pd.Series(strategy_returns)
+        rolling = series.rolling(window)
+        rolling_std = rolling.std()
+        rolling_std[rolling.max() == rolling.min()] = 0
+        rolling_sharpe = (rolling.mean() * periods_per_year / (rolling_std * np.sqrt(periods_per_year)))
+        rolling_sharpe[rolling_std == 0] = np.nan
+        cumulative = np.cumprod(1 + strategy_returns)
+        longest, recovery = reference_durations(cumulative)
+        rows.append(dict({
+            'Total_Return': cumulative[-1] - 1,
+            'Sharpe_Ratio': float(sharpe_ratio(strategy_returns, periods_per_year)),
+            'Volatility': series.std() * np.sqrt(periods_per_year),
+            'Max_Drawdown': float(max_drawdown(cumulative)),
+            'Drawdown_Bars': longest,
+            'Recovery_Bars': recovery,
+            'Rolling_Sharpe_Last': rolling_sharpe.iloc[-1],
+            'Rolling_Sharpe_Min': rolling_sharpe.min(),
+            'Rolling_Volatility_Max': rolling_std.max() * np.sqrt(periods_per_year),
+        }, **reference_trips(position, strategy_returns)))
+    return pd.DataFrame(rows)
+
+
+def run(n_strategies=100, n_rows=50_000, window=63):
+    positions, returns = make_strategies(n_strategies, n_rows)
+    print(f"{n_strategies} strategies x {n_rows:,} bars, rolling window {window}")
+
+    start = time.perf_counter()
+    reference = reference_summary(positions, returns, window)
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    summary = performance_summary(returns, positions, window=window)
+    batched_time = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(summary, reference[summary.columns], check_dtype=False, rtol=1e-7)
+    print("Parity check passed: batched summary matches the per-strategy reference.")
+    print(f"per-strategy reference: {reference_time:7.3f}s | performance_summary: {batched_time:7.3f}s | "
+          f"speedup {reference_time / batched_time:5.1f}x")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,96 @@
+"""
+Compares the memory footprint of the copying DataFrame pipeline against the columnar PipelineContext.
+
+Each pipeline runs spread -> signals -> backtest -> evaluation on a train and a test split, like
+PairsTradingStrategy. Peak traced allocations (tracemalloc) and peak RSS are measured in a fresh
+process per mode, and the two modes' results are checked to be identical.
+
+Run from the repository root:
+    python -m Benchmarks.bench_pipeline_memory
+"""
+import multiprocessing
+import time
+import tracemalloc
+
+import numpy as np
+
+from Benchmarks.bench_price_store import peak_rss_mb
+from Benchmarks.synthetic import make_merged_pair
+from Evaluation.backtester import Backtester
+from Evaluation.evaluator import Evaluator
+from Utils.pipeline_context import PipelineContext
+from Utils.signal_generator import SignalGenerator
+from Utils.spread_calculator import SpreadCalculator
+
+DEPENDENT, INDEPENDENT = 'Price_Y', 'Price_X'
+# Minute bars: ~1bp independent-leg moves and a spread with a 34-bar half-life
+PAIR_PARAMS = {'half_life': 34, 'spread_sigma': 0.05, 'volatility': 1e-4}
+
+
+def make_merged(n_rows, seed=0):
+    """
+    Builds a merged minute-bar frame of a cointegrated pair.
+    """
+    return make_merged_pair(n_rows, '1min', seed=seed, **PAIR_PARAMS)
+
+
+def run_pipeline(merged, mode, hedge_ratio=1.5):
+    split_point = int(len(merged) * 0.66)
+    outputs = []
+    for data in (merged.iloc[:split_point], merged.iloc[split_point:]):
+        if mode == 'columnar':
+            data = PipelineContext.from_frame(data, [DEPENDENT, INDEPENDENT])
+        spread_calculator = SpreadCalculator(data, hedge_ratio, DEPENDENT, INDEPENDENT, window=20)
+        spread_calculator.compute_spread()
+        signals = SignalGenerator(spread_calculator.compute_zscore()).generate_signals()
+        results = Backtester(signals, DEPENDENT, INDEPENDENT, hedge_ratio).backtest()
+        evaluator = Evaluator(results)
+        outputs.append((results, evaluator.compute_sharpe_ratio(), evaluator.compute_max_drawdown()))
+    return outputs
+
+
+def _measure(mode, n_rows, queue):
+    merged = make_merged(n_rows)
+    baseline_rss = peak_rss_mb()
+    tracemalloc.start()
+    start = time.perf_counter()
+    outputs = run_pipeline(merged, mode)
+    elapsed = time.perf_counter() - start
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    queue.put((elapsed, traced_peak / 2 ** 20, peak_rss_mb() - baseline_rss,
+               [(metrics[1], metrics[2]) for metrics in outputs]))
+
+
+def measure(mode, n_rows):
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=_measure, args=(mode, n_rows, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def check_parity(n_rows=20_000):
+    merged = make_merged(n_rows, seed=1)
+    for (frame, *frame_metrics), (context, *context_metrics) in zip(run_pipeline(merged, 'frame'),
+                                                                    run_pipeline(merged, 'columnar')):
+        assert frame.index.equals(context.index)
+        for column in context.columns:
+            assert np.array_equal(frame[column].to_numpy(), context[column], equal_nan=True), column
+        assert np.allclose(frame_metrics, context_metrics, rtol=0, atol=0, equal_nan=True)
+
+
+def run(n_rows=2_000_000):
+    check_parity()
+    print("Parity check passed: columnar results match the DataFrame pipeline exactly.")
+    print(f"Train + test pipeline on {n_rows:,} minute bars")
+    print(f"{'mode':<10} {'time (s)':>10} {'traced peak (MB)':>18} {'RSS growth (MB)':>17}")
+    for mode in ('frame', 'columnar'):
+        elapsed, traced_peak, rss_growth, _ = measure(mode, n_rows)
+        print(f"{mode:<10} {elapsed:>10.3f} {traced_peak:>18.1f} {rss_growth:>17.1f}")
+
+
+if __name__ == "__main__":
+    run()
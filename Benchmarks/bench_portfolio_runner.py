@@ -0,0 +1,42 @@
+"""
+Measures PortfolioRunner scaling with the number of worker processes on a synthetic universe.
+
+Also checks that the parallel run reproduces the single-process per-pair metrics.
+
+Run from the repository root:
+    python -m Benchmarks.bench_portfolio_runner
+"""
+import os
+import time
+
+import pandas as pd
+
+from Benchmarks.synthetic import make_universe
+from Evaluation.portfolio_runner import PortfolioRunner
+
+
+def run(n_pairs=16, n_rows=200_000):
+    prices, pairs = make_universe(n_pairs, n_rows, frequency='1min', half_life=34, spread_sigma=0.05,
+                                  volatility=5e-4)
+    cpu_count = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, 8, cpu_count} & set(range(1, cpu_count + 1)))
+
+    baseline = None
+    print(f"{n_pairs} pairs x {n_rows:,} bars, {cpu_count} CPU(s)")
+    for workers in worker_counts:
+        runner = PortfolioRunner(prices, pairs, max_workers=workers)
+        start = time.perf_counter()
+        summary = runner.run()
+        elapsed = time.perf_counter() - start
+
+        if baseline is None:
+            baseline = (elapsed, summary)
+        else:
+            pd.testing.assert_frame_equal(summary, baseline[1])
+        print(f"workers={workers:>2} | {elapsed:7.2f}s | speedup {baseline[0] / elapsed:4.1f}x")
+
+    print(baseline[1].tail(1).to_string(index=False))
+
+
+if __name__ == "__main__":
+    run()
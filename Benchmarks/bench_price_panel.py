@@ -0,0 +1,73 @@
+"""
+Compares building an aligned price panel with PricePanel against pandas concat joins.
+
+The synthetic universe has random missing bars per symbol and repeats the boundary bars of each
+fetch chunk, like DataFetcher output before deduplication. Two workloads are timed:
+    - aligning the whole universe into one (time x symbol) table;
+    - extracting every pair's fully aligned rows, re-joining the two frames per pair with pandas
+      versus slicing the panel's columns.
+Both approaches are checked to produce identical tables.
+
+Run from the repository root:
+    python -m Benchmarks.bench_price_panel
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from Benchmarks.synthetic import make_universe
+from Data.price_panel import PricePanel
+
+
+def with_chunk_repeats(df, chunk_rows, rng, missing):
+    """
+    Drops a fraction of bars and repeats the first bar of every chunk, as overlapping fetch windows do.
+    """
+    df = df.iloc[rng.random(len(df)) >= missing]
+    boundaries = np.arange(chunk_rows, len(df), chunk_rows)
+    return pd.concat([df, df.iloc[boundaries]])
+
+
+def concat_panel(data):
+    frames = [df[~df.index.duplicated(keep='last')]['Price'].rename(symbol) for symbol, df in data.items()]
+    return pd.concat(frames, axis=1).sort_index()
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def run(n_pairs=150, n_rows=50_000, chunk_rows=5_000, missing=0.05, seed=0):
+    rng = np.random.default_rng(seed)
+    universe, pairs = make_universe(n_pairs, n_rows, frequency='1min', seed=seed)
+    data = {symbol: with_chunk_repeats(df, chunk_rows, rng, missing) for symbol, df in universe.items()}
+    print(f"{len(data)} symbols x {n_rows:,} minute bars, {missing:.0%} missing, repeated chunk boundaries")
+
+    concat_time, expected = timed(lambda: concat_panel(data))
+    panel_time, panel = timed(lambda: PricePanel.from_frames(data))
+    pd.testing.assert_frame_equal(panel.to_frame(), expected, check_freq=False)
+    print(f"{'align universe':<22} concat: {concat_time:7.3f}s | PricePanel: {panel_time:7.3f}s | "
+          f"speedup {concat_time / panel_time:5.1f}x")
+
+    def concat_pairs():
+        return [concat_panel({dependent: data[dependent], independent: data[independent]}).dropna()
+                for dependent, independent in pairs]
+
+    def panel_pairs():
+        return [panel.to_frame([dependent, independent], rows=panel.rows_valid([dependent, independent]))
+                for dependent, independent in pairs]
+
+    concat_time, expected_pairs = timed(concat_pairs)
+    panel_time, panel_pair_frames = timed(panel_pairs)
+    for expected_pair, panel_pair in zip(expected_pairs, panel_pair_frames):
+        pd.testing.assert_frame_equal(panel_pair, expected_pair, check_freq=False)
+    print(f"{'align every pair':<22} concat: {concat_time:7.3f}s | PricePanel: {panel_time:7.3f}s | "
+          f"speedup {concat_time / panel_time:5.1f}x")
+    print("Parity check passed: panel tables match the concat joins.")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,102 @@
+"""
+Compares load time and peak RSS of the legacy JSON cache against the columnar price store.
+
+Each load runs in a fresh process so the reported peak RSS belongs to that load alone.
+
+Run from the repository root:
+    python -m Benchmarks.bench_price_store
+"""
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from Data.price_store import ColumnarPriceStore, JsonPriceStore
+
+BAR_SIZE = '1 min'
+
+
+def make_prices(n_rows, seed):
+    """
+    Builds a tz-aware minute-bar price frame shaped like DataFetcher output.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2020-01-02 09:30', periods=n_rows, freq='min', tz='America/New_York', name='date')
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 1e-4, n_rows)))
+    return pd.DataFrame({'Price': prices}, index=index)
+
+
+def _load(kind, path, symbols, queue):
+    start = time.perf_counter()
+    if kind == 'json':
+        store = JsonPriceStore(path)
+    else:
+        store = ColumnarPriceStore(path)
+    data = store.load_many(symbols, BAR_SIZE, mmap=True) if kind == 'mmap' else store.load_many(symbols, BAR_SIZE)
+    total = sum(float(df['Price'].sum()) for df in data.values())
+    elapsed = time.perf_counter() - start
+    queue.put((elapsed, peak_rss_mb(), total))
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of the current process in MB.
+
+    VmHWM is reset by exec, unlike ru_maxrss which a spawned child inherits from its parent.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(kind, path, symbols):
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=_load, args=(kind, path, symbols, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def run(n_symbols=4, n_rows=200_000):
+    symbols = [f"SYM{i}" for i in range(n_symbols)]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_path = os.path.join(tmp_dir, 'all_symbols_data.json')
+        columnar_dir = os.path.join(tmp_dir, 'columnar')
+        json_store = JsonPriceStore(json_path)
+        columnar_store = ColumnarPriceStore(columnar_dir)
+
+        frames = {symbol: make_prices(n_rows, seed) for seed, symbol in enumerate(symbols)}
+
+        start = time.perf_counter()
+        for symbol, df in frames.items():
+            json_store.save(symbol, BAR_SIZE, df)
+        json_save = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for symbol, df in frames.items():
+            columnar_store.save(symbol, BAR_SIZE, df)
+        columnar_save = time.perf_counter() - start
+
+        print(f"{n_symbols} symbols x {n_rows:,} minute bars")
+        print(f"{'backend':<10} {'save (s)':>10} {'load (s)':>10} {'peak RSS (MB)':>15}")
+        for kind, path, save_time in (('json', json_path, json_save),
+                                      ('columnar', columnar_dir, columnar_save),
+                                      ('mmap', columnar_dir, columnar_save)):
+            load_time, peak_rss, _ = measure(kind, path, symbols)
+            print(f"{kind:<10} {save_time:>10.3f} {load_time:>10.3f} {peak_rss:>15.1f}")
+
+
+if __name__ == "__main__":
+    run()
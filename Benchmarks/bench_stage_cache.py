@@ -0,0 +1,57 @@
+"""
+Checks that the stage cache serves exactly what a fresh run computes, and times cold against warm runs.
+
+A synthetic pair is run through PairsTradingStrategy with a cache_dir: once cold, once warm, then
+with its legs swapped against the same cache. The swapped run is a different regression and must
+match a fresh swapped run, not the cached outputs of the original order.
+
+Run from the repository root:
+    python -m Benchmarks.bench_stage_cache
+"""
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from Benchmarks.synthetic import make_pair
+from pairs_trading_strategy import PairsTradingStrategy
+
+
+def run_strategy(symbols, data, data_dir, cache_dir=None):
+    strategy = PairsTradingStrategy(symbols, None, None, data_dir=data_dir, plot_mode='none', cache_dir=cache_dir)
+    strategy.fetch_data = lambda: strategy.data.update({symbol: data[symbol] for symbol in symbols})
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        strategy.run()
+    return strategy, time.perf_counter() - start
+
+
+def outputs(strategy):
+    return strategy.hedge_ratio, strategy.test_results['Cumulative_Return'].to_numpy()
+
+
+def run(n_rows=5_000):
+    dependent, independent = make_pair(n_rows, seed=0)
+    data = {'A': dependent, 'B': independent}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_dir = os.path.join(tmp_dir, 'cache')
+        cold, cold_time = run_strategy(['A', 'B'], data, tmp_dir, cache_dir)
+        warm, warm_time = run_strategy(['A', 'B'], data, tmp_dir, cache_dir)
+        assert warm.cache.hits > 0 and warm.cache.misses == 0, (warm.cache.hits, warm.cache.misses)
+        np.testing.assert_array_equal(outputs(warm)[1], outputs(cold)[1])
+
+        swapped, _ = run_strategy(['B', 'A'], data, tmp_dir, cache_dir)
+        fresh, _ = run_strategy(['B', 'A'], data, tmp_dir)
+        assert swapped.cache.hits == 0, swapped.cache.hits
+        assert swapped.hedge_ratio == fresh.hedge_ratio != cold.hedge_ratio
+        np.testing.assert_array_equal(outputs(swapped)[1], outputs(fresh)[1])
+
+    print("Cache check passed: warm runs match cold ones and swapped legs never hit the other order's entries.")
+    print(f"{n_rows:,} bars | cold {cold_time:.3f}s | warm {warm_time:.3f}s | speedup {cold_time / warm_time:4.1f}x")
+
+
+if __name__ == "__main__":
+    run()
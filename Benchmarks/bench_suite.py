@@ -0,0 +1,186 @@
+"""
+Times every pipeline component on synthetic cointegrated pairs and compares against a stored baseline.
+
+Components: DataPreprocessor.merge_data, HedgeRatioCalculator, SpreadCalculator (spread + z-score),
+SignalGenerator.generate_signals, Backtester.backtest, Evaluator (Sharpe ratio + max drawdown) and
+the JSON price store's save and load. JSON is skipped above --json-max-rows, where a single
+document of that size is impractical.
+
+Results are written as JSON (one entry per component and size, sorted) and compared with the
+baseline; the run exits with status 1 when a component is slower than the baseline by more than
+--tolerance (timings under --min-seconds are not flagged).
+
+Run from the repository root:
+    python -m Benchmarks.bench_suite
+    python -m Benchmarks.bench_suite --sizes 1000 100000 --update-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from Benchmarks.synthetic import make_pair
+from Data.data_preprocessor import DataPreprocessor
+from Data.price_store import JsonPriceStore
+from Evaluation.backtester import Backtester
+from Evaluation.evaluator import Evaluator
+from Utils.hedge_ratio_calculator import HedgeRatioCalculator
+from Utils.signal_generator import SignalGenerator
+from Utils.spread_calculator import SpreadCalculator
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline_suite.json')
+DEPENDENT, INDEPENDENT = 'Price_DEP', 'Price_IND'
+
+
+def timed(function, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_size(n_rows, frequency, json_max_rows, seed=0):
+    """
+    Times each component on one synthetic pair of n_rows bars.
+
+    Returns:
+        list: {'component', 'rows', 'seconds', 'rows_per_s'} entries.
+    """
+    repeat = 5 if n_rows <= 100_000 else 1
+    dependent, independent = make_pair(n_rows, frequency, seed=seed)
+    data = {'DEP': dependent, 'IND': independent}
+    timings = {}
+
+    timings['merge_data'], merged = timed(lambda: DataPreprocessor(data).merge_data(), repeat)
+
+    def hedge_ratio():
+        return HedgeRatioCalculator(merged, DEPENDENT, INDEPENDENT).calculate_hedge_ratio()
+
+    timings['hedge_ratio'], hedge = timed(hedge_ratio, repeat)
+
+    def zscore():
+        calculator = SpreadCalculator(merged, hedge, DEPENDENT, INDEPENDENT, window=20)
+        calculator.compute_spread()
+        return calculator.compute_zscore()
+
+    timings['compute_zscore'], zscores = timed(zscore, repeat)
+    del merged
+    timings['generate_signals'], signals = timed(lambda: SignalGenerator(zscores).generate_signals(), repeat)
+    del zscores
+    timings['backtest'], results = timed(lambda: Backtester(signals, DEPENDENT, INDEPENDENT, hedge).backtest(),
+                                         repeat)
+    del signals
+
+    def evaluate():
+        evaluator = Evaluator(results)
+        return evaluator.compute_sharpe_ratio(), evaluator.compute_max_drawdown()
+
+    timings['evaluator'], _ = timed(evaluate, repeat)
+    del results
+
+    if n_rows <= json_max_rows:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'all_symbols_data.json')
+
+            def save():
+                store = JsonPriceStore(path)
+                for symbol, df in data.items():
+                    store.save(symbol, '1 day', df)
+
+            timings['json_save'], _ = timed(save, repeat)
+            timings['json_load'], _ = timed(lambda: JsonPriceStore(path).load_many(list(data), '1 day'), repeat)
+
+    return [{'component': component, 'rows': n_rows, 'seconds': seconds, 'rows_per_s': n_rows / seconds}
+            for component, seconds in timings.items()]
+
+
+def compare(results, baseline):
+    """
+    Matches results to baseline entries by (component, rows).
+
+    Returns:
+        list: (component, rows, baseline seconds, seconds, ratio) for every matched entry.
+    """
+    reference = {(entry['component'], entry['rows']): entry['seconds'] for entry in baseline['results']}
+    rows = []
+    for entry in results:
+        before = reference.get((entry['component'], entry['rows']))
+        if before is not None:
+            rows.append((entry['component'], entry['rows'], before, entry['seconds'], entry['seconds'] / before))
+    return rows
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark every pipeline component on synthetic pairs.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 10_000_000])
+    parser.add_argument('--frequency', default='1min',
+                        help="Bar frequency of the synthetic data, e.g. '1min' or '1D'.")
+    parser.add_argument('--json-max-rows', type=int, default=1_000_000)
+    parser.add_argument('--output', default=None, help='Write the results JSON here.')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help='Store these results as the new baseline.')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='Allowed slowdown against the baseline before failing (0.5 = 50%%).')
+    parser.add_argument('--min-seconds', type=float, default=0.05,
+                        help='Timings below this in both runs are reported but never flagged, as they are noise.')
+    return parser.parse_args()
+
+
+def run():
+    args = parse_args()
+    results = []
+    for n_rows in args.sizes:
+        print(f"Timing components on {n_rows:,} rows...")
+        results.extend(run_size(n_rows, args.frequency, args.json_max_rows))
+    results.sort(key=lambda entry: (entry['rows'], entry['component']))
+    report = {
+        'schema': 1,
+        'frequency': args.frequency,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+    print(f"{'component':<18} {'rows':>12} {'seconds':>10} {'rows/s':>14}")
+    for entry in results:
+        print(f"{entry['component']:<18} {entry['rows']:>12,} {entry['seconds']:>10.4f} {entry['rows_per_s']:>14,.0f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to store one.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = 0
+    print(f"\n{'component':<18} {'rows':>12} {'baseline (s)':>13} {'now (s)':>10} {'ratio':>7}")
+    for component, n_rows, before, seconds, ratio in compare(results, baseline):
+        flag = ''
+        if ratio > 1 + args.tolerance and max(before, seconds) >= args.min_seconds:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f"{component:<18} {n_rows:>12,} {before:>13.4f} {seconds:>10.4f} {ratio:>7.2f}{flag}")
+    print(f"{regressions} regression(s) beyond {args.tolerance:.0%} of the baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,130 @@
+"""
+Checks that SweepScheduler resumes an interrupted sweep without redoing finished jobs, and reports
+its throughput.
+
+A synthetic universe is stored in a ColumnarPriceStore and swept over pairs x a parameter grid x
+walk-forward folds. The sweep runs once uninterrupted; a second copy runs in a child process that
+is killed once part of its jobs are persisted, and is then resumed. The resumed sweep must only run
+the jobs the killed one had not persisted, and end with the same results as the uninterrupted one.
+Finally bars are appended to one pair's legs: rebuilding the jobs must rerun that pair's jobs only.
+
+Run from the repository root:
+    python -m Benchmarks.bench_sweep_scheduler
+"""
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+
+from Benchmarks.synthetic import make_universe
+from Data.data_preprocessor import DataPreprocessor
+from Data.price_store import ColumnarPriceStore
+from Evaluation.sweep_scheduler import SweepScheduler, load_pair, sweep_jobs
+
+BAR_SIZE = '1 day'
+PARAM_GRID = {'window': [10, 20, 40], 'entry_threshold': [1.5, 2.0, 2.5], 'exit_threshold': [0.25, 0.5]}
+WALK_FORWARD = (500, 250)
+KEYS = ['dependent', 'independent', 'window', 'entry_threshold', 'exit_threshold', 'fold']
+
+
+def make_jobs(store_dir, n_pairs, n_rows, save=True):
+    universe, pairs = make_universe(n_pairs, n_rows, frequency='1D', seed=0)
+    if save:
+        store = ColumnarPriceStore(store_dir)
+        for symbol, df in universe.items():
+            store.save(symbol, BAR_SIZE, df)
+    folds = {}
+    for pair in pairs:
+        preprocessor = DataPreprocessor({})
+        preprocessor.merged_data = load_pair(store_dir, BAR_SIZE, *pair)
+        folds[pair] = preprocessor.walk_forward_folds(*WALK_FORWARD)
+    return sweep_jobs(pairs, PARAM_GRID, store_dir, BAR_SIZE, folds=folds)
+
+
+def run_sweep(db_path, jobs, max_workers, batch_size=100):
+    scheduler = SweepScheduler(db_path, max_workers=max_workers, batch_size=batch_size, report_seconds=5.0)
+    scheduler.add_jobs(jobs)
+    counts = scheduler.run()
+    results = scheduler.results()
+    scheduler.close()
+    return counts, results
+
+
+def done_jobs(db_path):
+    if not os.path.exists(db_path):
+        return 0
+    connection = sqlite3.connect(db_path)
+    try:
+        return connection.execute("SELECT COUNT(*) FROM jobs WHERE status = 'done'").fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        connection.close()
+
+
+def extend_pair(store_dir, pair, n_bars=20):
+    """
+    Appends n_bars business days to both legs of a pair, repeating their last prices.
+    """
+    store = ColumnarPriceStore(store_dir)
+    for symbol in pair:
+        df = store.load(symbol, BAR_SIZE)
+        dates = pd.bdate_range(df.index[-1], periods=n_bars + 1, tz=df.index.tz, name=df.index.name)[1:]
+        store.save(symbol, BAR_SIZE, pd.concat([df, pd.DataFrame({'Price': df['Price'].iloc[-1]}, index=dates)]))
+
+
+def sorted_results(results):
+    return results.sort_values(KEYS).reset_index(drop=True)[KEYS + ['Sharpe_Ratio', 'Max_Drawdown', 'Trades']]
+
+
+def run(n_pairs=8, n_rows=3_000, max_workers=2):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jobs = make_jobs(os.path.join(tmp_dir, 'store'), n_pairs, n_rows)
+        print(f"{len(jobs):,} jobs: {n_pairs} pairs x {len(jobs) // n_pairs} parameter sets and folds")
+
+        start = time.perf_counter()
+        counts, expected = run_sweep(os.path.join(tmp_dir, 'clean.db'), jobs, max_workers)
+        print(f"Uninterrupted sweep: {time.perf_counter() - start:.2f}s, {counts}")
+
+        # Kill a second sweep once part of its results are persisted, then resume it. The killed sweep
+        # runs its jobs in its own process: pool workers would outlive a killed parent.
+        db_path = os.path.join(tmp_dir, 'interrupted.db')
+        ctx = multiprocessing.get_context('spawn')
+        process = ctx.Process(target=run_sweep, args=(db_path, jobs, 1, 20))
+        process.start()
+        while done_jobs(db_path) < len(jobs) // 3 and process.is_alive():
+            time.sleep(0.05)
+        process.kill()
+        process.join()
+        persisted = done_jobs(db_path)
+        print(f"Killed the second sweep with {persisted:,} of {len(jobs):,} jobs persisted; resuming")
+        assert 0 < persisted < len(jobs), persisted
+
+        scheduler = SweepScheduler(db_path, max_workers=max_workers)
+        scheduler.add_jobs(jobs)
+        pending = scheduler.status_counts().get('pending', 0)
+        assert pending == len(jobs) - persisted, (pending, persisted)
+        scheduler.run()
+        resumed = scheduler.results()
+        scheduler.close()
+
+        pd.testing.assert_frame_equal(sorted_results(resumed), sorted_results(expected))
+        print("Resume check passed: only unfinished jobs reran and results match the uninterrupted sweep.")
+
+        store_dir = os.path.join(tmp_dir, 'store')
+        extend_pair(store_dir, ('DEP0', 'IND0'))
+        extended = make_jobs(store_dir, n_pairs, n_rows, save=False)
+        scheduler = SweepScheduler(db_path, max_workers=max_workers)
+        scheduler.add_jobs(extended)
+        pending = scheduler.status_counts().get('pending', 0)
+        scheduler.close()
+        stale = sum(job['dependent'] == 'DEP0' for job in extended)
+        assert pending == stale, (pending, stale)
+        print(f"Store version check passed: extending one pair queued its {stale} jobs again.")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,105 @@
+"""
+Synthetic cointegrated price data for benchmarks and offline runs, no IB gateway needed.
+
+Each pair is an independent leg following a geometric random walk and a dependent leg equal to
+intercept + hedge_ratio x independent + an Ornstein-Uhlenbeck spread, so the pair is cointegrated
+with a known hedge ratio and spread half-life. Frames have the DataFetcher layout: a 'Price' column
+on a tz-aware 'date' index. make_factor_panel builds a wider universe where only some pairs are
+cointegrated, for pair screening.
+"""
+import numpy as np
+import pandas as pd
+
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=30)
+SESSION_MINUTES = 390
+
+
+def ou_process(n_rows, half_life, sigma, rng, block=256):
+    """
+    Simulates a zero-mean discrete OU (AR(1)) process without a per-step Python loop.
+
+    Within each block of `block` steps the process is a fixed lower-triangular decay matrix applied
+    to the shocks; only the block starting values are carried sequentially.
+    """
+    phi = 0.5 ** (1 / half_life)
+    n_blocks = -(-n_rows // block)
+    shocks = rng.normal(0, sigma, (n_blocks, block))
+    lags = np.arange(block)[:, None] - np.arange(block)[None, :]
+    decay = np.where(lags >= 0, phi ** np.maximum(lags, 0), 0.0)
+    within = shocks @ decay.T
+    carry_weights = phi ** np.arange(1, block + 1)
+
+    start = 0.0
+    values = np.empty((n_blocks, block))
+    for b in range(n_blocks):
+        values[b] = within[b] + carry_weights * start
+        start = values[b, -1]
+    return values.ravel()[:n_rows]
+
+
+def make_index(n_rows, frequency='1D', start='2000-01-03', tz='America/New_York'):
+    """
+    Bar timestamps: business days for daily bars, regular-session (9:30-16:00) bars for intraday ones.
+    """
+    delta = pd.Timedelta(frequency)
+    if delta >= pd.Timedelta(days=1):
+        return pd.bdate_range(start, periods=n_rows, tz=tz, name='date')
+
+    per_session = -(-pd.Timedelta(minutes=SESSION_MINUTES) // delta)
+    days = pd.bdate_range(start, periods=-(-n_rows // per_session))
+    offsets = np.arange(per_session) * delta.to_timedelta64() + SESSION_OPEN.to_timedelta64()
+    local = (days.values[:, None] + offsets[None, :]).ravel()[:n_rows]
+    return pd.DatetimeIndex(local, name='date').tz_localize(tz)
+
+
+def make_pair(n_rows, frequency='1D', hedge_ratio=1.5, intercept=20.0, half_life=20, spread_sigma=0.5,
+              volatility=0.01, seed=0):
+    """
+    One cointegrated pair as (dependent, independent) price frames.
+    """
+    rng = np.random.default_rng(seed)
+    index = make_index(n_rows, frequency)
+    independent = 100 * np.exp(np.cumsum(rng.normal(0, volatility, n_rows)))
+    dependent = intercept + hedge_ratio * independent + ou_process(n_rows, half_life, spread_sigma, rng)
+    return pd.DataFrame({'Price': dependent}, index=index), pd.DataFrame({'Price': independent}, index=index)
+
+
+def make_merged_pair(n_rows, frequency='1D', seed=0, **pair_params):
+    """
+    One cointegrated pair as a merged frame with 'Price_Y' (dependent) and 'Price_X' columns, as
+    DataPreprocessor.merge_data names the legs of symbols 'Y' and 'X'.
+    """
+    dependent, independent = make_pair(n_rows, frequency, seed=seed, **pair_params)
+    return pd.DataFrame({'Price_Y': dependent['Price'], 'Price_X': independent['Price']})
+
+
+def make_universe(n_pairs, n_rows, frequency='1D', seed=0, **pair_params):
+    """
+    A universe of n_pairs independent cointegrated pairs.
+
+    Returns:
+        tuple: (dict of symbol to price frame, list of (dependent, independent) symbol pairs)
+    """
+    data = {}
+    pairs = []
+    for k in range(n_pairs):
+        dependent, independent = make_pair(n_rows, frequency, seed=seed + k, **pair_params)
+        data[f'DEP{k}'], data[f'IND{k}'] = dependent, independent
+        pairs.append((f'DEP{k}', f'IND{k}'))
+    return data, pairs
+
+
+def make_factor_panel(n_symbols, n_rows, frequency='1D', n_factors=10, half_life=7, noise_sigma=1.0,
+                      volatility=0.01, seed=0):
+    """
+    Aligned prices of n_symbols symbols, one column each, loading on n_factors shared geometric
+    random walks plus their own OU noise: symbols on the same factor are cointegrated, most other
+    pairs are not.
+    """
+    rng = np.random.default_rng(seed)
+    factors = 100 * np.exp(np.cumsum(rng.normal(0, volatility, (n_rows, n_factors)), axis=0))
+    loading = rng.integers(0, n_factors, n_symbols)
+    scale = rng.uniform(0.5, 2.0, n_symbols)
+    noise = np.column_stack([ou_process(n_rows, half_life, noise_sigma, rng) for _ in range(n_symbols)])
+    return pd.DataFrame(50 + factors[:, loading] * scale + noise, index=make_index(n_rows, frequency),
+                        columns=[f'SYM{i}' for i in range(n_symbols)])
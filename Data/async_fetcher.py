@@ -0,0 +1,264 @@
+import asyncio
+import math
+from collections import defaultdict, deque
+
+import pandas as pd
+
+from Data.data_fetcher import DataFetcher
+
+
+class TokenBucket:
+    """
+    Asyncio token-bucket rate limiter.
+
+    Holds up to `capacity` tokens, refilled continuously at `rate` tokens per second. acquire()
+    waits until a token is available instead of sleeping for a fixed interval.
+    """
+
+    def __init__(self, rate, capacity, clock=None):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock or (lambda: asyncio.get_running_loop().time())
+        self.updated_at = None
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        if self.updated_at is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class SlidingWindowLimiter:
+    """
+    Asyncio limiter allowing at most `max_requests` acquisitions within any `period` seconds.
+
+    Keeps the times of the last max_requests acquisitions; acquire() waits until the oldest of them
+    is `period` seconds old. Unlike a token bucket, a full burst followed by refills can never put
+    more than max_requests into one window.
+    """
+
+    def __init__(self, max_requests, period, clock=None):
+        self.max_requests = max_requests
+        self.period = period
+        self.clock = clock or (lambda: asyncio.get_running_loop().time())
+        self.issued = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = self.clock()
+                while self.issued and now - self.issued[0] >= self.period:
+                    self.issued.popleft()
+                if len(self.issued) < self.max_requests:
+                    break
+                await asyncio.sleep(self.period - (now - self.issued[0]))
+            self.issued.append(now)
+
+
+class AsyncDataFetcher:
+    """
+    Fetches historical bars for many symbols concurrently over a single IBroker connection.
+
+    Every symbol's date range is split into fixed calendar chunks up front, so chunks of all symbols
+    can be in flight at once. Requests are paced by a global token bucket and a sliding-window
+    limiter per contract following the IBroker historical data pacing rules instead of fixed sleeps:
+        - at most 60 requests in any 10 minutes for bars smaller than 1 minute (hard limit);
+        - fewer than 6 requests for the same contract within 2 seconds;
+        - at most 50 simultaneous open historical data requests.
+    For bars of 1 minute and larger IBroker only soft-throttles, so the global bucket is looser.
+    """
+
+    # Bar sizes under one minute are subject to the hard 60-requests-per-10-minutes limit
+    SMALL_BAR_SIZES = {'1 secs', '5 secs', '10 secs', '15 secs', '30 secs'}
+    MAX_OPEN_REQUESTS = 50
+    MAX_CONTRACT_REQUESTS = 5
+
+    def __init__(self, ib=None, ib_port=7497, client_id=1, max_in_flight=8, requests_per_second=None,
+                 timeout=120):
+        self.ib = ib
+        self.ib_port = ib_port
+        self.client_id = client_id
+        self.max_in_flight = min(max_in_flight, self.MAX_OPEN_REQUESTS)
+        self.requests_per_second = requests_per_second
+        self.timeout = timeout
+        self._owns_connection = ib is None
+
+    def _global_bucket(self, bar_size):
+        if self.requests_per_second is not None:
+            return TokenBucket(self.requests_per_second, max(1, int(self.requests_per_second)))
+        if bar_size in self.SMALL_BAR_SIZES:
+            # A burst would break the sliding 10-minute window, so allow one request every 10 seconds
+            return TokenBucket(60 / 600, 1)
+        return TokenBucket(10, 10)
+
+    @staticmethod
+    def chunk_windows(start_date, end_date, chunk_days):
+        """
+        Splits [start_date, end_date] into windows of at most chunk_days, newest first.
+
+        Returns:
+            list: (window_start, window_end, duration_days) tuples.
+        """
+        windows = []
+        current_end = end_date
+        while current_end > start_date:
+            window_start = max(start_date, current_end - pd.Timedelta(days=chunk_days))
+            duration_days = max(1, math.ceil((current_end - window_start) / pd.Timedelta(days=1)))
+            windows.append((window_start, current_end, duration_days))
+            current_end = window_start
+        return windows
+
+    @staticmethod
+    def covered_spans(chunks):
+        """
+        Spans to mark as covered from a symbol's completed chunks: from the first to the last bar of
+        each run of adjacent windows that all returned bars. Windows that came back empty or timed
+        out stay uncovered, so the next run requests them again.
+
+        Args:
+            chunks (list): ((window_start, window_end), DataFrame or None) pairs, as fetch_spans returns.
+
+        Returns:
+            list: (start, end) spans.
+        """
+        spans = []
+        previous_end = None
+        for (window_start, window_end), df in sorted(chunks, key=lambda chunk: chunk[0][0]):
+            if df is None or not len(df):
+                previous_end = None
+                continue
+            if spans and window_start == previous_end:
+                spans[-1] = (spans[-1][0], df.index.max())
+            else:
+                spans.append((df.index.min(), df.index.max()))
+            previous_end = window_end
+        return spans
+
+    async def _request_chunk(self, symbol, bar_size, window, semaphore, global_bucket, symbol_limiter):
+        window_start, window_end, duration_days = window
+        tz = DataFetcher.BAR_SETTINGS[bar_size][2]
+        from ib_insync import Stock
+
+        async with semaphore:
+            await global_bucket.acquire()
+            # Last before the request, so the limiter's timestamps are the issue times
+            await symbol_limiter.acquire()
+            end_datetime_str = window_end.strftime("%Y%m%d %H:%M:%S")
+            print(f"Fetching data for {symbol} from {end_datetime_str} back {duration_days} D.")
+            bars = await self.ib.reqHistoricalDataAsync(
+                Stock(symbol, 'SMART', 'USD'),
+                endDateTime=end_datetime_str,
+                durationStr=f"{duration_days} D",
+                barSizeSetting=bar_size,
+                whatToShow='TRADES',
+                useRTH=True,
+                formatDate=1,
+                keepUpToDate=False,
+                timeout=self.timeout
+            )
+
+        if not bars:
+            return None
+        df = DataFetcher.bars_to_frame(bars, tz)
+        return df[(df.index >= window_start) & (df.index <= window_end)]
+
+    async def fetch_spans(self, spans, bar_size='1 day'):
+        """
+        Fetches the given spans for all symbols concurrently.
+
+        Args:
+            spans (dict): Symbol to list of (start, end) spans.
+
+        Returns:
+            dict: Symbol to list of ((window_start, window_end), DataFrame or None) for every chunk
+                  that completed. Chunks that failed are omitted so callers can retry them.
+        """
+        chunk_days = DataFetcher.BAR_SETTINGS[bar_size][0]
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        global_bucket = self._global_bucket(bar_size)
+        # Six requests for one contract within 2 seconds is a pacing violation; stay one below
+        symbol_limiters = defaultdict(lambda: SlidingWindowLimiter(self.MAX_CONTRACT_REQUESTS, 2.0))
+
+        jobs = []
+        for symbol, symbol_spans in spans.items():
+            for span_start, span_end in symbol_spans:
+                for window in self.chunk_windows(span_start, span_end, chunk_days):
+                    jobs.append((symbol, window))
+
+        if self.ib is None:
+            from ib_insync import IB
+
+            self.ib = IB()
+        if not self.ib.isConnected():
+            await self.ib.connectAsync('127.0.0.1', self.ib_port, clientId=self.client_id)
+
+        try:
+            outcomes = await asyncio.gather(
+                *(self._request_chunk(symbol, bar_size, window, semaphore, global_bucket, symbol_limiters[symbol])
+                  for symbol, window in jobs),
+                return_exceptions=True
+            )
+        finally:
+            if self._owns_connection:
+                self.ib.disconnect()
+
+        results = defaultdict(list)
+        for (symbol, window), outcome in zip(jobs, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"Error fetching data for symbol {symbol} ending at {window[1]}: {outcome}")
+                continue
+            results[symbol].append(((window[0], window[1]), outcome))
+        return results
+
+    def fetch_incremental_many(self, symbols, start_date, end_date, store, coverage, bar_size='1 day'):
+        """
+        Concurrent counterpart of DataFetcher.fetch_incremental for several symbols.
+
+        Only the spans missing from the coverage index are requested; chunks that returned bars are
+        merged into the store and marked as covered (see covered_spans).
+
+        Returns:
+            dict: Symbol to close prices within [start_date, end_date], for symbols with data.
+        """
+        stored = {}
+        missing = {}
+        for symbol in symbols:
+            stored[symbol] = DataFetcher.load_stored(store, symbol, bar_size)
+            if stored[symbol] is not None and len(stored[symbol]) and not coverage.spans(symbol, bar_size):
+                coverage.add(symbol, bar_size, stored[symbol].index.min(), stored[symbol].index.max())
+            gaps = coverage.missing(symbol, bar_size, start_date, end_date)
+            if gaps:
+                missing[symbol] = gaps
+
+        if missing:
+            results = asyncio.run(self.fetch_spans(missing, bar_size))
+            for symbol, chunks in results.items():
+                frames = [df for _, df in chunks if df is not None and len(df)]
+                if frames:
+                    stored[symbol] = DataFetcher.merge_into_store(store, symbol, bar_size, stored[symbol],
+                                                                  pd.concat(frames))
+                for span_start, span_end in self.covered_spans(chunks):
+                    coverage.add(symbol, bar_size, span_start, span_end)
+            coverage.save()
+
+        data = {}
+        for symbol in symbols:
+            if stored[symbol] is None:
+                print(f"No data fetched for symbol {symbol}")
+                continue
+            df = stored[symbol]
+            data[symbol] = df[(df.index >= start_date) & (df.index <= end_date)]
+            print(f"{symbol}: {len(missing.get(symbol, []))} missing span(s) requested, "
+                  f"{len(data[symbol])} records available.")
+        return data
@@ -0,0 +1,73 @@
+import json
+import os
+
+import pandas as pd
+
+
+class CoverageIndex:
+    """
+    Records which [start, end] date spans have already been fetched per symbol and bar size.
+
+    A span is covered once the broker has been asked for it and the result stored, even if some of
+    it had no bars (weekends, holidays), so it is never requested again.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.coverage = {}
+
+        if os.path.exists(self.file_path):
+            with open(self.file_path, 'r') as f:
+                self.coverage = json.load(f)
+
+    def spans(self, symbol, bar_size):
+        """
+        Returns the covered spans of a symbol as a sorted list of (start, end) Timestamps.
+        """
+        return [(pd.Timestamp(start), pd.Timestamp(end))
+                for start, end in self.coverage.get(bar_size, {}).get(symbol, [])]
+
+    def add(self, symbol, bar_size, start, end):
+        """
+        Marks [start, end] as covered, merging it with overlapping or touching spans.
+        """
+        spans = self.spans(symbol, bar_size) + [(pd.Timestamp(start), pd.Timestamp(end))]
+        spans.sort()
+
+        merged = [spans[0]]
+        for span_start, span_end in spans[1:]:
+            last_start, last_end = merged[-1]
+            if span_start <= last_end:
+                merged[-1] = (last_start, max(last_end, span_end))
+            else:
+                merged.append((span_start, span_end))
+
+        self.coverage.setdefault(bar_size, {})[symbol] = [[s.isoformat(), e.isoformat()] for s, e in merged]
+
+    def missing(self, symbol, bar_size, start, end):
+        """
+        Returns the sub-spans of [start, end] that are not covered yet.
+        """
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        gaps = []
+        cursor = start
+        for span_start, span_end in self.spans(symbol, bar_size):
+            if span_end < cursor:
+                continue
+            if span_start > end:
+                break
+            if span_start > cursor:
+                gaps.append((cursor, span_start))
+            cursor = max(cursor, span_end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def save(self):
+        """
+        Writes the index to disk, replacing the previous file atomically.
+        """
+        tmp_path = self.file_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.coverage, f, indent=2)
+        os.replace(tmp_path, self.file_path)
@@ -1,15 +1,25 @@
-from ib_insync import *
 import pandas as pd
 import numpy as np
 import time
 from datetime import datetime, timedelta
 
+from Data.price_panel import is_strictly_increasing, sorted_unique_rows
+
 
 class DataFetcher:
     """
     Fetches historical minute-level price data for a given symbol between start_date and end_date using IBroker API.
+
+    ib_insync is imported only when the API is actually used, so runs served from the local store
+    (and worker processes) never load it.
     """
 
+    # IBroker bar size -> (days per request, step back from the earliest bar, time zone to localize to)
+    BAR_SETTINGS = {
+        '1 day': (365, timedelta(days=1), 'America/New_York'),
+        '1 min': (30, timedelta(minutes=1), 'America/New_York'),
+    }
+
     def __init__(self, symbol, start_date, end_date, ib_port=7497, client_id=1):
         self.symbol = symbol
         self.start_date = start_date
@@ -23,6 +33,8 @@ class DataFetcher:
         """
         Establishes connection to the IBroker API.
         """
+        from ib_insync import IB
+
         self.ib = IB()
         self.ib.connect('127.0.0.1', self.ib_port, clientId=self.client_id)
 
@@ -33,76 +45,144 @@ class DataFetcher:
         if self.ib:
             self.ib.disconnect()
 
-    def fetch_data_minute_level(self):
+    @staticmethod
+    def to_timezone(index, tz):
+        """
+        Expresses a DatetimeIndex in tz: naive timestamps are taken as exchange local time,
+        tz-aware ones (intraday bars can come back in the TWS login time zone) are converted.
+        """
+        if tz is None:
+            return index
+        if index.tz is None:
+            return index.tz_localize(tz)
+        return index.tz_convert(tz)
+
+    @staticmethod
+    def bars_to_frame(bars, tz=None):
+        """
+        Converts IBroker bars to a DataFrame of close prices indexed by date.
+        """
+        from ib_insync import util
+
+        df = util.df(bars)
+        df['date'] = DataFetcher.to_timezone(pd.DatetimeIndex(pd.to_datetime(df['date'])), tz)
+        df.set_index('date', inplace=True)
+        df = df[['close']]
+        df.rename(columns={'close': 'Price'}, inplace=True)
+        return df
+
+    @staticmethod
+    def load_stored(store, symbol, bar_size):
+        """
+        Loads a symbol's stored bars in the bar size's time zone, or None if nothing is stored.
+
+        Minute bars saved before they were localized are read as exchange local time.
+        """
+        if not store.exists(symbol, bar_size):
+            return None
+        stored = store.load(symbol, bar_size)
+        return stored.set_axis(DataFetcher.to_timezone(stored.index, DataFetcher.BAR_SETTINGS[bar_size][2]))
+
+    @staticmethod
+    def sort_unique(df):
+        """
+        Sorts bars by date and drops repeated timestamps, keeping the later row of each.
+
+        Chunk windows share their boundary bars, so concatenated chunks repeat them.
+        """
+        keys = df.index.asi8
+        if is_strictly_increasing(keys):
+            return df
+        return df.iloc[sorted_unique_rows(keys)]
+
+    @staticmethod
+    def merge_into_store(store, symbol, bar_size, stored, fetched):
         """
-        Fetches the previous 90 days of minute-level historical close price data using the IBroker API.
-        The data is fetched in 30-day chunks per iteration to comply with API limitations.
+        Merges newly fetched bars into the stored ones (newer bars win at overlaps) and saves them.
 
         Returns:
-            pd.DataFrame or None: A DataFrame containing the close prices indexed by date,
-                                   or None if an error occurs.
+            pd.DataFrame: The merged data.
+        """
+        merged = DataFetcher.sort_unique(fetched if stored is None else pd.concat([stored, fetched]))
+        store.save(symbol, bar_size, merged)
+        return merged
+
+    def _fetch_chunks(self, start_date, end_date, bar_size):
+        """
+        Requests [start_date, end_date] from the connected API in chunks, walking back from end_date.
+
+        Returns:
+            pd.DataFrame or None: Close prices indexed by date, or None if no bars were returned.
+        """
+        from ib_insync import Stock
+
+        chunk_days, step, tz = self.BAR_SETTINGS[bar_size]
+
+        # Define the contract
+        contract = Stock(self.symbol, 'SMART', 'USD')
+
+        data_frames = []
+        current_end_date = end_date
+
+        while current_end_date > start_date:
+            # Calculate the duration to fetch (one chunk or the remaining days, at least one day)
+            remaining_days = (current_end_date - start_date).days
+            fetch_days = max(1, min(chunk_days, remaining_days))
+            duration_str = f"{fetch_days} D"  # e.g., '365 D'
+
+            # Format the endDateTime as required by IBroker API (YYYYMMDD HH:MM:SS)
+            end_datetime_str = current_end_date.strftime("%Y%m%d %H:%M:%S")
+
+            print(f"Fetching data for {self.symbol} from {end_datetime_str} back {duration_str}.")
+
+            # Request historical data
+            bars = self.ib.reqHistoricalData(
+                contract,
+                endDateTime=end_datetime_str,
+                durationStr=duration_str,
+                barSizeSetting=bar_size,
+                whatToShow='TRADES',
+                useRTH=True,
+                formatDate=1,
+                keepUpToDate=False
+            )
+
+            if not bars:
+                print(f"No bars returned for {self.symbol} ending at {current_end_date}.")
+                break
+
+            # Convert bars to DataFrame
+            df = self.bars_to_frame(bars, tz)
+
+            # Append to list
+            data_frames.append(df)
+
+            # Update current_end_date for next iteration
+            earliest_date = df.index.min()
+            current_end_date = earliest_date - step
+
+            print(f"Fetched {len(df)} records. Next end_date: {current_end_date}")
+
+            # Sleep to comply with rate limits
+            time.sleep(2)
+
+        if not data_frames:
+            return None
+
+        # Concatenate all DataFrames (newest chunk first), sorted once without the repeated boundary bars
+        data = self.sort_unique(pd.concat(data_frames[::-1]))
+        # Filter data within the start_date and end_date
+        return data[(data.index >= start_date) & (data.index <= end_date)]
+
+    def _fetch(self, bar_size):
+        """
+        Fetches the full [start_date, end_date] window for the given bar size.
         """
         try:
             self.connect()
+            self.data = self._fetch_chunks(self.start_date, self.end_date, bar_size)
 
-            # Define the contract
-            contract = Stock(self.symbol, 'SMART', 'USD')
-
-            data_frames = []
-            current_end_date = self.end_date
-
-            while current_end_date > self.start_date:
-                # Calculate the duration to fetch (30 days or remaining days)
-                remaining_days = (current_end_date - self.start_date).days
-                fetch_days = 30 if remaining_days >= 30 else remaining_days
-                duration_str = f"{fetch_days} D"  # e.g., '30 D'
-
-                # Format the endDateTime as required by IBroker API (YYYYMMDD HH:MM:SS)
-                end_datetime_str = current_end_date.strftime("%Y%m%d %H:%M:%S")
-
-                print(f"Fetching data for {self.symbol} from {end_datetime_str} back {duration_str}.")
-
-                # Request historical data
-                bars = self.ib.reqHistoricalData(
-                    contract,
-                    endDateTime=end_datetime_str,
-                    durationStr=duration_str,
-                    barSizeSetting='1 min',
-                    whatToShow='TRADES',
-                    useRTH=True,
-                    formatDate=1,
-                    keepUpToDate=False
-                )
-
-                if not bars:
-                    print(f"No bars returned for {self.symbol} ending at {current_end_date}.")
-                    break
-
-                # Convert bars to DataFrame
-                df = util.df(bars)
-                df['date'] = pd.to_datetime(df['date'])
-                df.set_index('date', inplace=True)
-                df = df[['close']]
-                df.rename(columns={'close': 'Price'}, inplace=True)
-
-                # Append to list
-                data_frames.append(df)
-
-                # Update current_end_date for next iteration
-                earliest_date = df.index.min()
-                current_end_date = earliest_date - timedelta(minutes=1)
-
-                print(f"Fetched {len(df)} records. Next end_date: {current_end_date}")
-
-                # Sleep to comply with rate limits
-                time.sleep(2)
-
-            # Concatenate all DataFrames
-            if data_frames:
-                self.data = pd.concat(data_frames)
-                self.data.sort_index(inplace=True)
-                # Filter data within the start_date and end_date
-                self.data = self.data[(self.data.index >= self.start_date) & (self.data.index <= self.end_date)]
+            if self.data is not None:
                 print(f"Total records fetched: {len(self.data)}")
             else:
                 print(f"No data fetched for symbol {self.symbol}")
@@ -115,6 +195,18 @@ class DataFetcher:
         finally:
             self.disconnect()
 
+    def fetch_data_minute_level(self):
+        """
+        Fetches minute-level historical close price data using the IBroker API.
+        The data is fetched in 30-day chunks per iteration to comply with API limitations, and is
+        localized to America/New_York like the daily bars.
+
+        Returns:
+            pd.DataFrame or None: A DataFrame containing the close prices indexed by date,
+                                   or None if an error occurs.
+        """
+        return self._fetch('1 min')
+
     def fetch_data(self):
         """
         Fetches historical daily price data for the specified period.
@@ -124,77 +216,47 @@ class DataFetcher:
             pd.DataFrame or None: A DataFrame containing the close prices indexed by date,
                                    or None if an error occurs.
         """
-        try:
-            self.connect()
+        return self._fetch('1 day')
 
-            # Define the contract
-            contract = Stock(self.symbol, 'SMART', 'USD')
-
-            data_frames = []
-            current_end_date = self.end_date
-
-            while current_end_date > self.start_date:
-                # Calculate the duration to fetch (1 year or remaining days)
-                remaining_days = (current_end_date - self.start_date).days
-                fetch_days = min(365, remaining_days)
-                duration_str = f"{fetch_days} D"  # e.g., '365 D'
-
-                # Format the endDateTime as required by IBroker API (YYYYMMDD HH:MM:SS)
-                end_datetime_str = current_end_date.strftime("%Y%m%d %H:%M:%S")
-
-                print(f"Fetching data for {self.symbol} from {end_datetime_str} back {duration_str}.")
-
-                # Request historical data
-                bars = self.ib.reqHistoricalData(
-                    contract,
-                    endDateTime=end_datetime_str,
-                    durationStr=duration_str,
-                    barSizeSetting='1 day',
-                    whatToShow='TRADES',
-                    useRTH=True,
-                    formatDate=1,
-                    keepUpToDate=False
-                )
-
-                if not bars:
-                    print(f"No bars returned for {self.symbol} ending at {current_end_date}.")
-                    break
-
-                # Convert bars to DataFrame
-                df = util.df(bars)
-                df['date'] = pd.to_datetime(df['date']).dt.tz_localize('America/New_York')
-                df.set_index('date', inplace=True)
-                df = df[['close']]
-                df.rename(columns={'close': 'Price'}, inplace=True)
-
-                # Append to list
-                data_frames.append(df)
-
-                # Update current_end_date for next iteration
-                earliest_date = df.index.min()
-                current_end_date = earliest_date - timedelta(days=1)
-
-                print(f"Fetched {len(df)} records. Next end_date: {current_end_date}")
-
-                # Sleep to comply with rate limits
-                time.sleep(2)
-
-            # Concatenate all DataFrames
-            if data_frames:
-                self.data = pd.concat(data_frames)
-                self.data.sort_index(inplace=True)
-                # Filter data within the start_date and end_date
-                self.data = self.data[(self.data.index >= self.start_date) & (self.data.index <= self.end_date)]
-                print(f"Total records fetched: {len(self.data)}")
-            else:
-                print(f"No data fetched for symbol {self.symbol}")
+    def fetch_incremental(self, store, coverage, bar_size='1 day'):
+        """
+        Fetches only the parts of [start_date, end_date] missing from the store and merges them in.
 
-            return self.data
+        Spans already recorded in the coverage index are served from the store. Each missing span
+        is requested on its own and merged with the stored bars (newer bars win at overlaps), and
+        the span from its first to its last returned bar is marked as covered. Whatever returned no
+        bars (a failed request, or an empty chunk that ended the walk back) stays uncovered so the
+        next run retries it.
 
-        except Exception as e:
-            print(f"Error fetching data for symbol {self.symbol}: {e}")
+        Returns:
+            pd.DataFrame or None: Close prices within [start_date, end_date], or None if nothing is available.
+        """
+        stored = self.load_stored(store, self.symbol, bar_size)
+
+        # Data stored before the coverage index existed is assumed complete over its own extent
+        if stored is not None and len(stored) and not coverage.spans(self.symbol, bar_size):
+            coverage.add(self.symbol, bar_size, stored.index.min(), stored.index.max())
+
+        gaps = coverage.missing(self.symbol, bar_size, self.start_date, self.end_date)
+        if gaps:
+            try:
+                self.connect()
+                for gap_start, gap_end in gaps:
+                    fetched = self._fetch_chunks(gap_start, gap_end, bar_size)
+                    if fetched is not None and len(fetched):
+                        stored = self.merge_into_store(store, self.symbol, bar_size, stored, fetched)
+                        # Only the span the bars cover: the walk back stops at the first empty chunk
+                        coverage.add(self.symbol, bar_size, fetched.index.min(), fetched.index.max())
+            except Exception as e:
+                print(f"Error fetching data for symbol {self.symbol}: {e}")
+            finally:
+                self.disconnect()
+                coverage.save()
+
+        if stored is None:
+            print(f"No data fetched for symbol {self.symbol}")
             return None
-        finally:
-            self.disconnect()
-
 
+        self.data = stored[(stored.index >= self.start_date) & (stored.index <= self.end_date)]
+        print(f"{self.symbol}: {len(gaps)} missing span(s) requested, {len(self.data)} records available.")
+        return self.data
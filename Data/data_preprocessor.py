@@ -1,24 +1,130 @@
+import numpy as np
 import pandas as pd
 
+from Data.price_panel import PricePanel
+
+
+def fill_within_session(values, sessions, max_fill):
+    """
+    Forward-fills NaNs with the last valid value of the same session, at most max_fill rows ahead.
+
+    :param values: float array with NaN where the symbol did not print.
+    :param sessions: Session key per row (e.g. the exchange-local trading date).
+    :return: New array; NaNs that cannot be filled stay NaN.
+    """
+    positions = np.arange(len(values))
+    last_valid = np.where(~np.isnan(values), positions, -1)
+    np.maximum.accumulate(last_valid, out=last_valid)
+    source = np.maximum(last_valid, 0)
+    fillable = (last_valid >= 0) & (positions - last_valid <= max_fill) & (sessions[source] == sessions)
+    return np.where(fillable, values[source], np.nan)
+
+
+def resample_bars(data, frequency):
+    """
+    Resamples sorted bars to a coarser frequency (e.g. '5min', '15min', '1h'), keeping the last bar
+    of each interval and labelling it with the interval start, like IBroker's own bars.
+
+    Only intervals that contain bars are produced, so overnight and weekend gaps cost nothing.
+    Intervals are cut in UTC, which lines up with exchange-local intervals for whole-hour offsets
+    and avoids ambiguous local times around DST changes.
+    """
+    index = data.index
+    bins = (index.tz_convert('UTC') if index.tz is not None else index).floor(frequency)
+    last = np.flatnonzero(np.append(bins[1:] != bins[:-1], True))
+    resampled = data.iloc[last]
+    bins = bins[last]
+    return resampled.set_axis(bins.tz_convert(index.tz) if index.tz is not None else bins).rename_axis(index.name)
+
+
+def iter_merged_chunks(store, symbols, bar_size, chunk_rows, start=None, end=None, max_fill=0, dtype=np.float64):
+    """
+    Streams the merged data of symbols from a ColumnarPriceStore in time-ordered chunks.
+
+    Files are memory-mapped, so only the rows of the current chunk are read. Chunks are cut every
+    chunk_rows bars of the first symbol; the other symbols are read over the same time span. With
+    max_fill > 0, the last max_fill bars of the previous chunk are merged again in front of each
+    chunk so session forward-fills continue across the boundary, then dropped. The concatenated
+    chunks equal DataPreprocessor(...).merge_data(max_fill) on the loaded symbols.
+
+    Yields:
+        pd.DataFrame: Merged chunk with one 'Price_<symbol>' column per symbol.
+    """
+    columns = {}
+    tz = None
+    for symbol in symbols:
+        arrays, header = store.read_columns(symbol, bar_size, start, end, mmap=True)
+        columns[symbol] = (arrays['date'], arrays['Price'])
+        tz = header['tz']
+
+    dates = columns[symbols[0]][0]
+    bounds = [None] + [int(dates[row]) for row in range(chunk_rows, len(dates), chunk_rows)] + [None]
+    carried_from = None
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        span_start = lo if carried_from is None else carried_from
+        frames = {}
+        for symbol, (symbol_dates, prices) in columns.items():
+            first = 0 if span_start is None else int(np.searchsorted(symbol_dates, span_start, side='left'))
+            last = len(symbol_dates) if hi is None else int(np.searchsorted(symbol_dates, hi, side='left'))
+            index = pd.DatetimeIndex(np.asarray(symbol_dates[first:last]).view('M8[ns]'), name='date')
+            if tz is not None:
+                index = index.tz_localize('UTC').tz_convert(tz)
+            frames[symbol] = pd.DataFrame({'Price': np.array(prices[first:last])}, index=index)
+
+        preprocessor = DataPreprocessor(frames, dtype=dtype)
+        merged = preprocessor.merge_data(max_fill=max_fill)
+        if max_fill > 0:
+            union = preprocessor.panel.index.asi8
+            carried_from = int(union[-max_fill]) if len(union) >= max_fill else span_start
+            if lo is not None:
+                merged = merged.iloc[int(np.searchsorted(merged.index.asi8, lo, side='left')):]
+        yield merged
+
 
 class DataPreprocessor:
     """
     Merges and preprocesses the data from multiple assets.
     """
 
-    def __init__(self, data_dict):
+    def __init__(self, data_dict, dtype=np.float64):
         """
         data_dict: Dictionary with symbol as key and DataFrame as value.
+        dtype: Price dtype of the merged data; np.float32 halves its memory for large universes.
         """
         self.data_dict = data_dict
+        self.dtype = dtype
+        self.panel = None
         self.merged_data = None
 
-    def merge_data(self):
+    def merge_data(self, max_fill=0):
         """
         Merges the data on the DateTime index.
+
+        With max_fill > 0, bars where only some symbols printed are kept: each missing price is
+        forward-filled from the same session (exchange-local date), at most max_fill bars ahead.
+        Bars that still miss a price are dropped; max_fill=0 keeps only bars where all symbols printed.
+
+        The symbols are aligned once in a PricePanel (kept as self.panel), which also drops repeated
+        timestamps within a symbol.
         """
-        data_frames = [df.rename(columns={'Price': f'Price_{symbol}'}) for symbol, df in self.data_dict.items()]
-        self.merged_data = pd.concat(data_frames, axis=1).dropna().sort_index()
+        self.panel = PricePanel.from_frames(self.data_dict, dtype=self.dtype)
+        if max_fill > 0:
+            index = self.panel.index
+            local = index.tz_localize(None) if index.tz is not None else index
+            sessions = local.normalize().asi8
+            for j in range(len(self.panel.symbols)):
+                filled = fill_within_session(self.panel.values[:, j], sessions, max_fill)
+                self.panel.values[:, j] = filled
+                self.panel.valid[:, j] = ~np.isnan(filled)
+        rows = self.panel.rows_valid()
+        self.merged_data = self.panel.to_frame(prefix='Price_', rows=None if rows.all() else rows)
+        return self.merged_data
+
+    def resample(self, frequency):
+        """
+        Resamples the merged data to a coarser bar frequency in place.
+        """
+        self.merged_data = resample_bars(self.merged_data, frequency)
         return self.merged_data
 
     def split_data(self, ratio=0.66):
@@ -29,3 +135,23 @@ class DataPreprocessor:
         training_data = self.merged_data.iloc[:split_point]
         test_data = self.merged_data.iloc[split_point:]
         return training_data, test_data
+
+    def walk_forward_folds(self, train_size, test_size, expanding=False):
+        """
+        Generates walk-forward folds over the merged data.
+
+        Each fold trains on train_size rows (or on everything before the test window when expanding)
+        and is tested on the following test_size rows; consecutive test windows do not overlap.
+
+        Returns:
+            list: (train_start, train_end, test_end) row positions, train = [train_start, train_end),
+                  test = [train_end, test_end).
+        """
+        folds = []
+        train_end = train_size
+        while train_end < len(self.merged_data):
+            test_end = min(train_end + test_size, len(self.merged_data))
+            train_start = 0 if expanding else train_end - train_size
+            folds.append((train_start, train_end, test_end))
+            train_end = test_end
+        return folds
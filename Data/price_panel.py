@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+
+def sorted_unique_rows(keys):
+    """
+    Row positions that put keys in ascending order, keeping only the last row of each repeated key.
+
+    The stable sort is a timsort, so keys made of a few presorted runs (e.g. concatenated fetch
+    chunks) are merged rather than fully re-sorted.
+    """
+    order = np.argsort(keys, kind='stable')
+    ordered = keys[order]
+    last = np.ones(len(ordered), dtype=bool)
+    last[:-1] = ordered[1:] != ordered[:-1]
+    return order[last]
+
+
+def is_strictly_increasing(keys):
+    return len(keys) < 2 or bool((keys[1:] > keys[:-1]).all())
+
+
+def merge_sorted(arrays):
+    """
+    k-way merge of strictly increasing int64 key arrays into their sorted union.
+
+    The concatenated keys form k presorted runs, which the stable (timsort) argsort merges in
+    O(n log k); the union and every key's row in it then follow in linear passes.
+
+    Returns:
+        tuple: (union array, list of row-position arrays, one per input array)
+    """
+    keys = np.concatenate(arrays) if arrays else np.empty(0, dtype=np.int64)
+    order = np.argsort(keys, kind='stable')
+    merged = keys[order]
+    new = np.ones(len(merged), dtype=bool)
+    new[1:] = merged[1:] != merged[:-1]
+    positions = np.empty(len(keys), dtype=np.int64)
+    positions[order] = np.cumsum(new) - 1
+    return merged[new], np.split(positions, np.cumsum([len(a) for a in arrays])[:-1])
+
+
+class PricePanel:
+    """
+    Aligned (time x symbol) price panel of a symbol universe.
+
+    Holds one contiguous 2-D array over the union of all symbols' timestamps, with a validity mask
+    marking where each symbol has a bar. Both are column-major, so a symbol's column is a contiguous
+    view that stages can read without re-joining frames for every pair.
+    """
+
+    def __init__(self, index, symbols, values, valid):
+        """
+        :param index: DatetimeIndex of the shared timestamps (rows).
+        :param symbols: Symbol of each column.
+        :param values: (rows x symbols) array, NaN where a symbol has no bar.
+        :param valid: Boolean (rows x symbols) mask, True where a symbol has a price.
+        """
+        self.index = index
+        self.symbols = list(symbols)
+        self.positions = {symbol: j for j, symbol in enumerate(self.symbols)}
+        self.values = values
+        self.valid = valid
+
+    @classmethod
+    def from_frames(cls, data_dict, column='Price', dtype=np.float64):
+        """
+        Builds the panel from a dict of symbol to DataFrame.
+
+        Each symbol is sorted and deduplicated once (the last bar of a repeated timestamp wins), then
+        all timestamps are combined with merge_sorted and every price is written straight into its row.
+        """
+        symbols = list(data_dict)
+        keys, prices = [], []
+        tz, name = None, 'date'
+        for k, symbol in enumerate(symbols):
+            index = pd.DatetimeIndex(data_dict[symbol].index)
+            values = data_dict[symbol][column].to_numpy(dtype=dtype)
+            # tz-aware indexes are stored as UTC nanoseconds, so symbols in different zones still align
+            symbol_keys = index.asi8
+            if not is_strictly_increasing(symbol_keys):
+                rows = sorted_unique_rows(symbol_keys)
+                symbol_keys, values = symbol_keys[rows], values[rows]
+            keys.append(symbol_keys)
+            prices.append(values)
+            if k == 0:
+                tz, name = index.tz, index.name
+
+        timestamps, positions = merge_sorted(keys)
+        values = np.full((len(timestamps), len(symbols)), np.nan, dtype=dtype, order='F')
+        valid = np.zeros((len(timestamps), len(symbols)), dtype=bool, order='F')
+        for j, (rows, symbol_prices) in enumerate(zip(positions, prices)):
+            values[rows, j] = symbol_prices
+            valid[rows, j] = ~np.isnan(symbol_prices)
+
+        index = pd.DatetimeIndex(timestamps.view('M8[ns]'), name=name)
+        if tz is not None:
+            index = index.tz_localize('UTC').tz_convert(tz)
+        return cls(index, symbols, values, valid)
+
+    def __len__(self):
+        return len(self.index)
+
+    def column(self, symbol):
+        """
+        The symbol's prices over all panel rows, as a view.
+        """
+        return self.values[:, self.positions[symbol]]
+
+    def rows_valid(self, symbols=None):
+        """
+        Boolean mask of the rows where every given symbol (all by default) has a price.
+        """
+        columns = slice(None) if symbols is None else [self.positions[symbol] for symbol in symbols]
+        return self.valid[:, columns].all(axis=1)
+
+    def to_frame(self, symbols=None, prefix='', rows=None):
+        """
+        Wide DataFrame of the panel, one column per symbol named prefix + symbol.
+
+        :param rows: Optional boolean mask or positions selecting rows; all rows otherwise, in which
+                     case the frame is built on the panel's array without copying it.
+        """
+        symbols = self.symbols if symbols is None else list(symbols)
+        if symbols == self.symbols:
+            values = self.values
+        else:
+            values = self.values[:, [self.positions[symbol] for symbol in symbols]]
+        index = self.index
+        if rows is not None:
+            values, index = values[rows], index[rows]
+        return pd.DataFrame(values, index=index, columns=[f'{prefix}{symbol}' for symbol in symbols], copy=False)
@@ -0,0 +1,267 @@
+import json
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+class PriceStore:
+    """
+    Base class for on-disk price storage backends.
+
+    Data is stored per symbol and bar size as a DataFrame indexed by date with one column per field
+    (currently just 'Price').
+    """
+
+    def save(self, symbol, bar_size, df):
+        raise NotImplementedError
+
+    def load(self, symbol, bar_size, start=None, end=None):
+        raise NotImplementedError
+
+    def exists(self, symbol, bar_size):
+        raise NotImplementedError
+
+    def symbols(self, bar_size):
+        raise NotImplementedError
+
+    def load_many(self, symbols, bar_size, start=None, end=None, **load_kwargs):
+        """
+        Loads several symbols, skipping the ones that are not stored.
+        Extra keyword arguments are passed on to the backend's load().
+
+        Returns:
+            dict: Symbol to DataFrame.
+        """
+        data = {}
+        for symbol in symbols:
+            if not self.exists(symbol, bar_size):
+                print(f"No data found for symbol {symbol} ({bar_size}) in {self.__class__.__name__}.")
+                continue
+            data[symbol] = self.load(symbol, bar_size, start, end, **load_kwargs)
+        return data
+
+
+class ColumnarPriceStore(PriceStore):
+    """
+    Stores each symbol and bar size in its own binary columnar file.
+
+    File layout: an 8-byte magic, a 4-byte little-endian header length, a JSON header describing the
+    columns, then each column as a contiguous little-endian array aligned to 64 bytes. Dates are kept
+    as int64 nanoseconds (UTC for tz-aware data) so reads can be memory-mapped and sliced by date
+    with a binary search, without parsing the whole file.
+
+    Value columns are written as dtype: float64 by default, '<f4' for the compact float32 mode, or
+    None to keep each column's own dtype. Files record their dtypes, so any store reads any file.
+    """
+
+    MAGIC = b'PTCOL01\n'
+    ALIGNMENT = 64
+    EXTENSION = '.col'
+
+    def __init__(self, root_dir, dtype='<f8'):
+        self.root_dir = root_dir
+        self.dtype = dtype
+
+    def _bar_dir(self, bar_size):
+        return os.path.join(self.root_dir, bar_size.replace(' ', '_'))
+
+    def path(self, symbol, bar_size):
+        return os.path.join(self._bar_dir(bar_size), f"{symbol}{self.EXTENSION}")
+
+    def exists(self, symbol, bar_size):
+        return os.path.exists(self.path(symbol, bar_size))
+
+    def symbols(self, bar_size):
+        bar_dir = self._bar_dir(bar_size)
+        if not os.path.isdir(bar_dir):
+            return []
+        return sorted(name[:-len(self.EXTENSION)] for name in os.listdir(bar_dir) if name.endswith(self.EXTENSION))
+
+    def save(self, symbol, bar_size, df):
+        """
+        Writes the DataFrame to the symbol's file, replacing it atomically.
+        """
+        index = pd.DatetimeIndex(df.index)
+        tz = str(index.tz) if index.tz is not None else None
+        if tz is not None:
+            index = index.tz_convert('UTC')
+
+        columns = [('date', index.asi8.astype('<i8', copy=False))]
+        for name in df.columns:
+            dtype = self.dtype if self.dtype is not None else df[name].dtype.newbyteorder('<')
+            columns.append((name, np.ascontiguousarray(df[name].to_numpy(dtype=dtype))))
+
+        header = {'rows': len(df), 'tz': tz, 'index_name': df.index.name or 'date', 'columns': []}
+        offset = 0
+        for name, values in columns:
+            header['columns'].append({'name': name, 'dtype': values.dtype.str, 'offset': offset})
+            offset += -(-values.nbytes // self.ALIGNMENT) * self.ALIGNMENT
+
+        # The header length is only known once it is serialized, so column offsets are relative to
+        # the aligned start of the data section.
+        header_bytes = json.dumps(header).encode('utf-8')
+        data_start = len(self.MAGIC) + 4 + len(header_bytes)
+        data_start = -(-data_start // self.ALIGNMENT) * self.ALIGNMENT
+
+        file_path = self.path(symbol, bar_size)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp_path = file_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self.MAGIC)
+            f.write(len(header_bytes).to_bytes(4, 'little'))
+            f.write(header_bytes)
+            for column, (_, values) in zip(header['columns'], columns):
+                f.seek(data_start + column['offset'])
+                f.write(values.tobytes())
+        os.replace(tmp_path, file_path)
+
+    def _read_header(self, file_path):
+        with open(file_path, 'rb') as f:
+            if f.read(len(self.MAGIC)) != self.MAGIC:
+                raise ValueError(f"{file_path} is not a columnar price file.")
+            header_length = int.from_bytes(f.read(4), 'little')
+            header = json.loads(f.read(header_length).decode('utf-8'))
+        data_start = len(self.MAGIC) + 4 + header_length
+        header['data_start'] = -(-data_start // self.ALIGNMENT) * self.ALIGNMENT
+        return header
+
+    def _to_stored_ns(self, value, tz):
+        """
+        Converts a date bound to the int64 representation used on disk.
+        """
+        ts = pd.Timestamp(value)
+        if tz is not None:
+            ts = ts.tz_localize(tz) if ts.tzinfo is None else ts
+            ts = ts.tz_convert('UTC')
+        elif ts.tzinfo is not None:
+            ts = ts.tz_localize(None)
+        return ts.value
+
+    def version(self, symbol, bar_size):
+        """
+        Row count and last stored timestamp (int64 ns, UTC for tz-aware files) of a symbol, e.g. to tell
+        whether bars were added since a result was computed. Only the header and the last date are read.
+
+        Returns:
+            str: 'rows:last_timestamp', or '0:' for an empty file.
+        """
+        dates = self.read_columns(symbol, bar_size)[0]['date']
+        return f"{len(dates)}:{int(dates[-1])}" if len(dates) else '0:'
+
+    def read_columns(self, symbol, bar_size, start=None, end=None, mmap=True):
+        """
+        Reads the raw columns of a symbol, optionally restricted to [start, end].
+
+        The file is always memory-mapped, so only the pages covering the requested date range are
+        read from disk. With mmap=True the returned arrays are read-only views on the map; otherwise
+        the slice is copied into regular arrays.
+
+        Returns:
+            tuple: (dict of column name to array, header dict)
+        """
+        file_path = self.path(symbol, bar_size)
+        header = self._read_header(file_path)
+        rows = header['rows']
+
+        def column(spec):
+            if rows == 0:
+                return np.empty(0, dtype=spec['dtype'])
+            return np.memmap(file_path, dtype=spec['dtype'], mode='r',
+                             offset=header['data_start'] + spec['offset'], shape=(rows,))
+
+        arrays = {spec['name']: column(spec) for spec in header['columns']}
+
+        lo, hi = 0, rows
+        if start is not None:
+            lo = int(np.searchsorted(arrays['date'], self._to_stored_ns(start, header['tz']), side='left'))
+        if end is not None:
+            hi = int(np.searchsorted(arrays['date'], self._to_stored_ns(end, header['tz']), side='right'))
+        if lo > 0 or hi < rows:
+            arrays = {name: values[lo:hi] for name, values in arrays.items()}
+        if not mmap:
+            # Copy only the requested slice into memory and release the map
+            arrays = {name: np.array(values) for name, values in arrays.items()}
+        return arrays, header
+
+    def load(self, symbol, bar_size, start=None, end=None, mmap=False):
+        """
+        Loads a symbol as a DataFrame indexed by date, optionally restricted to [start, end].
+        """
+        arrays, header = self.read_columns(symbol, bar_size, start, end, mmap=mmap)
+        dates = arrays.pop('date')
+        index = pd.DatetimeIndex(np.asarray(dates).view('M8[ns]'), name=header['index_name'])
+        if header['tz'] is not None:
+            index = index.tz_localize('UTC').tz_convert(header['tz'])
+        return pd.DataFrame(arrays, index=index, copy=not mmap)
+
+
+class JsonPriceStore(PriceStore):
+    """
+    Legacy single-file JSON cache (all_symbols_data.json), kept so existing caches can be migrated.
+
+    The JSON format has no notion of bar size, so every bar size maps to the same file.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._cache = None
+
+    def _read_all(self):
+        if self._cache is None:
+            if os.path.exists(self.file_path):
+                with open(self.file_path, 'r') as f:
+                    self._cache = json.load(f)
+            else:
+                self._cache = {}
+        return self._cache
+
+    def exists(self, symbol, bar_size):
+        return bool(self._read_all().get(symbol))
+
+    def symbols(self, bar_size):
+        return sorted(symbol for symbol, records in self._read_all().items() if records)
+
+    def save(self, symbol, bar_size, df):
+        all_data = self._read_all()
+        data_to_save = df.reset_index()
+        data_to_save['date'] = data_to_save['date'].astype(str)
+        all_data[symbol] = data_to_save.to_dict(orient='records')
+
+        with open(self.file_path, 'w') as f:
+            json.dump(all_data, f)
+
+    def load(self, symbol, bar_size, start=None, end=None):
+        df = pd.DataFrame.from_records(self._read_all().get(symbol, []))
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', FutureWarning)
+            dates = pd.to_datetime(df['date'])
+        if dates.dtype == object:
+            # Mixed UTC offsets (daily bars across DST changes) cannot share one fixed-offset dtype,
+            # so restore the exchange time zone DataFetcher localizes daily bars to.
+            dates = pd.to_datetime(df['date'], utc=True).dt.tz_convert('America/New_York')
+        df['date'] = dates
+        df.set_index('date', inplace=True)
+        if start is not None or end is not None:
+            df = df.loc[start:end]
+        return df
+
+
+def migrate_json_to_store(json_path, store, bar_size='1 day', overwrite=False):
+    """
+    Copies the symbols of a legacy JSON cache into the given store.
+    Symbols already in the store are left alone unless overwrite is set.
+
+    Returns:
+        list: The migrated symbols.
+    """
+    legacy = JsonPriceStore(json_path)
+    migrated = []
+    for symbol in legacy.symbols(bar_size):
+        if not overwrite and store.exists(symbol, bar_size):
+            continue
+        store.save(symbol, bar_size, legacy.load(symbol, bar_size))
+        migrated.append(symbol)
+    print(f"Migrated {len(migrated)} symbols from {json_path} to {store.__class__.__name__}.")
+    return migrated
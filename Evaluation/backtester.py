@@ -1,12 +1,43 @@
-import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from Evaluation.report import decimate
+from Utils.pipeline_context import PipelineContext
+
+
+def pct_change(prices, previous=np.nan):
+    """
+    NumPy counterpart of pd.Series.pct_change for a gap-free price array.
+
+    The first row's return is taken against previous, the price before the array (NaN by default).
+    """
+    returns = np.empty(len(prices), dtype=np.result_type(prices, np.float32))
+    returns[:1] = prices[:1] / previous - 1
+    returns[1:] = prices[1:] / prices[:-1] - 1
+    return returns
+
+
+def shift(values, previous=np.nan):
+    """
+    NumPy counterpart of pd.Series.shift(1), with previous (NaN by default) moved into the first row.
+    """
+    shifted = np.empty(len(values), dtype=np.result_type(values, np.float32))
+    shifted[:1] = previous
+    shifted[1:] = values[:-1]
+    return shifted
+
 
 class Backtester:
     """
     Simulates trading to evaluate strategy performance.
+
+    hedge_ratio can be a scalar or a per-bar pd.Series aligned on the data index. data can be a
+    DataFrame, which is copied, or a PipelineContext, which is updated in place. Returns keep the
+    dtype of the price columns (float32 in the compact mode); the cumulative product is taken in float64.
     """
 
     def __init__(self, data, dependent_var, independent_var, hedge_ratio, transaction_cost=0.002):
-        self.data = data.copy()
+        self.data = data if isinstance(data, PipelineContext) else data.copy()
         self.dependent_var = dependent_var
         self.independent_var = independent_var
         self.hedge_ratio = hedge_ratio
@@ -16,6 +47,9 @@ class Backtester:
         """
         Performs backtesting of the strategy.
         """
+        if isinstance(self.data, PipelineContext):
+            return self._backtest_columns()
+
         # calculate returns
         self.data['Return_Dependent'] = self.data[self.dependent_var].pct_change()
         self.data['Return_Independent'] = self.data[self.independent_var].pct_change()
@@ -23,18 +57,53 @@ class Backtester:
         # make sure no nan value
         self.data.dropna(subset=['Return_Dependent', 'Return_Independent'], inplace=True)
 
+        # a per-bar hedge ratio is applied as held over the bar, like the position
+        hedge_ratio = self.hedge_ratio
+        if isinstance(hedge_ratio, pd.Series):
+            hedge_ratio = hedge_ratio.reindex(self.data.index).shift(1)
+
         # calculate strategy returns
         self.data['Strategy_Return'] = self.data['Position'].shift(1) * (
-            self.data['Return_Dependent'] - self.hedge_ratio * self.data['Return_Independent']
+            self.data['Return_Dependent'] - hedge_ratio * self.data['Return_Independent']
         )
 
         # add cost
         self.data['Trade'] = self.data['Position'].diff().abs()
         self.data['Strategy_Return'] -= self.data['Trade'] * self.transaction_cost
+        self.data['Strategy_Return'] = self.data['Strategy_Return'].astype(self.data[self.dependent_var].dtype,
+                                                                           copy=False)
 
         # calculate cumulative returns
-        self.data['Cumulative_Return'] = (1 + self.data['Strategy_Return']).cumprod()
+        self.data['Cumulative_Return'] = (1 + self.data['Strategy_Return'].astype(np.float64, copy=False)).cumprod()
+
+
+        return self.data
+
+    def _backtest_columns(self):
+        """
+        backtest on a PipelineContext, with the same arithmetic as the pandas path on NumPy columns.
+        """
+        self.data['Return_Dependent'] = pct_change(self.data[self.dependent_var])
+        self.data['Return_Independent'] = pct_change(self.data[self.independent_var])
+        self.data.keep(~np.isnan(self.data['Return_Dependent']) & ~np.isnan(self.data['Return_Independent']))
+
+        hedge_ratio = self.hedge_ratio
+        if isinstance(hedge_ratio, pd.Series):
+            hedge_ratio = shift(hedge_ratio.reindex(self.data.index).to_numpy(dtype=np.float64))
 
+        position = self.data['Position']
+        strategy_return = shift(position) * (
+            self.data['Return_Dependent'] - hedge_ratio * self.data['Return_Independent']
+        )
+        trade = np.abs(position - shift(position))
+        strategy_return -= trade * self.transaction_cost
+        self.data['Trade'] = trade
+        self.data['Strategy_Return'] = strategy_return.astype(self.data[self.dependent_var].dtype, copy=False)
+
+        # Like pandas cumprod: NaN returns stay NaN and are skipped in the running product
+        cumulative = np.nancumprod(1 + strategy_return.astype(np.float64, copy=False))
+        cumulative[np.isnan(strategy_return)] = np.nan
+        self.data['Cumulative_Return'] = cumulative
 
         return self.data
 
@@ -42,8 +111,13 @@ class Backtester:
         """
         Plots the cumulative returns of the strategy.
         """
+        import matplotlib.pyplot as plt
+
+        cumulative = self.data.series('Cumulative_Return') if isinstance(self.data, PipelineContext) \
+            else self.data['Cumulative_Return']
+        x, y = decimate(cumulative.dropna())
         plt.figure(figsize=(12, 6))
-        plt.plot(self.data['Cumulative_Return'], label='Strategy Return')
+        plt.plot(x, y, label='Strategy Return')
         plt.title(title)
         plt.xlabel('Date')
         plt.ylabel('Cumulative Return')
@@ -0,0 +1,166 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from Evaluation.backtester import pct_change, shift
+from Utils.signal_generator import SignalGenerator
+from Utils.spread_calculator import SpreadCalculator
+
+
+class ChunkedBacktester:
+    """
+    Out-of-core pair backtest over time-ordered chunks of merged prices (e.g. iter_merged_chunks).
+
+    Runs spread -> z-score -> signals -> backtest -> evaluation one chunk at a time and carries only
+    the state that crosses a chunk boundary:
+        - the last window - 1 bars, put in front of the next chunk for the rolling statistics;
+        - the last position, for the signal forward-fill and the held position (shift, diff);
+        - the last prices, for the first returns of the next chunk (pct_change);
+        - the running cumulative return and its running peak (cumprod, cummax).
+    Memory therefore depends on the chunk size, not on the length of the history. The rolling
+    statistics are window-local (see window_local_mean_std), so the result rows are bit-identical to
+    SpreadCalculator(window_local=True) -> SignalGenerator -> Backtester run on the whole merged
+    frame, and so is the maximum drawdown; the default SpreadCalculator agrees up to rounding. The
+    Sharpe ratio is accumulated from per-chunk means and variances, so it matches Evaluator's
+    whole-array computation only up to rounding.
+
+    The hedge ratio must be a scalar: a per-bar hedge ratio is itself a full-history series.
+    """
+
+    def __init__(self, dependent_var, independent_var, hedge_ratio, window=20, entry_threshold=2.5,
+                 exit_threshold=0.5, max_position=1.0, transaction_cost=0.002, periods_per_year=252):
+        if isinstance(hedge_ratio, pd.Series):
+            raise ValueError("ChunkedBacktester needs a scalar hedge ratio.")
+        self.dependent_var = dependent_var
+        self.independent_var = independent_var
+        self.hedge_ratio = hedge_ratio
+        self.window = window
+        self.entry_threshold = entry_threshold
+        self.exit_threshold = exit_threshold
+        self.max_position = max_position
+        self.transaction_cost = transaction_cost
+        self.periods_per_year = periods_per_year
+
+        # Boundary state
+        self.tail = None
+        self.signal_position = 0.0
+        self.held_position = np.nan
+        self.last_prices = (np.nan, np.nan)
+        self.cumulative = 1.0
+        self.peak = -np.inf
+
+        # Running metrics
+        self.bars = 0
+        self.return_mean = 0.0
+        self.return_m2 = 0.0
+        self.max_drawdown = np.nan
+        self.trades = 0
+
+    def process(self, chunk):
+        """
+        Runs the pipeline over one merged chunk, continuing from the previous chunks.
+
+        Returns:
+            pd.DataFrame: The chunk's result rows, with the columns of Backtester.backtest().
+        """
+        data = chunk if self.tail is None else pd.concat([self.tail, chunk])
+        # The previous window - 1 bars only feed the rolling window: compute_zscore drops them again
+        self.tail = data.iloc[len(data) - min(len(data), self.window - 1):]
+
+        spread_calculator = SpreadCalculator(data, self.hedge_ratio, self.dependent_var, self.independent_var,
+                                             window=self.window, window_local=True)
+        spread_calculator.compute_spread()
+        signal_generator = SignalGenerator(spread_calculator.compute_zscore(), self.entry_threshold,
+                                           self.exit_threshold, self.max_position)
+        results = signal_generator.generate_signals(initial_position=self.signal_position)
+        if len(results) == 0:
+            return results
+
+        dependent = results[self.dependent_var].to_numpy()
+        independent = results[self.independent_var].to_numpy()
+        self.signal_position = results['Position'].iloc[-1]
+        results['Return_Dependent'] = pct_change(dependent, self.last_prices[0])
+        results['Return_Independent'] = pct_change(independent, self.last_prices[1])
+        self.last_prices = (dependent[-1], independent[-1])
+        results.dropna(subset=['Return_Dependent', 'Return_Independent'], inplace=True)
+        if len(results) == 0:
+            return results
+
+        # Same arithmetic as Backtester, with the last held position in front of the shift
+        position = results['Position'].to_numpy()
+        held = shift(position, self.held_position)
+        self.held_position = position[-1]
+        strategy_return = held * (
+            results['Return_Dependent'].to_numpy() - self.hedge_ratio * results['Return_Independent'].to_numpy()
+        )
+        trade = np.abs(position - held)
+        strategy_return -= trade * self.transaction_cost
+        results['Strategy_Return'] = strategy_return.astype(dependent.dtype, copy=False)
+        results['Trade'] = trade
+
+        # Running product continued from the previous chunk; NaN returns stay NaN and are skipped
+        factors = np.empty(len(strategy_return) + 1)
+        factors[0] = self.cumulative
+        factors[1:] = 1 + results['Strategy_Return'].to_numpy().astype(np.float64, copy=False)
+        cumulative = np.nancumprod(factors)[1:]
+        valid = ~np.isnan(strategy_return)
+        cumulative[~valid] = np.nan
+        results['Cumulative_Return'] = cumulative
+
+        self._update_metrics(results['Strategy_Return'].to_numpy(dtype=np.float64)[valid], cumulative[valid],
+                             trade)
+        return results
+
+    def _update_metrics(self, returns, cumulative, trade):
+        if len(returns) == 0:
+            return
+        # Merge the chunk's mean and sum of squared deviations into the running ones (Chan et al.)
+        count = self.bars + len(returns)
+        chunk_mean = returns.mean()
+        chunk_m2 = float(((returns - chunk_mean) ** 2).sum())
+        delta = chunk_mean - self.return_mean
+        self.return_m2 += chunk_m2 + delta ** 2 * self.bars * len(returns) / count
+        self.return_mean += delta * len(returns) / count
+        self.bars = count
+
+        # Drawdown against the running peak, which carries over from earlier chunks
+        peaks = np.maximum.accumulate(np.concatenate(([self.peak], cumulative)))[1:]
+        chunk_drawdown = ((cumulative - peaks) / peaks).min()
+        self.max_drawdown = chunk_drawdown if np.isnan(self.max_drawdown) else min(self.max_drawdown, chunk_drawdown)
+        self.peak = peaks[-1]
+        self.cumulative = cumulative[-1]
+        self.trades += int((trade > 0).sum())
+
+    def iter_results(self, chunks):
+        """
+        Processes chunks lazily, yielding each chunk's result rows.
+        """
+        for chunk in chunks:
+            yield self.process(chunk)
+
+    def run(self, chunks, on_chunk=None):
+        """
+        Processes every chunk and returns the metrics; on_chunk(results) is called per chunk, e.g.
+        to write the results out, since they are not kept.
+        """
+        for results in self.iter_results(chunks):
+            if on_chunk is not None:
+                on_chunk(results)
+        return self.metrics()
+
+    def metrics(self):
+        """
+        Metrics of the bars processed so far.
+        """
+        sharpe = np.nan
+        if self.bars > 1 and self.return_m2 > 0:
+            std = math.sqrt(self.return_m2 / (self.bars - 1))
+            sharpe = (self.return_mean * self.periods_per_year) / (std * math.sqrt(self.periods_per_year))
+        return {
+            'Sharpe_Ratio': sharpe,
+            'Max_Drawdown': float(self.max_drawdown),
+            'Total_Return': float(self.cumulative - 1) if self.bars else np.nan,
+            'Trades': self.trades,
+            'Bars': self.bars,
+        }
@@ -1,47 +1,348 @@
-import matplotlib.pyplot as plt
+import math
+
 import numpy as np
+import pandas as pd
+
+from Evaluation.backtester import shift
+from Evaluation.report import decimate
+from Utils.pipeline_context import PipelineContext
+
+
+def bars_per_year(frequency, trading_days=252, session_minutes=390):
+    """
+    Annualization factor (periods_per_year) for a bar size or resampling frequency.
+
+    Accepts IBroker bar sizes ('1 day', '1 min', '5 mins', '1 hour') and pandas frequencies ('5min',
+    '15min', '1h'). Intraday bars are counted per regular session, so hourly bars over a 9:30-16:00
+    session count 7 per day, as the resampled data has them.
+    """
+    delta = pd.Timedelta(frequency.replace('mins', 'min').replace('secs', 's'))
+    if delta >= pd.Timedelta(weeks=1):
+        return 52 / (delta / pd.Timedelta(weeks=1))
+    if delta >= pd.Timedelta(days=1):
+        return trading_days / (delta / pd.Timedelta(days=1))
+    return trading_days * math.ceil(pd.Timedelta(minutes=session_minutes) / delta)
+
+
+def sharpe_ratio(returns, periods_per_year=252):
+    """
+    Annualized Sharpe ratio along the last axis of a NaN-free return array (one row per strategy).
+
+    Returns NaN where the standard deviation is zero or there are fewer than two returns.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    if returns.shape[-1] < 2:
+        return np.full(returns.shape[:-1], np.nan)
+    mean_return = returns.mean(axis=-1)
+    std_return = returns.std(axis=-1, ddof=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = (mean_return * periods_per_year) / (std_return * np.sqrt(periods_per_year))
+    return np.where(std_return == 0, np.nan, sharpe)
+
+
+def max_drawdown(cumulative):
+    """
+    Maximum drawdown along the last axis of a NaN-free cumulative return array (NaN where it is empty).
+    """
+    cumulative = np.asarray(cumulative, dtype=np.float64)
+    if cumulative.shape[-1] == 0:
+        return np.full(cumulative.shape[:-1], np.nan)
+    rolling_max = np.maximum.accumulate(cumulative, axis=-1)
+    return ((cumulative - rolling_max) / rolling_max).min(axis=-1)
+
+
+def _window_sums(values, window):
+    """
+    Sums over each trailing window along the last axis from one cumulative sum; NaN for the first
+    window - 1 bars.
+    """
+    sums = np.cumsum(values, axis=-1)
+    windowed = np.full(values.shape, np.nan)
+    windowed[..., window - 1:] = sums[..., window - 1:]
+    windowed[..., window:] -= sums[..., :-window]
+    return windowed
+
+
+def rolling_return_mean_std(returns, window):
+    """
+    Rolling mean and standard deviation (ddof=1) along the last axis of a NaN-free return array.
+
+    O(n) from running sums of the returns and their squares, centered on each row's mean so the
+    sums stay small. Windows of one repeated value (e.g. flat bars out of the market) are detected
+    exactly with a running count of value changes and get a standard deviation of zero, which the
+    sums alone would only approximate. Unlike Utils.spread_calculator.window_local_mean_std, windows
+    are not computed independently, so results depend on the whole row; they are meant for reporting.
+    """
+    if window < 2:
+        raise ValueError("The rolling window needs at least two bars.")
+    returns = np.asarray(returns, dtype=np.float64)
+    row_mean = returns.mean(axis=-1, keepdims=True)
+    centered = returns - row_mean
+    mean = _window_sums(centered, window) / window
+    variance = (_window_sums(centered * centered, window) - window * mean * mean) / (window - 1)
+    std = np.sqrt(np.maximum(variance, 0))
+
+    changes = np.zeros(returns.shape)
+    changes[..., 1:] = returns[..., 1:] != returns[..., :-1]
+    std[_window_sums(changes, window - 1) == 0] = 0
+    return mean + row_mean, std
+
+
+def rolling_sharpe_ratio(returns, window, periods_per_year=252):
+    """
+    Annualized Sharpe ratio over each trailing window of a NaN-free return array (NaN where the
+    window's standard deviation is zero).
+    """
+    mean, std = rolling_return_mean_std(returns, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = (mean * periods_per_year) / (std * np.sqrt(periods_per_year))
+    return np.where(std == 0, np.nan, sharpe)
+
+
+def rolling_volatility(returns, window, periods_per_year=252):
+    """
+    Annualized standard deviation over each trailing window of a NaN-free return array.
+    """
+    return rolling_return_mean_std(returns, window)[1] * np.sqrt(periods_per_year)
+
+
+def drawdown_durations(cumulative):
+    """
+    Longest drawdown and recovery time of the deepest drawdown along the last axis of a NaN-free
+    cumulative return array, in bars.
+
+    The drawdown duration counts the bars since the last running peak; the recovery time counts the
+    bars from the deepest point back to a new peak, NaN if the curve has not recovered yet.
+
+    Returns:
+        tuple: (longest drawdown, recovery time) arrays.
+    """
+    cumulative = np.asarray(cumulative, dtype=np.float64)
+    positions = np.arange(cumulative.shape[-1])
+    rolling_max = np.maximum.accumulate(cumulative, axis=-1)
+    at_peak = cumulative >= rolling_max
+    last_peak = np.maximum.accumulate(np.where(at_peak, positions, 0), axis=-1)
+    longest = (positions - last_peak).max(axis=-1)
+
+    drawdown = (cumulative - rolling_max) / rolling_max
+    trough = drawdown.argmin(axis=-1)
+    recovered = at_peak & (positions > np.expand_dims(trough, -1))
+    recovery = np.where(recovered.any(axis=-1), recovered.argmax(axis=-1) - trough, np.nan)
+    recovery = np.where(drawdown.min(axis=-1) == 0, 0, recovery)
+    return longest, recovery
+
+
+def round_trips(position, strategy_return):
+    """
+    Round trips of the positions along the last axis (one row per strategy) and their returns.
+
+    position and strategy_return are aligned as in Backtester results: a bar's return is earned by
+    the previous bar's position. A round trip is a run of bars holding a position of one sign; it
+    also takes the trading cost of the bar that opens it from flat, and closes on the bar whose
+    position goes flat or flips (a flip's cost is charged to the trip it closes). Bar returns are
+    compounded, NaN returns count as zero. Trips are numbered with cumulative sums and their
+    returns summed in log space with one bincount, so all strategies take one pass.
+
+    Returns:
+        tuple: (strategy row, direction, holding bars, trip return) arrays, one entry per round trip.
+    """
+    side = np.sign(np.nan_to_num(np.atleast_2d(np.asarray(position, dtype=np.float64))))
+    strategy_return = np.nan_to_num(np.atleast_2d(np.asarray(strategy_return, dtype=np.float64)))
+    held = np.zeros(side.shape)
+    held[:, 1:] = side[:, :-1]
+    previous = np.zeros(side.shape)
+    previous[:, 1:] = held[:, :-1]
+
+    opens = (held != 0) & (held != previous)
+    trip = np.cumsum(opens, axis=1)
+    entry = (held == 0) & (side != 0)
+    entry[:, -1] = False
+    trip = np.where(held != 0, trip, np.where(entry, trip + 1, 0))
+
+    counts = opens.sum(axis=1)
+    member = trip > 0
+    trip_ids = (trip + (np.cumsum(counts) - counts)[:, None] - 1)[member]
+    n_trips = int(counts.sum())
+    growth = np.bincount(trip_ids, weights=np.log1p(strategy_return[member]), minlength=n_trips)
+    holding = np.bincount(trip_ids, weights=held[member] != 0, minlength=n_trips).astype(np.int64)
+    return np.repeat(np.arange(len(counts)), counts), held[opens], holding, np.expm1(growth)
+
+
+def trade_statistics(position, strategy_return):
+    """
+    Per-strategy round-trip statistics (see round_trips), NaN for strategies without a trip.
+
+    Returns:
+        dict: Round_Trips, Win_Rate, Avg_Trip_Return and Avg_Holding_Bars arrays, one entry per row.
+    """
+    rows, _, holding, trip_return = round_trips(position, strategy_return)
+    n_rows = np.atleast_2d(position).shape[0]
+    count = np.bincount(rows, minlength=n_rows)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'Round_Trips': count,
+            'Win_Rate': np.bincount(rows, weights=trip_return > 0, minlength=n_rows) / count,
+            'Avg_Trip_Return': np.bincount(rows, weights=trip_return, minlength=n_rows) / count,
+            'Avg_Holding_Bars': np.bincount(rows, weights=holding, minlength=n_rows) / count,
+        }
+
+
+def performance_summary(returns, positions=None, window=63, periods_per_year=252, names=None):
+    """
+    Summary table of many strategies at once, one per row of a NaN-free (strategies x bars) return
+    array, every metric in O(bars) per strategy.
+
+    :param positions: Optional Position array aligned with returns, for the round-trip statistics.
+    :param window: Bars per rolling window, for the rolling Sharpe ratio and volatility.
+    :param names: Optional row labels.
+    :return: pd.DataFrame with one row per strategy.
+    """
+    returns = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+    cumulative = np.cumprod(1 + returns, axis=-1)
+    longest, recovery = drawdown_durations(cumulative)
+    with np.errstate(invalid='ignore'):
+        summary = {
+            'Total_Return': cumulative[:, -1] - 1,
+            'Sharpe_Ratio': sharpe_ratio(returns, periods_per_year),
+            'Volatility': returns.std(axis=-1, ddof=1) * np.sqrt(periods_per_year),
+            'Max_Drawdown': max_drawdown(cumulative),
+            'Drawdown_Bars': longest,
+            'Recovery_Bars': recovery,
+        }
+    if returns.shape[-1] >= window:
+        rolling_sharpe = rolling_sharpe_ratio(returns, window, periods_per_year)[:, window - 1:]
+        volatility = rolling_volatility(returns, window, periods_per_year)[:, window - 1:]
+        summary['Rolling_Sharpe_Last'] = rolling_sharpe[:, -1]
+        # fmin skips the NaN Sharpe ratios of flat windows
+        summary['Rolling_Sharpe_Min'] = np.fmin.reduce(rolling_sharpe, axis=-1)
+        summary['Rolling_Volatility_Max'] = volatility.max(axis=-1)
+    if positions is not None:
+        summary.update(trade_statistics(positions, returns))
+    return pd.DataFrame(summary, index=names)
+
 
 class Evaluator:
     """
     Evaluates the performance of the trading strategy.
+
+    data can be a DataFrame or a PipelineContext; either is only read, never copied.
     """
-    def __init__(self, data, periods_per_year=252):
-        self.data = data.copy()
+    def __init__(self, data, periods_per_year=252, transaction_cost=0.002):
+        """
+        :param transaction_cost: The Backtester's cost per unit traded, to split the costs out in
+                                 compute_leg_attribution.
+        """
+        self.data = data
         self.periods_per_year = periods_per_year
+        self.transaction_cost = transaction_cost
+
+    def _valid(self, column):
+        values = np.asarray(self.data[column], dtype=np.float64)
+        return values[~np.isnan(values)]
 
     def compute_sharpe_ratio(self):
         """
         Computes the Sharpe Ratio of the strategy.
         """
-        strategy_returns = self.data['Strategy_Return'].dropna()
-        mean_return = strategy_returns.mean()
-        std_return = strategy_returns.std()
+        strategy_returns = self._valid('Strategy_Return')
+        sharpe = sharpe_ratio(strategy_returns, self.periods_per_year)
 
-        if std_return == 0:
+        # With two or more returns the ratio is only undefined for a zero standard deviation
+        if np.isnan(sharpe) and len(strategy_returns) > 1:
             print("Standard deviation of strategy returns is zero. Sharpe Ratio is undefined.")
-            return np.nan
-
-        annualized_return = mean_return * self.periods_per_year
-        annualized_std = std_return * np.sqrt(self.periods_per_year)
-        sharpe_ratio = annualized_return / annualized_std
-        return sharpe_ratio
+        return float(sharpe)
 
     def compute_max_drawdown(self):
         """
         Computes the Maximum Drawdown of the strategy.
         """
-        cumulative = self.data['Cumulative_Return'].dropna()
-        rolling_max = cumulative.cummax()
-        drawdown = (cumulative - rolling_max) / rolling_max
-        max_drawdown = drawdown.min()
-        return max_drawdown
+        cumulative = self._valid('Cumulative_Return')
+        return float(max_drawdown(cumulative))
+
+    def compute_rolling_metrics(self, window=63):
+        """
+        Rolling Sharpe ratio, rolling annualized volatility and drawdown over time, for monitoring.
+
+        Returns:
+            pd.DataFrame: Rolling_Sharpe, Rolling_Volatility and Drawdown on the rows with a strategy return.
+        """
+        values = np.asarray(self.data['Strategy_Return'], dtype=np.float64)
+        valid = ~np.isnan(values)
+        returns = values[valid]
+        cumulative = self._valid('Cumulative_Return')
+        rolling_max = np.maximum.accumulate(cumulative)
+        if len(returns) >= window:
+            sharpe = rolling_sharpe_ratio(returns, window, self.periods_per_year)
+            volatility = rolling_volatility(returns, window, self.periods_per_year)
+        else:
+            sharpe = volatility = np.full(len(returns), np.nan)
+        return pd.DataFrame({
+            'Rolling_Sharpe': sharpe,
+            'Rolling_Volatility': volatility,
+            'Drawdown': (cumulative - rolling_max) / rolling_max,
+        }, index=self.data.index[valid])
+
+    def compute_trades(self):
+        """
+        Round trips of the strategy derived from the Position column (see round_trips).
+
+        Returns:
+            pd.DataFrame: Direction (1 long / -1 short spread), Holding_Bars and Trip_Return per round trip.
+        """
+        _, direction, holding, trip_return = round_trips(self.data['Position'], self.data['Strategy_Return'])
+        return pd.DataFrame({'Direction': direction.astype(int), 'Holding_Bars': holding, 'Trip_Return': trip_return})
+
+    def compute_leg_attribution(self):
+        """
+        Splits the summed strategy returns into the dependent leg, the hedged independent leg and
+        trading costs.
+
+        The dependent leg earns the held position times its return and costs are the traded amount
+        times transaction_cost; the independent leg is the rest, so a per-bar hedge ratio needs no
+        special handling. The parts add up to the sum of Strategy_Return, not to the compounded total.
+
+        Returns:
+            dict: Dependent_Leg, Independent_Leg and Costs.
+        """
+        strategy_return = np.asarray(self.data['Strategy_Return'], dtype=np.float64)
+        held = shift(np.asarray(self.data['Position'], dtype=np.float64))
+        dependent = held * np.asarray(self.data['Return_Dependent'], dtype=np.float64)
+        costs = -np.asarray(self.data['Trade'], dtype=np.float64) * self.transaction_cost
+        valid = ~np.isnan(strategy_return)
+        return {
+            'Dependent_Leg': float(dependent[valid].sum()),
+            'Independent_Leg': float((strategy_return - dependent - costs)[valid].sum()),
+            'Costs': float(costs[valid].sum()),
+        }
+
+    def summary(self, window=63):
+        """
+        One-row summary table: performance_summary of the strategy returns, plus the round-trip
+        statistics and leg attribution when the Backtester columns are present.
+        """
+        returns = self._valid('Strategy_Return')
+        if len(returns) < 2:
+            raise ValueError("At least two strategy returns are needed for a summary.")
+        table = performance_summary(returns, window=window, periods_per_year=self.periods_per_year)
+        if 'Position' in self.data:
+            for name, values in trade_statistics(self.data['Position'], self.data['Strategy_Return']).items():
+                table[name] = values
+        if all(column in self.data for column in ('Position', 'Return_Dependent', 'Trade')):
+            for name, value in self.compute_leg_attribution().items():
+                table[name] = value
+        return table
 
     def plot_cumulative_returns(self, title='Cumulative Returns'):
         """
         Plots the cumulative returns over time.
         """
+        import matplotlib.pyplot as plt
+
+        cumulative = self.data.series('Cumulative_Return') if isinstance(self.data, PipelineContext) \
+            else self.data['Cumulative_Return']
+        x, y = decimate(cumulative.dropna())
         plt.figure(figsize=(12, 6))
-        plt.plot(self.data['Cumulative_Return'], label='Cumulative Return')
+        plt.plot(x, y, label='Cumulative Return')
         plt.title(title)
         plt.xlabel('Date')
         plt.ylabel('Cumulative Return')
@@ -0,0 +1,251 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from Evaluation.backtester import Backtester, pct_change, shift
+from Utils.numba_support import HAS_NUMBA, njit
+from Utils.pipeline_context import PipelineContext
+
+# Exit_Reason codes
+NO_FORCED_EXIT = 0
+STOP_LOSS_EXIT = 1
+MAX_HOLDING_EXIT = 2
+
+
+def _execution_loop(y, x, ry, rx, hedge, target, transaction_cost, cost_dependent, cost_independent, slippage,
+                    borrow_per_bar, stop_loss, max_holding, initial_capital):
+    """
+    Bar-by-bar execution kernel, compiled with Numba when available.
+
+    Positions are fractions of equity in the spread (long position x equity of the dependent leg,
+    short position x hedge x equity of the independent leg), rebalanced every bar as Backtester
+    assumes. A position opened at a bar's close earns the next bar's hedged return. transaction_cost
+    is charged per unit change of the position, as in Backtester; the per-leg costs and slippage are
+    charged on each leg's traded notional, from the shares carried over (worth more or less after the
+    bar's price move) to the new weight of the equity before costs, so the rebalancing of an
+    unchanged position pays them too. stop_loss (fractional loss since entry) and max_holding (bars)
+    force an exit; the pair then stays flat until the signal is flat or flips. Zero disables a rule.
+
+    Returns:
+        tuple: Executed position, strategy return, traded size, cumulative return, dependent and
+               independent share quantities, cash, equity and exit reason per bar.
+    """
+    n = len(target)
+    position = np.empty(n)
+    strategy_return = np.empty(n)
+    trade = np.empty(n)
+    cumulative = np.empty(n)
+    shares_dependent = np.empty(n)
+    shares_independent = np.empty(n)
+    cash = np.empty(n)
+    equity = np.empty(n)
+    exit_reason = np.zeros(n, dtype=np.int8)
+    if n == 0:
+        return (position, strategy_return, trade, cumulative, shares_dependent, shares_independent, cash, equity,
+                exit_reason)
+
+    dependent_rate = cost_dependent + slippage
+    independent_rate = cost_independent + slippage
+    growth = 1.0
+    entry_growth = 1.0
+    bars_held = 0
+    locked = 0.0
+    held = target[0]
+    strategy_return[0] = np.nan
+    trade[0] = np.nan
+    cumulative[0] = np.nan
+
+    for i in range(n):
+        if i > 0:
+            hedge_held = hedge[i - 1]
+            gross = held * (ry[i] - hedge_held * rx[i])
+            borrow = 0.0
+            if borrow_per_bar > 0:
+                # The short leg is the independent one when long the spread, the dependent one otherwise
+                borrow = borrow_per_bar * (held * hedge_held if held > 0 else -held)
+
+            desired = target[i]
+            if locked != 0.0:
+                if desired * locked > 0:
+                    desired = 0.0
+                else:
+                    locked = 0.0
+            if held != 0.0:
+                bars_held += 1
+                if desired * held > 0:
+                    if stop_loss > 0 and growth * (1 + gross - borrow) / entry_growth - 1 <= -stop_loss:
+                        exit_reason[i] = STOP_LOSS_EXIT
+                    elif max_holding > 0 and bars_held >= max_holding:
+                        exit_reason[i] = MAX_HOLDING_EXIT
+                    if exit_reason[i] != NO_FORCED_EXIT:
+                        locked = 1.0 if held > 0 else -1.0
+                        desired = 0.0
+
+            traded = abs(desired - held)
+            r = gross - traded * transaction_cost
+            # Traded notional per leg, per unit of last bar's equity: new weight minus the drifted holding
+            pre_trade = 1 + gross - borrow
+            if dependent_rate > 0:
+                r -= dependent_rate * abs(desired * pre_trade - held * (1 + ry[i]))
+            if independent_rate > 0:
+                r -= independent_rate * abs(desired * hedge[i] * pre_trade - held * hedge_held * (1 + rx[i]))
+            if borrow_per_bar > 0:
+                r -= borrow
+
+            if math.isnan(r):
+                cumulative[i] = np.nan
+            else:
+                growth *= 1 + r
+                cumulative[i] = growth
+            strategy_return[i] = r
+            trade[i] = traded
+
+            if desired != 0.0 and desired * held <= 0:
+                entry_growth = growth
+                bars_held = 0
+            held = desired
+
+        position[i] = held
+        equity[i] = initial_capital * growth
+        shares_dependent[i] = held * equity[i] / y[i]
+        shares_independent[i] = -held * hedge[i] * equity[i] / x[i]
+        cash[i] = equity[i] - shares_dependent[i] * y[i] - shares_independent[i] * x[i]
+
+    return (position, strategy_return, trade, cumulative, shares_dependent, shares_independent, cash, equity,
+            exit_reason)
+
+
+def _vectorized_execution(y, x, ry, rx, hedge, target, transaction_cost, cost_dependent, cost_independent, slippage,
+                          borrow_per_bar, initial_capital):
+    """
+    NumPy fallback of _execution_loop for runs without stop-loss or max-holding exits.
+
+    Without path-dependent exits the executed position is the target position, so every column is a
+    whole-array expression with the same per-bar arithmetic as the loop.
+    """
+    held = shift(target)
+    hedge_held = shift(hedge)
+    gross = held * (ry - hedge_held * rx)
+    borrow = borrow_per_bar * np.where(held > 0, held * hedge_held, -held) if borrow_per_bar > 0 else 0.0
+    trade = np.abs(target - held)
+    strategy_return = gross - trade * transaction_cost
+    pre_trade = 1 + gross - borrow
+    if cost_dependent + slippage > 0:
+        strategy_return -= (cost_dependent + slippage) * np.abs(target * pre_trade - held * (1 + ry))
+    if cost_independent + slippage > 0:
+        strategy_return -= (cost_independent + slippage) * np.abs(target * hedge * pre_trade
+                                                                  - held * hedge_held * (1 + rx))
+    if borrow_per_bar > 0:
+        strategy_return -= borrow
+
+    # Like pandas cumprod: NaN returns stay NaN and are skipped in the running product
+    growth = np.nancumprod(1 + strategy_return)
+    cumulative = np.where(np.isnan(strategy_return), np.nan, growth)
+    if len(growth):
+        growth[0] = 1.0
+    equity = initial_capital * growth
+    shares_dependent = target * equity / y
+    shares_independent = -target * hedge * equity / x
+    cash = equity - shares_dependent * y - shares_independent * x
+    return (target.copy(), strategy_return, trade, cumulative, shares_dependent, shares_independent, cash, equity,
+            np.zeros(len(target), dtype=np.int8))
+
+
+_compiled_loop = None
+
+
+def compiled_execution_loop():
+    """
+    Returns _execution_loop compiled with Numba, compiling it on first use.
+    """
+    global _compiled_loop
+    if not HAS_NUMBA:
+        raise ImportError("numba is not installed; use engine='numpy'.")
+    if _compiled_loop is None:
+        _compiled_loop = njit(_execution_loop)
+    return _compiled_loop
+
+
+class ExecutionBacktester(Backtester):
+    """
+    Backtester with per-bar execution state: per-leg costs, slippage, borrow fees, capital, share
+    quantities and cash, and stop-loss / max-holding-period exits.
+
+    Runs a stateful kernel compiled with Numba when it is installed. Without Numba, runs without
+    stop-loss or max-holding exits use a vectorized NumPy path and the others fall back to the
+    interpreted loop. With every extra rule at its default the results match Backtester exactly.
+    """
+
+    def __init__(self, data, dependent_var, independent_var, hedge_ratio, transaction_cost=0.002,
+                 cost_dependent=0.0, cost_independent=0.0, slippage=0.0, borrow_rate=0.0, periods_per_year=252,
+                 initial_capital=100_000.0, stop_loss=None, max_holding=None, engine='auto'):
+        """
+        :param transaction_cost: Cost per unit change of the spread position, as in Backtester.
+        :param cost_dependent: Cost as a fraction of the notional traded in the dependent leg, including
+                               the per-bar rebalancing of a held position.
+        :param cost_independent: Cost as a fraction of the notional traded in the independent leg.
+        :param slippage: Fill price slippage as a fraction of the notional traded in either leg.
+        :param borrow_rate: Annual borrow fee on the short leg's notional, charged per bar.
+        :param initial_capital: Starting equity used for the Equity, Cash and share columns.
+        :param stop_loss: Exit when a position has lost this fraction of equity since entry.
+        :param max_holding: Exit after holding a position for this many bars.
+        :param engine: 'numba', 'numpy', or 'auto' for Numba when it is installed.
+        """
+        if engine not in ('auto', 'numba', 'numpy'):
+            raise ValueError(f"Unknown engine: {engine}")
+        super().__init__(data, dependent_var, independent_var, hedge_ratio, transaction_cost)
+        self.cost_dependent = cost_dependent
+        self.cost_independent = cost_independent
+        self.slippage = slippage
+        self.borrow_rate = borrow_rate
+        self.periods_per_year = periods_per_year
+        self.initial_capital = initial_capital
+        self.stop_loss = stop_loss
+        self.max_holding = max_holding
+        self.engine = engine
+
+    def backtest(self):
+        """
+        Performs the stateful backtest.
+
+        Returns:
+            The data with Return_*, Strategy_Return, Trade and Cumulative_Return as in Backtester, plus
+            Executed_Position, Shares_Dependent, Shares_Independent, Cash, Equity and Exit_Reason.
+        """
+        self.data['Return_Dependent'] = pct_change(np.asarray(self.data[self.dependent_var], dtype=np.float64))
+        self.data['Return_Independent'] = pct_change(np.asarray(self.data[self.independent_var], dtype=np.float64))
+        if isinstance(self.data, PipelineContext):
+            self.data.keep(~np.isnan(self.data['Return_Dependent']) & ~np.isnan(self.data['Return_Independent']))
+        else:
+            self.data.dropna(subset=['Return_Dependent', 'Return_Independent'], inplace=True)
+
+        column = lambda name: np.ascontiguousarray(self.data[name], dtype=np.float64)
+        y, x = column(self.dependent_var), column(self.independent_var)
+        ry, rx = column('Return_Dependent'), column('Return_Independent')
+        target = column('Position')
+        if isinstance(self.hedge_ratio, pd.Series):
+            hedge = self.hedge_ratio.reindex(self.data.index).to_numpy(dtype=np.float64)
+        else:
+            hedge = np.full(len(target), float(self.hedge_ratio))
+
+        costs = (self.transaction_cost, self.cost_dependent, self.cost_independent, self.slippage,
+                 self.borrow_rate / self.periods_per_year)
+        stop_loss = self.stop_loss or 0.0
+        max_holding = self.max_holding or 0
+
+        if self.engine == 'numba' or (self.engine == 'auto' and HAS_NUMBA):
+            outputs = compiled_execution_loop()(y, x, ry, rx, hedge, target, *costs, float(stop_loss),
+                                                int(max_holding), float(self.initial_capital))
+        elif stop_loss > 0 or max_holding > 0:
+            # Path-dependent exits need the bar loop; without Numba it runs interpreted
+            outputs = _execution_loop(y, x, ry, rx, hedge, target, *costs, stop_loss, max_holding,
+                                      self.initial_capital)
+        else:
+            outputs = _vectorized_execution(y, x, ry, rx, hedge, target, *costs, self.initial_capital)
+
+        names = ['Executed_Position', 'Strategy_Return', 'Trade', 'Cumulative_Return', 'Shares_Dependent',
+                 'Shares_Independent', 'Cash', 'Equity', 'Exit_Reason']
+        for name, values in zip(names, outputs):
+            self.data[name] = values
+        return self.data
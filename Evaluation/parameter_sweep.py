@@ -0,0 +1,100 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from Evaluation.evaluator import max_drawdown, sharpe_ratio
+from Utils.signal_generator import SignalGenerator
+from Utils.spread_calculator import rolling_mean_std
+
+
+class ParameterSweep:
+    """
+    Grid-sweeps z-score windows and entry/exit thresholds over one pair without rerunning the pipeline.
+
+    The spread is computed once, rolling statistics once per window, and every threshold combination
+    for that window is evaluated as one (combinations x bars) batch that follows the exact
+    SpreadCalculator -> SignalGenerator -> Backtester -> Evaluator arithmetic.
+    """
+
+    def __init__(self, data, dependent_var, independent_var, hedge_ratio, transaction_cost=0.002,
+                 periods_per_year=252, max_position=1.0, chunk_size=2048):
+        """
+        :param data: Price frame with the dependent and independent columns.
+        :param hedge_ratio: Scalar or per-bar pd.Series, as accepted by SpreadCalculator/Backtester.
+        :param chunk_size: Threshold combinations per batch, bounding memory to chunk_size x bars.
+        """
+        self.index = data.index
+        self.y = data[dependent_var].to_numpy(dtype=np.float64)
+        self.x = data[independent_var].to_numpy(dtype=np.float64)
+        if isinstance(hedge_ratio, pd.Series):
+            self.hedge_ratio = hedge_ratio.reindex(data.index).to_numpy(dtype=np.float64)
+        else:
+            self.hedge_ratio = np.full(len(data), float(hedge_ratio))
+        self.spread = pd.Series(self.y - self.hedge_ratio * self.x, index=data.index)
+        self.transaction_cost = transaction_cost
+        self.periods_per_year = periods_per_year
+        self.max_position = max_position
+        self.chunk_size = chunk_size
+        self.results = None
+
+    def _window_inputs(self, window):
+        """
+        Rolling z-score and the per-bar hedged return for one window, on the bars the batch path keeps.
+        """
+        mean, std = rolling_mean_std(self.spread.to_numpy(), window)
+        keep = ~np.isnan(std) & (std != 0)
+
+        zscore = (self.spread.to_numpy()[keep] - mean[keep]) / std[keep]
+        y, x, hedge = self.y[keep], self.x[keep], self.hedge_ratio[keep]
+        # Backtester drops the first kept bar (no return) and then shifts position and hedge ratio
+        # within what remains, so returns start at the third kept bar.
+        return_y = y[1:] / y[:-1] - 1
+        return_x = x[1:] / x[:-1] - 1
+        hedged_return = return_y[1:] - hedge[1:-1] * return_x[1:]
+        return zscore, hedged_return
+
+    def _evaluate(self, zscore, hedged_return, entry, exit_):
+        """
+        Sharpe ratio, max drawdown and total return for a batch of threshold combinations.
+        """
+        sizer = SignalGenerator(None, entry[:, None], exit_[:, None], self.max_position)
+        position = SignalGenerator.forward_fill(sizer.calculate_position_sizes(zscore), fill_value=0.0)
+        np.clip(position, -self.max_position, self.max_position, out=position)
+
+        held = position[:, 1:-1]
+        trades = np.abs(position[:, 2:] - held)
+        strategy_return = held * hedged_return - trades * self.transaction_cost
+        cumulative = np.cumprod(1 + strategy_return, axis=1)
+
+        return (sharpe_ratio(strategy_return, self.periods_per_year), max_drawdown(cumulative),
+                cumulative[:, -1] - 1, (trades > 0).sum(axis=1))
+
+    def run(self, windows, entry_thresholds, exit_thresholds):
+        """
+        Evaluates every (window, entry, exit) combination.
+
+        Returns:
+            pd.DataFrame: One row per combination with Sharpe_Ratio, Max_Drawdown, Total_Return and Trades.
+        """
+        grid = np.array(list(itertools.product(entry_thresholds, exit_thresholds)), dtype=np.float64)
+        tables = []
+        for window in windows:
+            zscore, hedged_return = self._window_inputs(window)
+            for start in range(0, len(grid), self.chunk_size):
+                chunk = grid[start:start + self.chunk_size]
+                if len(hedged_return) < 2:
+                    metrics = [np.full(len(chunk), np.nan)] * 3 + [np.zeros(len(chunk), dtype=int)]
+                else:
+                    metrics = self._evaluate(zscore, hedged_return, chunk[:, 0], chunk[:, 1])
+                tables.append(pd.DataFrame({
+                    'Window': window,
+                    'Entry_Threshold': chunk[:, 0],
+                    'Exit_Threshold': chunk[:, 1],
+                    'Sharpe_Ratio': metrics[0],
+                    'Max_Drawdown': metrics[1],
+                    'Total_Return': metrics[2],
+                    'Trades': metrics[3],
+                }))
+        self.results = pd.concat(tables, ignore_index=True)
+        return self.results
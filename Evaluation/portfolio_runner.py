@@ -0,0 +1,205 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from Data.price_panel import PricePanel
+from Evaluation.backtester import Backtester
+from Evaluation.evaluator import Evaluator, max_drawdown, performance_summary, sharpe_ratio, trade_statistics
+from Utils.hedge_ratio_calculator import HedgeRatioCalculator
+from Utils.signal_generator import SignalGenerator
+from Utils.spread_calculator import SpreadCalculator
+
+
+# Shared-memory blocks attached by this worker process, keyed by block name
+_attached = {}
+
+
+def _attach(name, shape, dtype, order='C'):
+    """
+    Returns an array view on a shared-memory block, attaching once per worker process.
+    """
+    if name not in _attached:
+        _attached[name] = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape, dtype=dtype, buffer=_attached[name].buf, order=order)
+
+
+def run_pair_pipeline(data, dependent_var, independent_var, split_ratio=0.66, window=20, entry_threshold=2.5,
+                      exit_threshold=0.5, transaction_cost=0.002, hedge_mode='static', hedge_window=60,
+                      periods_per_year=252, split_point=None):
+    """
+    Runs hedge -> spread -> signal -> backtest -> evaluate for one pair, without plotting.
+
+    :param split_point: Number of training rows; overrides split_ratio (e.g. for walk-forward folds).
+    Returns:
+        tuple: (test results DataFrame, metrics dict)
+    """
+    if split_point is None:
+        split_point = int(len(data) * split_ratio)
+    training_data, test_data = data.iloc[:split_point], data.iloc[split_point:]
+
+    calculator = HedgeRatioCalculator(training_data, dependent_var, independent_var)
+    if hedge_mode == 'static':
+        hedge_ratio = calculator.calculate_hedge_ratio()
+    elif hedge_mode == 'rolling':
+        hedge_ratio = calculator.calculate_rolling_hedge_ratio(data, window=hedge_window)
+    elif hedge_mode == 'kalman':
+        hedge_ratio = calculator.calculate_kalman_hedge_ratio(data)
+    else:
+        raise ValueError(f"Unknown hedge mode: {hedge_mode}")
+
+    spread_calculator = SpreadCalculator(test_data, hedge_ratio, dependent_var, independent_var, window=window)
+    spread_calculator.compute_spread()
+    signals = SignalGenerator(spread_calculator.compute_zscore(), entry_threshold, exit_threshold).generate_signals()
+    results = Backtester(signals, dependent_var, independent_var, hedge_ratio, transaction_cost).backtest()
+
+    evaluator = Evaluator(results, periods_per_year)
+    metrics = {
+        'Hedge_Ratio': float(hedge_ratio) if np.isscalar(hedge_ratio) else float(hedge_ratio.iloc[-1]),
+        'Sharpe_Ratio': evaluator.compute_sharpe_ratio(),
+        'Max_Drawdown': evaluator.compute_max_drawdown(),
+        'Total_Return': float(results['Cumulative_Return'].iloc[-1] - 1) if len(results) else np.nan,
+        'Trades': int((results['Trade'] > 0).sum()),
+    }
+    return results, metrics
+
+
+def _run_pair_task(task):
+    """
+    Worker entry point: rebuilds the pair's frame from shared memory and runs the pair pipeline.
+
+    Only the pair's strategy returns and positions (as row positions into the shared index) and its
+    metrics are sent back, never the price frames.
+    """
+    (prices_name, index_name, shape, dependent_col, independent_col, params) = task
+    prices = _attach(prices_name, shape, np.float64, order='F')
+    index = _attach(index_name, (shape[0],), np.int64)
+
+    y = prices[:, dependent_col]
+    x = prices[:, independent_col]
+    rows = np.flatnonzero(~np.isnan(y) & ~np.isnan(x))
+    data = pd.DataFrame({'Price_Y': y[rows], 'Price_X': x[rows], 'Row': rows},
+                        index=pd.DatetimeIndex(index[rows].view('M8[ns]')))
+
+    results, metrics = run_pair_pipeline(data, 'Price_Y', 'Price_X', **params)
+    return (results['Row'].to_numpy(), results['Strategy_Return'].to_numpy(dtype=np.float64),
+            results['Position'].to_numpy(dtype=np.float64), metrics)
+
+
+class PortfolioRunner:
+    """
+    Backtests many pairs in parallel and aggregates them into an equal-weight portfolio.
+
+    The aligned price panel (time x symbol) is placed in shared memory once, column-major; worker
+    processes attach to it by name and take their two columns as contiguous views, so no DataFrames
+    are pickled to the workers.
+    """
+
+    def __init__(self, prices, pairs, max_workers=None, periods_per_year=252, **pipeline_params):
+        """
+        :param prices: Aligned price panel, one column per symbol (NaN where a symbol has no bar), as a
+                       DataFrame or PricePanel, or a dict of symbol to DataFrame with a 'Price' column.
+        :param pairs: List of (dependent, independent) symbols.
+        :param max_workers: Worker processes (defaults to the CPU count).
+        :param pipeline_params: Passed to run_pair_pipeline (window, thresholds, transaction_cost, ...).
+        """
+        if isinstance(prices, dict):
+            prices = PricePanel.from_frames(prices)
+        if isinstance(prices, PricePanel):
+            prices = prices.to_frame()
+        self.prices = prices
+        self.pairs = pairs
+        self.max_workers = max_workers or os.cpu_count()
+        self.periods_per_year = periods_per_year
+        self.pipeline_params = dict(pipeline_params, periods_per_year=periods_per_year)
+        self.pair_metrics = None
+        self.pair_results = None
+        self.portfolio_results = None
+
+    def _share(self, array, order='C'):
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf, order=order)[:] = array
+        return block
+
+    def run(self):
+        """
+        Runs every pair and builds the portfolio equity curve.
+
+        Returns:
+            pd.DataFrame: Per-pair metrics, with the portfolio-level row last.
+        """
+        columns = {symbol: i for i, symbol in enumerate(self.prices.columns)}
+        index = pd.DatetimeIndex(self.prices.index)
+        index_values = (index.tz_convert('UTC') if index.tz is not None else index).asi8
+        prices_block = self._share(self.prices.to_numpy(dtype=np.float64), order='F')
+        index_block = self._share(np.ascontiguousarray(index_values))
+
+        tasks = [(prices_block.name, index_block.name, self.prices.shape, columns[dependent], columns[independent],
+                  self.pipeline_params) for dependent, independent in self.pairs]
+        try:
+            if self.max_workers > 1:
+                with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                    outcomes = list(executor.map(_run_pair_task, tasks))
+            else:
+                outcomes = [_run_pair_task(task) for task in tasks]
+        finally:
+            for block in (prices_block, index_block):
+                block.close()
+                block.unlink()
+            for block in _attached.values():
+                block.close()
+            _attached.clear()
+
+        # Equal-weight portfolio: each pair gets 1/N of capital, pairs out of the market earn zero
+        strategy_returns = np.zeros((len(self.pairs), len(index)))
+        active = np.zeros(len(index), dtype=bool)
+        for k, (rows, returns, _, _) in enumerate(outcomes):
+            valid = ~np.isnan(returns)
+            strategy_returns[k, rows[valid]] = returns[valid]
+            active[rows[valid]] = True
+        portfolio_return = strategy_returns.mean(axis=0)[active]
+        self.pair_results = [(returns, positions) for _, returns, positions, _ in outcomes]
+        cumulative = np.cumprod(1 + portfolio_return)
+
+        self.portfolio_results = pd.DataFrame({'Strategy_Return': portfolio_return, 'Cumulative_Return': cumulative},
+                                              index=index[active])
+        self.pair_metrics = pd.DataFrame(
+            [dict(Dependent=dependent, Independent=independent, **metrics)
+             for (dependent, independent), (_, _, _, metrics) in zip(self.pairs, outcomes)]
+        )
+        portfolio = {
+            'Dependent': 'PORTFOLIO', 'Independent': '',
+            'Sharpe_Ratio': float(sharpe_ratio(portfolio_return, self.periods_per_year)) if len(cumulative) > 1 else np.nan,
+            'Max_Drawdown': float(max_drawdown(cumulative)) if len(cumulative) else np.nan,
+            'Total_Return': float(cumulative[-1] - 1) if len(cumulative) else np.nan,
+            'Trades': int(self.pair_metrics['Trades'].sum()),
+        }
+        return pd.concat([self.pair_metrics, pd.DataFrame([portfolio])], ignore_index=True)
+
+    def summary(self, window=63):
+        """
+        Performance summary of every pair and the portfolio (last row). Requires run to have been called.
+
+        Each pair is summarized on its own bars, as in its Sharpe_Ratio from run, with the round-trip
+        statistics of its positions; pairs with the same number of bars share one batched pass. The
+        portfolio row covers the bars where any pair has a return and has no round trips of its own.
+        """
+        names = [f'{dependent}/{independent}' for dependent, independent in self.pairs]
+        groups = {}
+        for k, (returns, _) in enumerate(self.pair_results):
+            groups.setdefault((len(returns), int(np.isnan(returns).sum())), []).append(k)
+
+        tables = []
+        for members in groups.values():
+            returns = np.vstack([self.pair_results[k][0] for k in members])
+            positions = np.vstack([self.pair_results[k][1] for k in members])
+            table = performance_summary(returns[~np.isnan(returns)].reshape(len(members), -1), window=window,
+                                        periods_per_year=self.periods_per_year, names=[names[k] for k in members])
+            # Round trips use every results row, as in Evaluator.summary: a trip can open on the first bar
+            tables.append(table.assign(**trade_statistics(positions, returns)))
+        tables.append(performance_summary(self.portfolio_results['Strategy_Return'].to_numpy(), window=window,
+                                          periods_per_year=self.periods_per_year, names=['PORTFOLIO']))
+        order = [k for members in groups.values() for k in members] + [len(names)]
+        return pd.concat(tables).iloc[np.argsort(order)]
@@ -0,0 +1,107 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def decimate(series, max_points=5000):
+    """
+    Reduces a series to at most about max_points points for plotting.
+
+    The series is cut into max_points / 2 buckets and each bucket keeps its minimum and maximum in
+    time order, so peaks and drawdowns survive while render time stays bounded on million-point
+    minute series.
+
+    Returns:
+        tuple: (x values, y values) as NumPy arrays.
+    """
+    x = series.index.to_numpy()
+    y = series.to_numpy(dtype=np.float64)
+    if len(y) <= max_points:
+        return x, y
+
+    n_buckets = max_points // 2
+    edges = np.linspace(0, len(y), n_buckets + 1).astype(np.int64)
+    starts = edges[:-1]
+    # NaNs would win every min/max; treat them as neutral for bucket selection
+    lows = np.where(np.isnan(y), np.inf, y)
+    highs = np.where(np.isnan(y), -np.inf, y)
+    argmins = starts + np.array([np.argmin(lows[a:b]) for a, b in zip(starts, edges[1:])])
+    argmaxs = starts + np.array([np.argmax(highs[a:b]) for a, b in zip(starts, edges[1:])])
+    keep = np.unique(np.concatenate([argmins, argmaxs]))
+    return x[keep], y[keep]
+
+
+def render_line_chart(x, y, title, ylabel, file_path, label=None):
+    """
+    Renders one line chart to a PNG file with the Agg canvas.
+
+    Uses matplotlib's object-oriented API without pyplot, so it never opens a window, does not touch
+    global backend state and is safe to run in a worker. matplotlib is imported here only.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(12, 6))
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    axes.plot(x, y, label=label or ylabel)
+    axes.set_title(title)
+    axes.set_xlabel('Date')
+    axes.set_ylabel(ylabel)
+    axes.legend()
+    figure.savefig(file_path)
+    return file_path
+
+
+class ReportGenerator:
+    """
+    Renders strategy charts to image files for headless and batch runs.
+
+    Series are decimated before rendering. With background=True, rendering runs in a worker process
+    so the caller can continue computing; call wait() (or close()) to collect the written paths.
+    """
+
+    def __init__(self, output_dir='reports', background=False, max_points=5000):
+        self.output_dir = output_dir
+        self.background = background
+        self.max_points = max_points
+        self.executor = None
+        self.pending = []
+        self.written = []
+
+        if not os.path.exists(self.output_dir):
+            os.makedirs(self.output_dir)
+
+    def plot_series(self, series, title, file_name, ylabel='Cumulative Return', label=None):
+        """
+        Writes one series as a line chart to output_dir/file_name.
+        """
+        x, y = decimate(series.dropna(), self.max_points)
+        file_path = os.path.join(self.output_dir, file_name)
+        if self.background:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=1)
+            self.pending.append(self.executor.submit(render_line_chart, x, y, title, ylabel, file_path, label))
+        else:
+            self.written.append(render_line_chart(x, y, title, ylabel, file_path, label))
+        return file_path
+
+    def wait(self):
+        """
+        Waits for background renders to finish.
+
+        Returns:
+            list: Paths of all charts written so far.
+        """
+        for future in self.pending:
+            self.written.append(future.result())
+        self.pending = []
+        return self.written
+
+    def close(self):
+        written = self.wait()
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        return written
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+from Evaluation.evaluator import Evaluator, max_drawdown, sharpe_ratio
+
+
+def stationary_bootstrap_indices(n_rows, n_resamples, mean_block, rng):
+    """
+    Row indices of n_resamples stationary block-bootstrap resamples (Politis & Romano) of a series.
+
+    Each resample is a concatenation of blocks that start at uniformly drawn rows and wrap around
+    the end of the series; a new block starts at every row with probability 1 / mean_block, so block
+    lengths are geometric with mean mean_block. Built for all resamples at once on the flattened
+    (resamples x rows) matrix as one cumulative sum of index steps: +1 within a block, and a jump
+    from the previous block's last index to the new start where a block begins.
+
+    Returns:
+        np.ndarray: (n_resamples x n_rows) int64 array of row indices.
+    """
+    size = n_resamples * n_rows
+    new_block = rng.random(size, dtype=np.float32) < 1.0 / mean_block
+    new_block[::n_rows] = True
+    block_rows = np.flatnonzero(new_block)
+    # Index minus flat position is constant within a block, so its difference between blocks is the jump
+    offsets = rng.integers(0, n_rows, size=len(block_rows)) - block_rows
+    steps = np.ones(size, dtype=np.int64)
+    steps[block_rows] = np.diff(offsets, prepend=0) + 1
+    steps[0] -= 1
+    indices = np.cumsum(steps, out=steps)
+    indices %= n_rows
+    return indices.reshape(n_resamples, n_rows)
+
+
+class BootstrapEvaluator(Evaluator):
+    """
+    Robustness of the strategy's performance under stationary block-bootstrap resampling.
+
+    Resamples the valid Strategy_Return rows thousands of times, keeping short-range dependence
+    within blocks, and computes the Sharpe ratio, maximum drawdown and CAGR of every resample with
+    the same array functions compute_sharpe_ratio and compute_max_drawdown use. The resamples are
+    processed as (resamples x time) matrices, in chunks of at most max_chunk_bytes per matrix.
+    Results are reproducible for a given seed and max_chunk_bytes.
+    """
+
+    METRICS = ['Sharpe_Ratio', 'Max_Drawdown', 'CAGR']
+
+    def __init__(self, data, periods_per_year=252, n_resamples=10_000, mean_block=None, max_chunk_bytes=2 ** 25,
+                 seed=None):
+        """
+        :param mean_block: Mean block length in bars; defaults to the cube root of the number of returns.
+        """
+        super().__init__(data, periods_per_year)
+        self.n_resamples = n_resamples
+        self.mean_block = mean_block
+        self.max_chunk_bytes = max_chunk_bytes
+        self.seed = seed
+        self.distributions = None
+
+    def compute_cagr(self, returns=None):
+        """
+        Compound annual growth rate of the strategy (or of each row of a return matrix).
+        """
+        if returns is None:
+            returns = self._valid('Strategy_Return')
+        growth = np.prod(1 + np.asarray(returns, dtype=np.float64), axis=-1)
+        return growth ** (self.periods_per_year / np.shape(returns)[-1]) - 1
+
+    def resample_metrics(self):
+        """
+        Computes the metrics of every bootstrap resample.
+
+        Returns:
+            pd.DataFrame: One row per resample with Sharpe_Ratio, Max_Drawdown and CAGR.
+        """
+        returns = self._valid('Strategy_Return')
+        n_rows = len(returns)
+        if n_rows < 2:
+            raise ValueError("At least two strategy returns are needed to bootstrap.")
+        mean_block = self.mean_block or max(1.0, round(n_rows ** (1 / 3)))
+        rng = np.random.default_rng(self.seed)
+        chunk_resamples = max(1, self.max_chunk_bytes // (8 * n_rows))
+
+        sharpe = np.empty(self.n_resamples)
+        drawdown = np.empty(self.n_resamples)
+        cagr = np.empty(self.n_resamples)
+        for start in range(0, self.n_resamples, chunk_resamples):
+            end = min(start + chunk_resamples, self.n_resamples)
+            resampled = returns[stationary_bootstrap_indices(n_rows, end - start, mean_block, rng)]
+            sharpe[start:end] = sharpe_ratio(resampled, self.periods_per_year)
+            # Cumulative returns in place, as Backtester computes them from the strategy returns
+            resampled += 1
+            np.cumprod(resampled, axis=1, out=resampled)
+            drawdown[start:end] = max_drawdown(resampled)
+            cagr[start:end] = resampled[:, -1] ** (self.periods_per_year / n_rows) - 1
+
+        self.distributions = pd.DataFrame({'Sharpe_Ratio': sharpe, 'Max_Drawdown': drawdown, 'CAGR': cagr})
+        return self.distributions
+
+    def confidence_intervals(self, level=0.95):
+        """
+        Percentile confidence intervals of the resampled metrics, next to the observed values.
+
+        Returns:
+            pd.DataFrame: Observed, Median, Lower and Upper per metric.
+        """
+        if self.distributions is None:
+            self.resample_metrics()
+        tail = (1 - level) / 2 * 100
+        lower, median, upper = np.nanpercentile(self.distributions[self.METRICS].to_numpy(),
+                                                [tail, 50, 100 - tail], axis=0)
+        observed = [self.compute_sharpe_ratio(), self.compute_max_drawdown(), float(self.compute_cagr())]
+        return pd.DataFrame({'Observed': observed, 'Median': median, 'Lower': lower, 'Upper': upper},
+                            index=self.METRICS)
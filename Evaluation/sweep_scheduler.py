@@ -0,0 +1,286 @@
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from Data.data_preprocessor import DataPreprocessor
+from Data.price_store import ColumnarPriceStore
+from Evaluation.portfolio_runner import run_pair_pipeline
+
+# Merged pairs already loaded by this process, most recent last; jobs arrive pair by pair
+_merged_pairs = {}
+MAX_MERGED_PAIRS = 4
+
+
+def load_pair(store_dir, bar_size, dependent, independent, max_fill=0, frequency=None):
+    """
+    Merged (and optionally resampled) prices of a pair from a ColumnarPriceStore, memoized per process
+    until either leg's file changes version.
+    """
+    store = ColumnarPriceStore(store_dir)
+    key = (store_dir, bar_size, dependent, independent, max_fill, frequency, store.version(dependent, bar_size),
+           store.version(independent, bar_size))
+    if key not in _merged_pairs:
+        preprocessor = DataPreprocessor(store.load_many([dependent, independent], bar_size))
+        preprocessor.merge_data(max_fill=max_fill)
+        if frequency is not None:
+            preprocessor.resample(frequency)
+        if len(_merged_pairs) >= MAX_MERGED_PAIRS:
+            _merged_pairs.pop(next(iter(_merged_pairs)))
+        _merged_pairs[key] = preprocessor.merged_data
+    return _merged_pairs[key]
+
+
+def run_sweep_job(job):
+    """
+    Runs one sweep unit: run_pair_pipeline for one pair, parameter set and optional walk-forward fold.
+
+    The worker loads the pair from the store itself, so only the small job payload is sent to it.
+
+    Returns:
+        dict: The pipeline's metrics.
+    """
+    data = load_pair(job['store_dir'], job['bar_size'], job['dependent'], job['independent'],
+                     job['max_fill'], job['frequency'])
+    params = dict(job['params'])
+    if job['fold_rows'] is not None:
+        train_start, train_end, test_end = job['fold_rows']
+        data = data.iloc[train_start:test_end]
+        params['split_point'] = train_end - train_start
+    _, metrics = run_pair_pipeline(data, f"Price_{job['dependent']}", f"Price_{job['independent']}",
+                                   periods_per_year=job['periods_per_year'], **params)
+    return metrics
+
+
+def sweep_jobs(pairs, param_grid, store_dir, bar_size='1 day', folds=None, max_fill=0, frequency=None,
+               periods_per_year=252, data_version=None):
+    """
+    Job payloads for every pair x parameter combination (x walk-forward fold), for run_sweep_job.
+
+    Each payload records the store version (row count and last timestamp) of both legs, so once bars
+    are added to the store the jobs get new ids and rerun instead of keeping the old results.
+
+    :param param_grid: dict of run_pair_pipeline parameter to the list of values to sweep.
+    :param folds: Optional dict of (dependent, independent) to its (train_start, train_end, test_end)
+                  folds; without it every pair uses the single train/test split.
+    :param data_version: Optional label for data changes the store version does not show, e.g. bars
+                         corrected in place; changing it reruns every job.
+    """
+    store = ColumnarPriceStore(store_dir)
+    names = list(param_grid)
+    jobs = []
+    for dependent, independent in pairs:
+        store_version = f"{store.version(dependent, bar_size)}/{store.version(independent, bar_size)}"
+        if folds is None:
+            pair_folds = [(None, None)]
+        else:
+            pair_folds = list(enumerate(folds.get((dependent, independent), [])))
+        for values in itertools.product(*(param_grid[name] for name in names)):
+            for fold, fold_rows in pair_folds:
+                jobs.append({
+                    'dependent': dependent, 'independent': independent, 'params': dict(zip(names, values)),
+                    'fold': fold, 'fold_rows': list(fold_rows) if fold_rows is not None else None,
+                    'store_dir': store_dir, 'bar_size': bar_size, 'max_fill': max_fill, 'frequency': frequency,
+                    'periods_per_year': periods_per_year, 'store_version': store_version,
+                    'data_version': data_version,
+                })
+    return jobs
+
+
+def _run_job(job_function, payload):
+    """
+    Worker entry point: runs one job and reports (status, result or error, seconds).
+    """
+    start = time.perf_counter()
+    try:
+        status, outcome = 'done', json.dumps(job_function(json.loads(payload)))
+    except Exception as error:
+        status, outcome = 'failed', f"{type(error).__name__}: {error}"
+    return status, outcome, time.perf_counter() - start
+
+
+def format_seconds(seconds):
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+class SweepScheduler:
+    """
+    Resumable job scheduler for long sweeps, backed by an SQLite job table.
+
+    Every unit of work (e.g. one pair, parameter set and fold) is a row keyed by a hash of its JSON
+    payload, with a status of pending, done or failed. Pending jobs are dispatched to a process pool
+    with at most max_in_flight submitted at a time. Finished jobs are written back in batches, one
+    transaction per batch, and the last batch is written on an interrupt as well, so a crash loses at
+    most the batch in progress. Adding the same jobs again keeps their status, so rerunning a sweep
+    only runs the units that have not completed; payloads that record the data version (see
+    sweep_jobs) rerun once the data changes.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            result TEXT,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            elapsed REAL,
+            finished REAL
+        )
+    """
+
+    def __init__(self, db_path, job_function=run_sweep_job, max_workers=None, max_in_flight=None, batch_size=100,
+                 flush_seconds=5.0, report_seconds=10.0):
+        """
+        :param job_function: Module-level function run on each job's payload dict, returning a JSON-able result.
+        :param max_workers: Worker processes (defaults to the CPU count); 1 runs the jobs in this process.
+        :param max_in_flight: Jobs submitted to the pool at once (defaults to twice max_workers).
+        :param batch_size: Finished jobs per database write; a write also happens every flush_seconds.
+        :param report_seconds: Seconds between progress lines.
+        """
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        self.job_function = job_function
+        self.max_workers = max_workers or os.cpu_count()
+        self.max_in_flight = max_in_flight or 2 * self.max_workers
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.report_seconds = report_seconds
+
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        with self.connection:
+            self.connection.execute(self.SCHEMA)
+            self.connection.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)')
+
+    def add_jobs(self, payloads):
+        """
+        Adds jobs; a job already in the table (same payload) keeps its status and result.
+
+        Returns:
+            list: The job ids.
+        """
+        rows = []
+        for payload in payloads:
+            text = json.dumps(payload, sort_keys=True)
+            rows.append((hashlib.blake2b(text.encode(), digest_size=16).hexdigest(), text))
+        with self.connection:
+            self.connection.executemany('INSERT OR IGNORE INTO jobs (job_id, payload) VALUES (?, ?)', rows)
+        return [job_id for job_id, _ in rows]
+
+    def status_counts(self):
+        return dict(self.connection.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status'))
+
+    def _execute(self, jobs):
+        """
+        Runs the (job_id, payload) jobs, yielding (job_id, status, outcome, seconds) as they finish.
+        """
+        if self.max_workers == 1:
+            for job_id, payload in jobs:
+                yield (job_id,) + _run_job(self.job_function, payload)
+            return
+
+        executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        remaining = iter(jobs)
+        in_flight = {}
+        try:
+            while True:
+                for job_id, payload in itertools.islice(remaining, self.max_in_flight - len(in_flight)):
+                    in_flight[executor.submit(_run_job, self.job_function, payload)] = job_id
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield (in_flight.pop(future),) + future.result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def _flush(self, finished):
+        """
+        Writes a batch of finished jobs in one transaction.
+        """
+        if not finished:
+            return
+        rows = [(status, outcome if status == 'done' else None, outcome if status == 'failed' else None, seconds,
+                 finished_at, job_id) for job_id, status, outcome, seconds, finished_at in finished]
+        with self.connection:
+            self.connection.executemany(
+                'UPDATE jobs SET status = ?, result = ?, error = ?, attempts = attempts + 1, elapsed = ?, '
+                'finished = ? WHERE job_id = ?', rows)
+        finished.clear()
+
+    def _report(self, completed, total, failed, start):
+        elapsed = time.perf_counter() - start
+        rate = completed / elapsed if elapsed > 0 else 0.0
+        eta = format_seconds((total - completed) / rate) if rate > 0 else '?'
+        print(f"{completed:,}/{total:,} jobs ({failed:,} failed) | {rate:.1f} jobs/s | "
+              f"elapsed {format_seconds(elapsed)} | ETA {eta}")
+
+    def run(self, retry_failed=False):
+        """
+        Runs every pending job, and the failed ones too with retry_failed, reporting progress.
+
+        Returns:
+            dict: Job count per status after the run.
+        """
+        statuses = ('pending', 'failed') if retry_failed else ('pending',)
+        jobs = self.connection.execute(
+            f"SELECT job_id, payload FROM jobs WHERE status IN ({', '.join('?' * len(statuses))}) ORDER BY rowid",
+            statuses).fetchall()
+        counts = self.status_counts()
+        print(f"{counts.get('done', 0):,} of {sum(counts.values()):,} jobs already done; running {len(jobs):,}.")
+
+        finished, completed, failed = [], 0, 0
+        start = last_flush = last_report = time.perf_counter()
+        try:
+            for job_id, status, outcome, seconds in self._execute(jobs):
+                finished.append((job_id, status, outcome, seconds, time.time()))
+                completed += 1
+                failed += status == 'failed'
+                now = time.perf_counter()
+                if len(finished) >= self.batch_size or now - last_flush >= self.flush_seconds:
+                    self._flush(finished)
+                    last_flush = now
+                if now - last_report >= self.report_seconds:
+                    self._report(completed, len(jobs), failed, start)
+                    last_report = now
+        finally:
+            self._flush(finished)
+        self._report(completed, len(jobs), failed, start)
+        return self.status_counts()
+
+    def results(self):
+        """
+        Completed jobs as a DataFrame: the payload fields, with nested dicts (params) flattened, and
+        the job's result fields.
+        """
+        rows = []
+        for payload, result in self.connection.execute(
+                "SELECT payload, result FROM jobs WHERE status = 'done' ORDER BY rowid"):
+            row = {}
+            for name, value in json.loads(payload).items():
+                if isinstance(value, dict):
+                    row.update(value)
+                else:
+                    row[name] = value
+            row.update(json.loads(result))
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def failures(self):
+        """
+        Failed jobs with their payload and error message.
+        """
+        return pd.read_sql_query("SELECT job_id, payload, error, attempts FROM jobs WHERE status = 'failed'",
+                                 self.connection)
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,141 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from Data.data_preprocessor import DataPreprocessor
+from Evaluation.backtester import Backtester
+from Evaluation.evaluator import Evaluator
+from Utils.signal_generator import SignalGenerator
+from Utils.spread_calculator import rolling_mean_std
+
+
+def _fold_zscores(y, x, hedge_ratio, window):
+    """
+    Spread and rolling statistics for one fold's test rows plus window - 1 warm-up rows before them.
+
+    Follows SpreadCalculator.compute_zscore, with the same rolling statistics: rows whose standard
+    deviation is zero or undefined are dropped, so only the warm-up rows are lost when enough history
+    precedes the test window.
+
+    Returns:
+        tuple: (kept row offsets into the given arrays, spread, mean, std, zscore) arrays.
+    """
+    spread = y - hedge_ratio * x
+    mean, std = rolling_mean_std(spread, window)
+    keep = np.flatnonzero(~np.isnan(std) & (std != 0))
+    return keep, spread[keep], mean[keep], std[keep], (spread[keep] - mean[keep]) / std[keep]
+
+
+class WalkForward:
+    """
+    Walk-forward evaluation of the pair strategy with rolling or expanding training windows.
+
+    Per-fold intermediates (hedge ratio, spread and rolling statistics) are cached on the instance:
+    hedge ratios come from prefix sums, so overlapping training windows cost O(1) each, and folds
+    already computed are reused when the fold layout or the thresholds change. The folds' test
+    windows are stitched into one out-of-sample series, with positions carried across fold
+    boundaries, and backtested and evaluated in one pass.
+    """
+
+    def __init__(self, data, dependent_var, independent_var, train_size, test_size, expanding=False, window=20,
+                 entry_threshold=2.5, exit_threshold=0.5, max_position=1.0, transaction_cost=0.002,
+                 periods_per_year=252, max_workers=1):
+        self.data = data
+        self.dependent_var = dependent_var
+        self.independent_var = independent_var
+        self.train_size = train_size
+        self.test_size = test_size
+        self.expanding = expanding
+        self.window = window
+        self.entry_threshold = entry_threshold
+        self.exit_threshold = exit_threshold
+        self.max_position = max_position
+        self.transaction_cost = transaction_cost
+        self.periods_per_year = periods_per_year
+        self.max_workers = max_workers
+
+        self.y = data[dependent_var].to_numpy(dtype=np.float64)
+        self.x = data[independent_var].to_numpy(dtype=np.float64)
+        # Prefix sums of mean-centered prices; any training window's OLS fit is a difference of two rows
+        self.y_mean, self.x_mean = self.y.mean(), self.x.mean()
+        dy, dx = self.y - self.y_mean, self.x - self.x_mean
+        self.prefix = np.vstack([np.zeros(4), np.cumsum(np.column_stack([dx, dy, dx * dx, dx * dy]), axis=0)])
+
+        self.hedge_cache = {}
+        self.fold_cache = {}
+        self.results = None
+
+    def folds(self):
+        preprocessor = DataPreprocessor({})
+        preprocessor.merged_data = self.data
+        return preprocessor.walk_forward_folds(self.train_size, self.test_size, self.expanding)
+
+    def hedge_ratio(self, start, end):
+        """
+        OLS hedge ratio over rows [start, end), from the cached prefix sums.
+        """
+        key = (start, end)
+        if key not in self.hedge_cache:
+            n = end - start
+            s_x, s_y, s_xx, s_xy = self.prefix[end] - self.prefix[start]
+            self.hedge_cache[key] = (s_xy - s_x * s_y / n) / (s_xx - s_x * s_x / n)
+        return self.hedge_cache[key]
+
+    def compute_folds(self):
+        """
+        Computes the spread and rolling statistics of every fold not in the cache yet.
+        """
+        tasks = []
+        folds = self.folds()
+        for train_start, train_end, test_end in folds:
+            key = (train_start, train_end, test_end, self.window)
+            if key in self.fold_cache:
+                continue
+            hedge_ratio = self.hedge_ratio(train_start, train_end)
+            warm_start = max(0, train_end - (self.window - 1))
+            tasks.append((key, warm_start, hedge_ratio,
+                          (self.y[warm_start:test_end], self.x[warm_start:test_end], hedge_ratio, self.window)))
+
+        if self.max_workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                outputs = list(executor.map(_fold_zscores, *zip(*(task[3] for task in tasks))))
+        else:
+            outputs = [_fold_zscores(*task[3]) for task in tasks]
+
+        for (key, warm_start, hedge_ratio, _), (keep, spread, mean, std, zscore) in zip(tasks, outputs):
+            rows = warm_start + keep
+            in_test = rows >= key[1]
+            self.fold_cache[key] = pd.DataFrame({
+                'Spread': spread[in_test], 'Mean': mean[in_test], 'Std': std[in_test], 'ZScore': zscore[in_test],
+                'Hedge_Ratio': hedge_ratio, 'Fold_Train_End': key[1],
+            }, index=self.data.index[rows[in_test]])
+        print(f"Walk-forward: {len(tasks)} fold(s) computed, {len(folds) - len(tasks)} reused from cache.")
+
+    def run(self):
+        """
+        Stitches the folds' out-of-sample windows and backtests them as one series.
+
+        Returns:
+            pd.DataFrame: Backtest results over all test windows, ready for Evaluator.
+        """
+        self.compute_folds()
+        folds = [self.fold_cache[(train_start, train_end, test_end, self.window)]
+                 for train_start, train_end, test_end in self.folds()]
+        stitched = pd.concat(folds)
+        stitched[self.dependent_var] = self.data[self.dependent_var].reindex(stitched.index)
+        stitched[self.independent_var] = self.data[self.independent_var].reindex(stitched.index)
+
+        signals = SignalGenerator(stitched, self.entry_threshold, self.exit_threshold,
+                                  self.max_position).generate_signals()
+        backtester = Backtester(signals, self.dependent_var, self.independent_var, stitched['Hedge_Ratio'],
+                                self.transaction_cost)
+        self.results = backtester.backtest()
+        return self.results
+
+    def evaluate(self):
+        """
+        Out-of-sample Sharpe ratio and maximum drawdown of the stitched walk-forward run.
+        """
+        evaluator = Evaluator(self.results, self.periods_per_year)
+        return evaluator.compute_sharpe_ratio(), evaluator.compute_max_drawdown()
@@ -1,32 +1,217 @@
-from statsmodels.regression.linear_model import OLS
-from statsmodels.tools import add_constant
+import numpy as np
+import pandas as pd
+
+from Utils.numba_support import njit
+
+
+def _centered_moments(y, x):
+    """
+    Means and centered second moments of y and x along the time axis (axis 0).
+
+    Works on 1-D series or on (time x pairs) arrays, one column per pair.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64)
+    mean_y = y.mean(axis=0)
+    mean_x = x.mean(axis=0)
+    dy = y - mean_y
+    dx = x - mean_x
+    s_xx = np.einsum('t...,t...->...', dx, dx)
+    s_yy = np.einsum('t...,t...->...', dy, dy)
+    s_xy = np.einsum('t...,t...->...', dx, dy)
+    return mean_y, mean_x, s_xx, s_yy, s_xy
+
+
+def solve_ols(y, x):
+    """
+    Closed-form OLS fit of y = intercept + slope * x.
+
+    :param y: Dependent prices, 1-D or (time x pairs).
+    :param x: Independent prices, same shape as y.
+    :return: (intercept, slope), scalars or one value per pair.
+    """
+    mean_y, mean_x, s_xx, _, s_xy = _centered_moments(y, x)
+    slope = s_xy / s_xx
+    return mean_y - slope * mean_x, slope
+
+
+def solve_tls(y, x):
+    """
+    Closed-form total least squares (orthogonal regression) fit of y = intercept + slope * x.
+
+    Minimizes perpendicular distances, so the result does not depend on which leg is dependent.
+
+    :param y: Dependent prices, 1-D or (time x pairs).
+    :param x: Independent prices, same shape as y.
+    :return: (intercept, slope), scalars or one value per pair.
+    """
+    mean_y, mean_x, s_xx, s_yy, s_xy = _centered_moments(y, x)
+    diff = s_yy - s_xx
+    slope = (diff + np.sqrt(diff ** 2 + 4 * s_xy ** 2)) / (2 * s_xy)
+    return mean_y - slope * mean_x, slope
+
+
+def rolling_ols(y, x, window):
+    """
+    Rolling-window OLS fit of y = intercept + slope * x over the last `window` bars (inclusive),
+    built from cumulative sums in a single O(n) pass.
+
+    Both series are centered on their overall mean before summing, which keeps the cumulative sums
+    small and the window differences precise on long histories.
+
+    :param y: Dependent prices, 1-D.
+    :param x: Independent prices, 1-D.
+    :param window: Number of bars per fit.
+    :return: (intercept, slope) arrays, NaN for the first window - 1 bars.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64)
+    y0, x0 = y.mean(), x.mean()
+    dy = y - y0
+    dx = x - x0
+
+    def window_sum(values):
+        csum = np.concatenate(([0.0], np.cumsum(values)))
+        sums = np.full(len(values), np.nan)
+        sums[window - 1:] = csum[window:] - csum[:-window]
+        return sums
+
+    s_x, s_y = window_sum(dx), window_sum(dy)
+    s_xx, s_xy = window_sum(dx * dx), window_sum(dx * dy)
+
+    mean_x, mean_y = s_x / window, s_y / window
+    cov_xy = s_xy / window - mean_x * mean_y
+    var_x = s_xx / window - mean_x * mean_x
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = cov_xy / var_x
+    intercept = (mean_y + y0) - slope * (mean_x + x0)
+    return intercept, slope
+
+
+def _kalman_loop(y, x, state_var, observation_var):
+    """
+    Per-bar Kalman recursion of kalman_hedge_ratio; plain Python so Numba can compile it unchanged.
+    """
+    n = len(y)
+    slopes = np.empty(n)
+    intercepts = np.empty(n)
+    beta = alpha = 0.0
+    # State covariance [[p00, p01], [p01, p11]], kept as scalars for speed
+    p00 = p01 = p11 = 0.0
+    for t in range(n):
+        xt = x[t]
+        # Predict: random-walk state, covariance grows by the state noise
+        r00, r01, r11 = p00 + state_var, p01, p11 + state_var
+        # Update with observation y_t = beta * x_t + alpha
+        error = y[t] - (beta * xt + alpha)
+        rf0 = r00 * xt + r01
+        rf1 = r01 * xt + r11
+        q = rf0 * xt + rf1 + observation_var
+        k0, k1 = rf0 / q, rf1 / q
+        beta += k0 * error
+        alpha += k1 * error
+        p00, p01, p11 = r00 - k0 * rf0, r01 - k0 * rf1, r11 - k1 * rf1
+        slopes[t] = beta
+        intercepts[t] = alpha
+    return intercepts, slopes
+
+
+_compiled_kalman_loop = None
+
+
+def kalman_loop():
+    """
+    Returns _kalman_loop compiled with Numba when it is installed (compiling it on first use), else
+    the pure-Python loop.
+    """
+    global _compiled_kalman_loop
+    if _compiled_kalman_loop is None:
+        _compiled_kalman_loop = njit(_kalman_loop)
+    return _compiled_kalman_loop
+
+
+def kalman_hedge_ratio(y, x, delta=1e-4, observation_var=1e-3):
+    """
+    Kalman-filter estimate of a time-varying y = intercept + slope * x, in a single pass.
+
+    The state [slope, intercept] follows a random walk with covariance delta / (1 - delta) * I;
+    observation_var is the measurement noise. Each estimate uses the bars up to and including t.
+    The recursion runs compiled with Numba when it is installed.
+
+    :param y: Dependent prices, 1-D.
+    :param x: Independent prices, 1-D.
+    :return: (intercept, slope) arrays.
+    """
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    return kalman_loop()(y, x, delta / (1 - delta), float(observation_var))
 
 
 class HedgeRatioCalculator:
     """
-    Calculates the hedge ratio using ordinary least squares regression.
+    Calculates the hedge ratio using ordinary least squares or total least squares regression,
+    either as one static value or as a per-bar series (rolling OLS or Kalman filter).
     """
-    def __init__(self, training_data, dependent_var, independent_var, downsample_interval=10):
+    SOLVERS = {'ols': solve_ols, 'tls': solve_tls}
+
+    def __init__(self, training_data, dependent_var, independent_var, downsample_interval=1, method='ols'):
+        if method not in self.SOLVERS:
+            raise ValueError(f"Unknown hedge ratio method: {method}")
         self.training_data = training_data
         self.dependent_var = dependent_var
         self.independent_var = independent_var
         self.downsample_interval = downsample_interval
+        self.method = method
+        self.intercept = None
         self.hedge_ratio = None
 
     def calculate_hedge_ratio(self):
         """
         Performs regression to calculate the hedge ratio.
         """
-        # Downsample data to reduce computation
+        # Optional downsampling; the closed-form solver no longer needs it for speed
         if self.downsample_interval > 1:
             data_ds = self.training_data.iloc[::self.downsample_interval]
         else:
             data_ds = self.training_data
 
-        Y = data_ds[self.dependent_var]
-        X = data_ds[[self.independent_var]]
-        X = add_constant(X)
-        model = OLS(Y, X).fit()
-        self.hedge_ratio = model.params[self.independent_var]
+        Y = data_ds[self.dependent_var].to_numpy(dtype=np.float64)
+        X = data_ds[self.independent_var].to_numpy(dtype=np.float64)
+        self.intercept, self.hedge_ratio = self.SOLVERS[self.method](Y, X)
         return self.hedge_ratio
 
+    def _series(self, data):
+        data = self.training_data if data is None else data
+        Y = data[self.dependent_var].to_numpy(dtype=np.float64)
+        X = data[self.independent_var].to_numpy(dtype=np.float64)
+        return data.index, Y, X
+
+    def calculate_rolling_hedge_ratio(self, data=None, window=60):
+        """
+        Calculates a per-bar hedge ratio from rolling-window OLS.
+
+        :param data: Frame to estimate over (defaults to the training data). Each bar only uses the
+                     window ending at that bar, so the full history can be passed without lookahead.
+        :param window: Number of bars per regression.
+        :return: pd.Series of hedge ratios indexed like data (NaN until the window fills).
+        """
+        index, Y, X = self._series(data)
+        intercept, slope = rolling_ols(Y, X, window)
+        self.intercept = pd.Series(intercept, index=index, name='Intercept')
+        self.hedge_ratio = pd.Series(slope, index=index, name='Hedge_Ratio')
+        return self.hedge_ratio
+
+    def calculate_kalman_hedge_ratio(self, data=None, delta=1e-4, observation_var=1e-3):
+        """
+        Calculates a per-bar hedge ratio with a Kalman filter.
+
+        :param data: Frame to estimate over (defaults to the training data); estimates are causal.
+        :param delta: State noise; larger values let the hedge ratio adapt faster.
+        :param observation_var: Measurement noise of the price relationship.
+        :return: pd.Series of hedge ratios indexed like data.
+        """
+        index, Y, X = self._series(data)
+        intercept, slope = kalman_hedge_ratio(Y, X, delta, observation_var)
+        self.intercept = pd.Series(intercept, index=index, name='Intercept')
+        self.hedge_ratio = pd.Series(slope, index=index, name='Hedge_Ratio')
+        return self.hedge_ratio
@@ -0,0 +1,16 @@
+import importlib.util
+
+# numba is imported on first compilation; importing it costs more than the rest of the pipeline
+HAS_NUMBA = importlib.util.find_spec('numba') is not None
+
+
+def njit(function):
+    """
+    Returns function compiled with numba.njit(cache=True), importing Numba on first use, or the
+    function itself when Numba is not installed.
+    """
+    if not HAS_NUMBA:
+        return function
+    import numba
+
+    return numba.njit(cache=True)(function)
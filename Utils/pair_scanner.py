@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+
+from Utils.hedge_ratio_calculator import solve_ols
+
+
+class PairScanner:
+    """
+    Screens every pair of a symbol universe for cointegration.
+
+    A correlation-matrix prefilter discards weakly related pairs cheaply; the survivors get an
+    Engle-Granger test (OLS hedge ratio, then an ADF test on the residual spread) computed in closed
+    form with NumPy for a whole batch of pairs at once.
+    """
+
+    # MacKinnon (2010) response surface for the Engle-Granger test with two variables and a constant:
+    # critical value = b_inf + b_1 / T + b_2 / T^2
+    CRITICAL_VALUE_COEFFS = {
+        0.01: (-3.89644, -10.9519, -22.527),
+        0.05: (-3.33613, -6.1101, -6.823),
+        0.10: (-3.04445, -4.2412, -2.720),
+    }
+
+    def __init__(self, prices, min_correlation=0.8, adf_lags=1, significance=0.05, chunk_size=512):
+        """
+        :param prices: DataFrame of aligned prices, one column per symbol (NaN rows are dropped).
+        :param min_correlation: Minimum price correlation for a pair to be tested.
+        :param adf_lags: Number of lagged differences in the ADF regression.
+        :param significance: Significance level used to flag cointegrated pairs (0.01, 0.05 or 0.10).
+        :param chunk_size: Pairs per batch, bounding the (time x pairs) residual matrix in memory.
+        """
+        prices = prices.dropna()
+        self.symbols = [str(column).replace('Price_', '', 1) for column in prices.columns]
+        self.prices = prices.to_numpy(dtype=np.float64)
+        self.min_correlation = min_correlation
+        self.adf_lags = adf_lags
+        self.significance = significance
+        self.chunk_size = chunk_size
+        self.candidates = None
+
+    def critical_value(self, n_obs):
+        """
+        Engle-Granger critical value at the configured significance for a sample of n_obs.
+        """
+        b_inf, b_1, b_2 = self.CRITICAL_VALUE_COEFFS[self.significance]
+        return b_inf + b_1 / n_obs + b_2 / n_obs ** 2
+
+    def prefilter(self):
+        """
+        Returns the index pairs (i < j) whose price correlation reaches min_correlation.
+
+        Returns:
+            tuple: (i, j, correlation) arrays.
+        """
+        correlation = np.corrcoef(self.prices, rowvar=False)
+        i, j = np.triu_indices(len(self.symbols), k=1)
+        corr = correlation[i, j]
+        keep = corr >= self.min_correlation
+        return i[keep], j[keep], corr[keep]
+
+    def hedge_ratios(self, dependent, independent):
+        """
+        Closed-form OLS intercept and slope of prices[:, dependent] on prices[:, independent] for a
+        batch of index pairs.
+
+        Returns:
+            tuple: (intercept, slope, residuals) with residuals of shape (time x pairs).
+        """
+        y = self.prices[:, dependent]
+        x = self.prices[:, independent]
+        intercept, slope = solve_ols(y, x)
+        return intercept, slope, y - intercept - slope * x
+
+    def adf_statistics(self, residuals):
+        """
+        ADF t-statistics (no constant, adf_lags lagged differences) for each column of residuals.
+
+        Solves the per-pair normal equations as one stacked batch.
+
+        Returns:
+            tuple: (t-statistics, AR coefficients gamma) arrays.
+        """
+        lags = self.adf_lags
+        diff = np.diff(residuals, axis=0)
+        y = diff[lags:]                                  # delta e_t
+        regressors = [residuals[lags:-1]]                # e_{t-1}
+        regressors += [diff[lags - k:-k] for k in range(1, lags + 1)]  # delta e_{t-k}
+        X = np.stack(regressors, axis=-1).transpose(1, 0, 2)  # pairs x time x regressors
+        y = y.T                                               # pairs x time
+
+        xtx = np.einsum('kti,ktj->kij', X, X)
+        xty = np.einsum('kti,kt->ki', X, y)
+        coeffs = np.linalg.solve(xtx, xty[..., None])[..., 0]
+        resid = y - np.einsum('kti,ki->kt', X, coeffs)
+        dof = y.shape[1] - X.shape[2]
+        sigma2 = np.einsum('kt,kt->k', resid, resid) / dof
+        # Only the (0, 0) element of (X'X)^-1 is needed for the standard error of gamma
+        unit = np.zeros((len(xtx), X.shape[2], 1))
+        unit[:, 0, 0] = 1.0
+        inv_00 = np.linalg.solve(xtx, unit)[:, 0, 0]
+        gamma = coeffs[:, 0]
+        return gamma / np.sqrt(sigma2 * inv_00), gamma
+
+    def _test_direction(self, dependent, independent):
+        intercept = np.empty(len(dependent))
+        slope = np.empty(len(dependent))
+        stats = np.empty(len(dependent))
+        gammas = np.empty(len(dependent))
+        # Only one chunk of (time x pairs) price and residual matrices is materialized at a time
+        for start in range(0, len(dependent), self.chunk_size):
+            chunk = slice(start, start + self.chunk_size)
+            intercept[chunk], slope[chunk], residuals = self.hedge_ratios(dependent[chunk], independent[chunk])
+            stats[chunk], gammas[chunk] = self.adf_statistics(residuals)
+        return intercept, slope, stats, gammas
+
+    def scan(self):
+        """
+        Runs the prefilter and the batched Engle-Granger tests.
+
+        Both regression directions are tested for every surviving pair and the stronger one is kept.
+
+        Returns:
+            pd.DataFrame: Candidates ranked by ADF statistic (most negative first).
+        """
+        i, j, corr = self.prefilter()
+        print(f"{len(i)} of {len(self.symbols) * (len(self.symbols) - 1) // 2} pairs passed the correlation prefilter.")
+
+        columns = ['Dependent', 'Independent', 'Correlation', 'Intercept', 'Hedge_Ratio', 'ADF_Stat',
+                   'Half_Life', 'Cointegrated']
+        if len(i) == 0:
+            self.candidates = pd.DataFrame(columns=columns)
+            return self.candidates
+
+        forward = self._test_direction(i, j)
+        backward = self._test_direction(j, i)
+        use_backward = backward[2] < forward[2]
+        intercept, slope, stats, gammas = (np.where(use_backward, b, f) for f, b in zip(forward, backward))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            half_life = np.where(gammas < 0, -np.log(2) / np.log1p(gammas), np.inf)
+
+        symbols = np.asarray(self.symbols)
+        self.candidates = pd.DataFrame({
+            'Dependent': np.where(use_backward, symbols[j], symbols[i]),
+            'Independent': np.where(use_backward, symbols[i], symbols[j]),
+            'Correlation': corr,
+            'Intercept': intercept,
+            'Hedge_Ratio': slope,
+            'ADF_Stat': stats,
+            'Half_Life': half_life,
+            'Cointegrated': stats < self.critical_value(len(self.prices)),
+        }, columns=columns).sort_values('ADF_Stat', ignore_index=True)
+        return self.candidates
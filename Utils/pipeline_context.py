@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+
+class PipelineContext:
+    """
+    Shared columnar state passed between pipeline stages instead of copied DataFrames.
+
+    Holds named 1-D NumPy columns aligned to the rows still in play. Stages read the columns they
+    need and write only the columns they own; dropping rows narrows every column at once, as a view
+    whenever the kept rows are contiguous (the usual case: rolling warm-up or the first return).
+    """
+
+    def __init__(self, index, columns):
+        """
+        :param index: Index of the full row range the columns were taken from.
+        :param columns: dict of column name to 1-D array, each as long as index.
+        """
+        self.base_index = index
+        self.rows = slice(0, len(index))
+        self.columns = {}
+        for name, values in columns.items():
+            self[name] = values
+
+    @classmethod
+    def from_frame(cls, df, columns=None):
+        """
+        Builds a context from DataFrame columns, as views on the frame's arrays where pandas allows.
+        """
+        columns = list(df.columns) if columns is None else columns
+        return cls(df.index, {name: df[name].to_numpy() for name in columns})
+
+    def __len__(self):
+        if isinstance(self.rows, slice):
+            return self.rows.stop - self.rows.start
+        return len(self.rows)
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __setitem__(self, name, values):
+        values = np.asarray(values)
+        if values.ndim == 0:
+            values = np.full(len(self), values)
+        if len(values) != len(self):
+            raise ValueError(f"Column {name} has {len(values)} rows, expected {len(self)}.")
+        self.columns[name] = values
+
+    def drop(self, *names):
+        """
+        Releases columns no later stage needs.
+        """
+        for name in names:
+            self.columns.pop(name, None)
+
+    def keep(self, rows):
+        """
+        Narrows all columns to the given rows (a boolean mask or a slice over the current rows).
+        """
+        if not isinstance(rows, slice):
+            positions = np.flatnonzero(rows)
+            if len(positions) == 0:
+                rows = slice(0, 0)
+            elif positions[-1] - positions[0] + 1 == len(positions):
+                # Contiguous run: keep views instead of copying
+                rows = slice(int(positions[0]), int(positions[-1]) + 1)
+            else:
+                rows = positions
+
+        self.columns = {name: values[rows] for name, values in self.columns.items()}
+        if isinstance(rows, slice):
+            start, stop, _ = rows.indices(len(self))
+            if isinstance(self.rows, slice):
+                self.rows = slice(self.rows.start + start, self.rows.start + max(start, stop))
+            else:
+                self.rows = self.rows[start:stop]
+        else:
+            base = np.arange(self.rows.start, self.rows.stop) if isinstance(self.rows, slice) else self.rows
+            self.rows = base[rows]
+
+    @property
+    def index(self):
+        return self.base_index[self.rows]
+
+    def series(self, name):
+        """
+        Returns a column as a pd.Series on the current index without copying it.
+        """
+        return pd.Series(self.columns[name], index=self.index, name=name, copy=False)
+
+    def to_frame(self, columns=None):
+        """
+        Materializes (some of) the columns as a DataFrame.
+        """
+        columns = list(self.columns) if columns is None else columns
+        return pd.DataFrame({name: self.columns[name] for name in columns}, index=self.index)
@@ -0,0 +1,181 @@
+import contextlib
+import cProfile
+import csv
+import json
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+
+
+class StageProfiler:
+    """
+    Records wall time, CPU time, rows processed and peak memory for pipeline stages.
+
+    Stages are timed with the stage() context manager and may nest (e.g. 'backtest_strategy/test').
+    Peak memory is the largest traced allocation above the stage's starting point, from tracemalloc
+    (which slows allocation-heavy code; pass track_memory=False to skip it). Top-level stages can
+    also be run under cProfile or pyinstrument, one profile file per stage in profile_dir.
+
+    A disabled profiler records nothing, so pipelines can call stage() unconditionally.
+    """
+
+    FIELDS = ['stage', 'depth', 'wall_s', 'cpu_s', 'rows', 'rows_per_s', 'peak_memory_mb']
+
+    def __init__(self, enabled=True, track_memory=True, profile=None, profile_dir='profiles'):
+        """
+        :param profile: None, 'cprofile' or 'pyinstrument' (profiles top-level stages).
+        """
+        if profile not in (None, 'cprofile', 'pyinstrument'):
+            raise ValueError(f"Unknown profiler: {profile}")
+        self.enabled = enabled
+        self.track_memory = track_memory
+        self.profile = profile
+        self.profile_dir = profile_dir
+        self.records = []
+        self.stack = []
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+
+    def _collect_peak(self):
+        """
+        Folds the traced peak since the last reset into every open stage, then resets it.
+        """
+        _, peak = tracemalloc.get_traced_memory()
+        for record in self.stack:
+            record['_peak'] = max(record['_peak'], peak)
+        tracemalloc.reset_peak()
+
+    @contextlib.contextmanager
+    def stage(self, name, rows=None):
+        """
+        Times the enclosed block. The yielded record's 'rows' can be set inside the block; a stage
+        that leaves it unset reports the total rows of its sub-stages.
+        """
+        record = {'stage': '/'.join([r['stage'] for r in self.stack[-1:]] + [name]), 'depth': len(self.stack),
+                  'rows': rows}
+        if not self.enabled:
+            yield record
+            return
+
+        started_tracing = False
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            self._collect_peak()
+            record['_start'], _ = tracemalloc.get_traced_memory()
+            record['_peak'] = record['_start']
+        record['_children'] = []
+        if self.stack:
+            self.stack[-1]['_children'].append(record)
+        self.records.append(record)
+        self.stack.append(record)
+
+        profiler = self._start_profile() if record['depth'] == 0 else None
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_s'] = time.perf_counter() - wall_start
+            record['cpu_s'] = time.process_time() - cpu_start
+            if profiler is not None:
+                self._stop_profile(profiler, record['stage'])
+            if self.track_memory:
+                self._collect_peak()
+                record['peak_memory_mb'] = (record.pop('_peak') - record.pop('_start')) / 2 ** 20
+                if started_tracing:
+                    tracemalloc.stop()
+            else:
+                record['peak_memory_mb'] = None
+            if record['rows'] is None and record['_children']:
+                record['rows'] = sum(child['rows'] or 0 for child in record['_children'])
+            del record['_children']
+            record['rows_per_s'] = record['rows'] / record['wall_s'] if record['rows'] and record['wall_s'] else None
+            self.stack.pop()
+
+    def _start_profile(self):
+        if self.profile == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return profiler
+        if self.profile == 'pyinstrument':
+            from pyinstrument import Profiler
+
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+        return None
+
+    def _stop_profile(self, profiler, stage):
+        if not os.path.exists(self.profile_dir):
+            os.makedirs(self.profile_dir)
+        path = os.path.join(self.profile_dir, stage.replace('/', '_'))
+        if self.profile == 'cprofile':
+            profiler.disable()
+            profiler.dump_stats(path + '.prof')
+        else:
+            profiler.stop()
+            with open(path + '.html', 'w') as f:
+                f.write(profiler.output_html())
+
+    def report(self):
+        """
+        Returns the run report: run metadata plus one entry per stage in start order.
+        """
+        return {
+            'started_at': self.started_at,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'stages': [{field: record.get(field) for field in self.FIELDS} for record in self.records],
+        }
+
+    def save(self, file_path):
+        """
+        Writes the report as JSON, or as CSV (stage rows only) when file_path ends in .csv.
+        """
+        directory = os.path.dirname(file_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        report = self.report()
+        if file_path.endswith('.csv'):
+            with open(file_path, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+                writer.writeheader()
+                writer.writerows(report['stages'])
+        else:
+            with open(file_path, 'w') as f:
+                json.dump(report, f, indent=2)
+        print(f"Profile report written to {file_path}")
+        return file_path
+
+    def compare(self, baseline_path, tolerance=0.25, min_seconds=0.01):
+        """
+        Compares this run with a saved JSON report, e.g. last night's.
+
+        Returns:
+            list: (stage, baseline wall_s, current wall_s) for stages more than tolerance slower than in
+                  the baseline; stages faster than min_seconds in both runs are ignored as noise.
+        """
+        with open(baseline_path) as f:
+            baseline = {stage['stage']: stage['wall_s'] for stage in json.load(f)['stages']}
+        regressions = []
+        for record in self.records:
+            before = baseline.get(record['stage'])
+            if before is None or max(before, record['wall_s']) < min_seconds:
+                continue
+            if record['wall_s'] > before * (1 + tolerance):
+                regressions.append((record['stage'], before, record['wall_s']))
+        return regressions
+
+    def summary(self):
+        """
+        Formats the recorded stages as a table.
+        """
+        lines = [f"{'stage':<40} {'wall (s)':>9} {'cpu (s)':>9} {'rows':>11} {'peak MB':>9}"]
+        for record in self.records:
+            name = '  ' * record['depth'] + record['stage'].split('/')[-1]
+            rows = '' if record['rows'] is None else f"{record['rows']:,}"
+            peak = '' if record.get('peak_memory_mb') is None else f"{record['peak_memory_mb']:.1f}"
+            lines.append(f"{name:<40} {record['wall_s']:>9.3f} {record['cpu_s']:>9.3f} {rows:>11} {peak:>9}")
+        return '\n'.join(lines)
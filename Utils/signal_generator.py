@@ -11,12 +11,13 @@ class SignalGenerator:
         """
         Initializes the SignalGenerator.
 
-        :param data: DataFrame containing the 'ZScore' column.
+        :param data: DataFrame containing the 'ZScore' column, or a PipelineContext that is updated in place
+                     (None when only the sizing rules are used).
         :param entry_threshold: Z-score threshold to enter a position.
         :param exit_threshold: Z-score threshold to exit a position.
         :param max_position: Maximum position size (e.g., 1.0 for full position).
         """
-        self.data = data.copy()
+        self.data = data.copy() if isinstance(data, pd.DataFrame) else data
         self.entry_threshold = entry_threshold
         self.exit_threshold = exit_threshold
         self.max_position = max_position
@@ -54,19 +55,68 @@ class SignalGenerator:
     #     else:
     #         return np.nan  # Maintain existing position
 
-    def generate_signals(self):
+    def calculate_position_sizes(self, zscores):
+        """
+        Vectorized counterpart of calculate_position_size for a whole z-score array.
+
+        The thresholds may also be column arrays (one row per parameter set), in which case the result
+        broadcasts to (parameter sets x bars).
+
+        :param zscores: Array-like of z-score values.
+        :return: float64 array of position sizes, NaN where the existing position is maintained.
+        """
+        zscores = np.asarray(zscores, dtype=np.float64)
+        conditions = [
+            zscores > self.entry_threshold,
+            zscores < -self.entry_threshold,
+            np.abs(zscores) < self.exit_threshold,
+        ]
+        choices = [
+            # Short spread: position size increases with z-score
+            -np.minimum((zscores - self.entry_threshold) / self.entry_threshold, self.max_position),
+            # Long spread: position size increases with the absolute z-score
+            np.minimum((-zscores - self.entry_threshold) / self.entry_threshold, self.max_position),
+            # Exit positions
+            0.0,
+        ]
+        # Maintain existing position (no change) everywhere else
+        return np.select(conditions, choices, default=np.nan)
+
+    @staticmethod
+    def forward_fill(values, fill_value=0.0):
+        """
+        Forward-fills NaN entries along the last axis without a Python-level loop.
+
+        :param values: Float array, 1-D or one row per series.
+        :param fill_value: Value used for leading NaNs that have nothing to carry forward.
+        :return: New array with NaNs replaced by the last valid value.
+        """
+        valid = ~np.isnan(values)
+        last_valid = np.where(valid, np.arange(values.shape[-1]), -1)
+        np.maximum.accumulate(last_valid, axis=-1, out=last_valid)
+        filled = np.take_along_axis(values, np.maximum(last_valid, 0), axis=-1)
+        filled[last_valid < 0] = fill_value
+        return filled
+
+    def generate_signals(self, initial_position=0.0):
         """
         Generates signals and positions with partial positions.
 
-        :return: DataFrame with 'Signal' and 'Position' columns.
+        :param initial_position: Position held before the first bar, kept until the first signal
+                                 (non-zero when continuing from an earlier block of bars).
+
+        :return: DataFrame with 'Signal' and 'Position' columns, in the dtype of 'ZScore'.
         """
-        # Apply the position size calculation to each z-score
-        self.data['Signal'] = self.data['ZScore'].apply(self.calculate_position_size)
+        # Compute the position size for every z-score at once
+        zscores = np.asarray(self.data['ZScore'])
+        signal = self.calculate_position_sizes(zscores)
+        self.data['Signal'] = signal.astype(zscores.dtype, copy=False)
 
         # Forward-fill the positions where 'Signal' is NaN to maintain existing positions
-        self.data['Position'] = self.data['Signal'].fillna(method='ffill').fillna(0)
+        position = self.forward_fill(signal, fill_value=initial_position)
 
         # Ensure that positions do not exceed the maximum allowed
-        self.data['Position'] = self.data['Position'].clip(-self.max_position, self.max_position)
+        self.data['Position'] = np.clip(position, -self.max_position, self.max_position).astype(zscores.dtype,
+                                                                                                 copy=False)
 
         return self.data
@@ -1,34 +1,129 @@
 import numpy as np
+import pandas as pd
+
+from Utils.pipeline_context import PipelineContext
+
+
+def rolling_mean_std(values, window):
+    """
+    Rolling mean and sample standard deviation (ddof=1) over `window` values, NaN while the window fills.
+
+    O(n) with pandas' online rolling sums, which are updated from the start of the series. Windows
+    of one repeated value get a standard deviation of exactly zero.
+    """
+    rolling = pd.Series(np.asarray(values, dtype=np.float64)).rolling(window)
+    return rolling.mean().to_numpy(), rolling.std().to_numpy()
+
+
+def window_local_mean_std(values, window, block_rows=8192):
+    """
+    rolling_mean_std with every output computed from its own window only.
+
+    Each window gets the same operations in the same order (a sequential sum, then a sum of squared
+    deviations from the mean), so a series processed in pieces, each with the previous window - 1
+    values in front, gives bit-identical results; rolling_mean_std's online sums do not have that
+    property. Windows of one repeated value get a standard deviation of exactly zero. This costs
+    O(n x window), so it is only used where series are processed piecewise (ChunkedBacktester).
+
+    The work is done in blocks of block_rows outputs, which keeps the window passes in cache.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    mean = np.full(len(values), np.nan)
+    std = np.full(len(values), np.nan)
+    n_windows = len(values) - window + 1
+    if n_windows <= 0:
+        return mean, std
+
+    window_mean = mean[window - 1:]
+    window_std = std[window - 1:]
+    deviation = np.empty(min(block_rows, n_windows))
+    for start in range(0, n_windows, block_rows):
+        stop = min(start + block_rows, n_windows)
+        total = window_mean[start:stop]
+        squares = window_std[start:stop]
+        block_deviation = deviation[:stop - start]
+        total[:] = values[start:stop]
+        for k in range(1, window):
+            total += values[start + k:stop + k]
+        total /= window
+        squares[:] = 0.0
+        for k in range(window):
+            np.subtract(values[start + k:stop + k], total, out=block_deviation)
+            block_deviation *= block_deviation
+            squares += block_deviation
+    window_std /= window - 1
+    np.sqrt(window_std, out=window_std)
+
+    # A window is constant when all of its window - 1 consecutive pairs are equal
+    repeats = np.zeros(len(values), dtype=np.int64)
+    np.cumsum(values[1:] == values[:-1], out=repeats[1:])
+    constant = repeats[window - 1:] - repeats[:n_windows] == window - 1
+    window_std[constant] = 0.0
+    window_mean[constant] = values[window - 1:][constant]
+    return mean, std
 
 
 class SpreadCalculator:
     """
     Calculates the spread and z-score based on the hedge ratio.
+
+    data can be a DataFrame, which is copied, or a PipelineContext, which is updated in place.
+    Output columns take the dtype of the price columns (float32 in the compact mode); the rolling
+    statistics are always accumulated in float64, with rolling_mean_std, or window_local_mean_std
+    when the data is one piece of a longer series (window_local=True).
     """
-    def __init__(self, data, hedge_ratio, dependent_var, independent_var, window=20):
-        self.data = data.copy()
+    def __init__(self, data, hedge_ratio, dependent_var, independent_var, window=20, window_local=False):
+        self.data = data if isinstance(data, PipelineContext) else data.copy()
         self.hedge_ratio = hedge_ratio
         self.dependent_var = dependent_var
         self.independent_var = independent_var
         self.window = window
+        self.mean_std = window_local_mean_std if window_local else rolling_mean_std
 
     def compute_spread(self):
         """
         Computes the spread using the hedge ratio.
+
+        The hedge ratio can be a scalar or a per-bar pd.Series, which is aligned on the data index.
         """
-        self.data['Spread'] = self.data[self.dependent_var] - self.hedge_ratio * self.data[self.independent_var]
+        hedge_ratio = self.hedge_ratio
+        if isinstance(hedge_ratio, pd.Series):
+            hedge_ratio = hedge_ratio.reindex(self.data.index)
+            if isinstance(self.data, PipelineContext):
+                hedge_ratio = hedge_ratio.to_numpy()
+        spread = self.data[self.dependent_var] - hedge_ratio * self.data[self.independent_var]
+        self.data['Spread'] = spread.astype(self.data[self.dependent_var].dtype, copy=False)
 
     def compute_zscore(self):
         """
         Computes the z-score of the spread.
         """
-        self.data['Mean'] = self.data['Spread'].rolling(window=self.window).mean()
-        self.data['Std'] = self.data['Spread'].rolling(window=self.window).std()
+        if isinstance(self.data, PipelineContext):
+            return self._compute_zscore_columns()
+
+        dtype = self.data['Spread'].dtype
+        self.data['Mean'], self.data['Std'] = self.mean_std(self.data['Spread'].to_numpy(), self.window)
 
         # 避免标准差为零
         self.data['Std'].replace(0, np.nan, inplace=True)
         self.data.dropna(subset=['Std'], inplace=True)
 
         self.data['ZScore'] = (self.data['Spread'] - self.data['Mean']) / self.data['Std']
+        for column in ('Mean', 'Std', 'ZScore'):
+            self.data[column] = self.data[column].astype(dtype, copy=False)
         return self.data
 
+
+    def _compute_zscore_columns(self):
+        """
+        compute_zscore on a PipelineContext: same rolling statistics, rows dropped as views.
+        """
+        dtype = self.data['Spread'].dtype
+        self.data['Mean'], std = self.mean_std(self.data['Spread'], self.window)
+        self.data['Std'] = std
+        self.data.keep(~np.isnan(std) & (std != 0))
+
+        self.data['ZScore'] = (self.data['Spread'] - self.data['Mean']) / self.data['Std']
+        for column in ('Mean', 'Std', 'ZScore'):
+            self.data[column] = self.data[column].astype(dtype, copy=False)
+        return self.data
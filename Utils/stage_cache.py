@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from Data.price_store import ColumnarPriceStore
+from Utils.pipeline_context import PipelineContext
+
+
+class StageCache:
+    """
+    Content-addressed, size-bounded cache of pipeline stage outputs.
+
+    A stage's key is a hash of its inputs and parameters. Raw inputs (price frames, arrays) are
+    hashed by content; a stage that consumes another stage's output passes that output's key
+    instead, so derived frames are never rehashed and a parameter change only invalidates the
+    stages downstream of it. Frames and series are stored in the columnar binary format of
+    ColumnarPriceStore (one file per entry, in their own dtypes), scalars in the index. Once the stored files exceed
+    max_bytes, the least recently used entries are evicted.
+    """
+
+    INDEX_FILE = 'cache_index.json'
+
+    def __init__(self, cache_dir, max_bytes=2 ** 30):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.store = ColumnarPriceStore(cache_dir, dtype=None)
+        self.index_path = os.path.join(cache_dir, self.INDEX_FILE)
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r') as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def _update(digest, value):
+        """
+        Feeds one input or parameter into the hash.
+        """
+        if isinstance(value, PipelineContext):
+            value = value.to_frame()
+        if isinstance(value, pd.Series):
+            value = value.to_frame(name=value.name if value.name is not None else '__value__')
+        if isinstance(value, pd.DataFrame):
+            index = value.index
+            digest.update(repr((list(value.columns), value.index.name, str(getattr(index, 'tz', None)))).encode())
+            digest.update(np.ascontiguousarray(index.asi8 if hasattr(index, 'asi8') else index.to_numpy()).tobytes())
+            for column in value.columns:
+                digest.update(np.ascontiguousarray(value[column].to_numpy()).tobytes())
+        elif isinstance(value, np.ndarray):
+            digest.update(repr((value.dtype.str, value.shape)).encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, dict):
+            # Insertion order: the order can carry meaning, e.g. which symbol is the dependent leg
+            for name, item in value.items():
+                digest.update(repr(name).encode())
+                StageCache._update(digest, item)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                StageCache._update(digest, item)
+        else:
+            digest.update(repr(value).encode())
+        digest.update(b'\x00')
+
+    @staticmethod
+    def fingerprint(stage, *inputs, **params):
+        """
+        Key of a stage run: a hash of the stage name, its inputs and its parameters.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        StageCache._update(digest, stage)
+        for value in inputs:
+            StageCache._update(digest, value)
+        StageCache._update(digest, params)
+        return digest.hexdigest()
+
+    def get(self, stage, key):
+        """
+        Returns the cached output for key, or None on a miss.
+        """
+        entry = self.entries.get(key)
+        if entry is None or (entry['kind'] != 'scalar' and not self.store.exists(key, stage)):
+            return None
+        entry['last_used'] = time.time()
+        self._save_index()
+
+        if entry['kind'] == 'scalar':
+            return entry['value']
+        df = self.store.load(key, stage)
+        if entry['kind'] == 'series':
+            return df.iloc[:, 0].rename(entry['name'])
+        return df
+
+    def put(self, stage, key, value):
+        """
+        Stores a stage output (DataFrame, Series, PipelineContext or float) and evicts old entries.
+        """
+        entry = {'stage': stage, 'last_used': time.time(), 'bytes': 0}
+        if isinstance(value, PipelineContext):
+            value = value.to_frame()
+        if isinstance(value, pd.Series):
+            entry.update(kind='series', name=value.name)
+            self.store.save(key, stage, value.to_frame(name='__value__'))
+        elif isinstance(value, pd.DataFrame):
+            entry['kind'] = 'frame'
+            self.store.save(key, stage, value)
+        else:
+            entry.update(kind='scalar', value=float(value))
+        if entry['kind'] != 'scalar':
+            entry['bytes'] = os.path.getsize(self.store.path(key, stage))
+        self.entries[key] = entry
+        self._evict()
+        self._save_index()
+
+    def memoize(self, stage, compute, *inputs, **params):
+        """
+        Returns (output, key) for the stage, running compute() only on a cache miss.
+        """
+        key = self.fingerprint(stage, *inputs, **params)
+        value = self.get(stage, key)
+        if value is not None:
+            self.hits += 1
+            print(f"Stage cache hit: {stage}")
+            return value, key
+        self.misses += 1
+        value = compute()
+        self.put(stage, key, value)
+        return value, key
+
+    def size(self):
+        return sum(entry['bytes'] for entry in self.entries.values())
+
+    def _evict(self):
+        total = self.size()
+        for key in sorted(self.entries, key=lambda k: self.entries[k]['last_used']):
+            if total <= self.max_bytes:
+                break
+            entry = self.entries.pop(key)
+            if entry['kind'] != 'scalar':
+                path = self.store.path(key, entry['stage'])
+                if os.path.exists(path):
+                    os.remove(path)
+            total -= entry['bytes']
+
+    def _save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.index_path)
+
+    def clear(self):
+        """
+        Removes every cached entry.
+        """
+        for key, entry in list(self.entries.items()):
+            if entry['kind'] != 'scalar':
+                path = self.store.path(key, entry['stage'])
+                if os.path.exists(path):
+                    os.remove(path)
+        self.entries = {}
+        self._save_index()
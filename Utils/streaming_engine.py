@@ -0,0 +1,84 @@
+import math
+
+from Utils.signal_generator import SignalGenerator
+
+
+class StreamingPairEngine:
+    """
+    Incremental spread, z-score and position engine for live bars.
+
+    Keeps O(window) state per pair: a ring buffer of the last `window` spreads plus the last position.
+    Each update() costs the same regardless of how much history has been seen. The window's mean and
+    standard deviation are recomputed from the buffer with the operations of window_local_mean_std,
+    in the same order, so spreads, z-scores and positions are bit-identical to what
+    SpreadCalculator(window_local=True) and SignalGenerator compute in batch.
+    """
+
+    def __init__(self, hedge_ratio, window=20, entry_threshold=2.5, exit_threshold=0.5, max_position=1.0):
+        """
+        :param hedge_ratio: Hedge ratio applied to the independent leg (can be overridden per bar).
+        :param window: Rolling window for the spread mean and standard deviation.
+        """
+        self.hedge_ratio = hedge_ratio
+        self.window = window
+        # Reuse the batch position sizing rules so both paths stay in sync
+        self.sizer = SignalGenerator(None, entry_threshold, exit_threshold, max_position)
+
+        self.buffer = [0.0] * window
+        self.count = 0
+        self.head = 0
+        self.position = 0.0
+
+    def _push(self, spread):
+        """
+        Adds a spread to the window, evicting the oldest one once the window is full.
+        """
+        self.buffer[self.head] = spread
+        self.head = (self.head + 1) % self.window
+        self.count = min(self.count + 1, self.window)
+
+    def _statistics(self):
+        """
+        Mean and sample standard deviation (ddof=1) of the full window, as window_local_mean_std computes
+        them: a sequential sum from the oldest spread, then a sum of squared deviations from the mean.
+        A window of one repeated value has a mean of that value and a standard deviation of zero.
+        """
+        values = self.buffer[self.head:] + self.buffer[:self.head]
+        if min(values) == max(values):
+            return values[-1], 0.0
+        total = 0.0
+        for value in values:
+            total += value
+        mean = total / self.window
+        squares = 0.0
+        for value in values:
+            deviation = value - mean
+            squares += deviation * deviation
+        return mean, math.sqrt(squares / (self.window - 1))
+
+    def update(self, price_dependent, price_independent, hedge_ratio=None):
+        """
+        Processes one bar.
+
+        :param hedge_ratio: Optional per-bar hedge ratio overriding the configured one.
+        :return: dict with 'Spread', 'Mean', 'Std', 'ZScore' and 'Position'. Mean, Std and ZScore are
+                 NaN while the window fills or when the spread is flat; the batch path drops those bars
+                 and the position is carried over unchanged.
+        """
+        if hedge_ratio is None:
+            hedge_ratio = self.hedge_ratio
+        spread = price_dependent - hedge_ratio * price_independent
+        self._push(spread)
+
+        mean = std = zscore = math.nan
+        if self.count == self.window:
+            mean, std = self._statistics()
+            if std > 0:
+                zscore = (spread - mean) / std
+                signal = self.sizer.calculate_position_size(zscore)
+                if signal == signal:
+                    self.position = min(max(signal, -self.sizer.max_position), self.sizer.max_position)
+            else:
+                mean = std = math.nan
+
+        return {'Spread': spread, 'Mean': mean, 'Std': std, 'ZScore': zscore, 'Position': self.position}
@@ -1,9 +1,38 @@
+import argparse
+import os
 from datetime import datetime, timedelta
-from pairs_trading_strategy import PairsTradingStrategy
+from Utils.profiler import StageProfiler
 import pytz
 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Run the pairs trading strategy.')
+    parser.add_argument('--no-plot', action='store_true', help='Skip all plotting (for nightly/batch runs).')
+    parser.add_argument('--report-dir', default=None,
+                        help='Render charts headlessly to this directory instead of showing them.')
+    parser.add_argument('--background-plots', action='store_true',
+                        help='Render report charts in a background worker while the pipeline continues.')
+    parser.add_argument('--bar-size', default='1 day', choices=['1 day', '1 min'],
+                        help="Bar size to fetch and store ('1 min' for the intraday mode).")
+    parser.add_argument('--frequency', default=None,
+                        help="Resample the stored bars on the fly, e.g. '5min', '15min' or '1h'.")
+    parser.add_argument('--profile-report', default=None,
+                        help='Record per-stage timing and memory and write the run report here (.json or .csv).')
+    parser.add_argument('--profile', default=None, choices=['cprofile', 'pyinstrument'],
+                        help='Also profile each stage with cProfile or pyinstrument (written next to the report).')
+    parser.add_argument('--precision', default='float64', choices=['float64', 'float32'],
+                        help='float32 halves the memory of prices and derived columns for large universes.')
+    parser.add_argument('--cache-dir', default=None,
+                        help='Memoize stage outputs here so reruns only recompute stages whose inputs changed.')
+    return parser.parse_args()
+
+
 # Main Execution Workflow
 if __name__ == "__main__":
+    args = parse_args()
+    # Imported after parsing so --help and argument errors return without loading pandas
+    from pairs_trading_strategy import PairsTradingStrategy
+
     # Define parameters
     # start_date = datetime.now() - timedelta(days=90)
     # end_date = datetime.now()
@@ -15,6 +44,23 @@ if __name__ == "__main__":
     # Calculate the start date by subtracting 5 years from the end date
     start_date = end_date - timedelta(days=365 * 5)
 
+    if args.no_plot:
+        plot_mode = 'none'
+    elif args.report_dir:
+        plot_mode = 'file'
+    else:
+        plot_mode = 'show'
+
+    profiler = None
+    if args.profile_report or args.profile:
+        report_path = args.profile_report or 'profiles/run_report.json'
+        profiler = StageProfiler(profile=args.profile, profile_dir=os.path.dirname(report_path) or '.')
+
     # Instantiate and run the strategy
-    strategy = PairsTradingStrategy(symbols, start_date, end_date)
+    strategy = PairsTradingStrategy(symbols, start_date, end_date, plot_mode=plot_mode,
+                                    report_dir=args.report_dir or 'reports', background_plots=args.background_plots,
+                                    bar_size=args.bar_size, frequency=args.frequency, profiler=profiler,
+                                    cache_dir=args.cache_dir, precision=args.precision)
     strategy.run()
+    if profiler is not None:
+        profiler.save(report_path)
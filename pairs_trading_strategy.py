@@ -3,13 +3,23 @@ import os
 import pandas as pd
 
 from Data.data_fetcher import DataFetcher
+from Data.async_fetcher import AsyncDataFetcher
+from Data.coverage_index import CoverageIndex
 from Data.data_preprocessor import DataPreprocessor
+from Data.price_store import ColumnarPriceStore, JsonPriceStore, migrate_json_to_store
 from Utils.signal_generator import SignalGenerator
 from Utils.spread_calculator import SpreadCalculator
 from Utils.hedge_ratio_calculator import HedgeRatioCalculator
-from Evaluation.evaluator import Evaluator
+from Evaluation.evaluator import Evaluator, bars_per_year
 from Evaluation.backtester import Backtester
-import json
+from Evaluation.parameter_sweep import ParameterSweep
+from Evaluation.report import ReportGenerator
+from Evaluation.robustness import BootstrapEvaluator
+from Evaluation.sweep_scheduler import SweepScheduler, load_pair, sweep_jobs
+from Evaluation.walk_forward import WalkForward
+from Utils.pipeline_context import PipelineContext
+from Utils.profiler import StageProfiler
+from Utils.stage_cache import StageCache
 
 
 class PairsTradingStrategy:
@@ -17,96 +27,145 @@ class PairsTradingStrategy:
     Orchestrates the pairs trading strategy workflow.
     """
 
-    def __init__(self, symbols, start_date, end_date, data_dir='data'):
+    def __init__(self, symbols, start_date, end_date, data_dir='data', storage='columnar', bar_size='1 day',
+                 max_in_flight=8, hedge_mode='static', hedge_window=60, plot_mode='show', report_dir='reports',
+                 background_plots=False, pipeline_mode='frame', frequency=None, max_fill=None,
+                 profiler=None, window=20, entry_threshold=2.5, exit_threshold=0.5, transaction_cost=0.002,
+                 cache_dir=None, cache_max_bytes=2 ** 30, precision='float64', max_position=1.0):
         self.symbols = symbols
         self.start_date = start_date
         self.end_date = end_date
         self.data_fetchers = {}
         self.data = {}
+        self.preprocessor = None
+        self.merged_data = None
         self.training_data = None
         self.test_data = None
         self.hedge_ratio = None
+        self.hedge_mode = hedge_mode
+        self.hedge_window = hedge_window
+        self.window = window
+        self.entry_threshold = entry_threshold
+        self.exit_threshold = exit_threshold
+        self.max_position = max_position
+        self.transaction_cost = transaction_cost
         self.training_results = None
         self.test_results = None
         self.data_dir = data_dir
+        self.bar_size = bar_size
+        # Intraday runs can resample the stored bars on the fly (e.g. '1 min' bars to '5min', '15min', '1h')
+        self.frequency = frequency
+        self.periods_per_year = bars_per_year(frequency or bar_size)
+        # Bars a missing leg may be forward-filled within its session; daily bars keep the inner join
+        self.max_fill = max_fill if max_fill is not None else (0 if bar_size == '1 day' else 5)
+        self.max_in_flight = max_in_flight
+        # 'show' opens interactive windows, 'file' renders headless charts to report_dir, 'none' skips plotting
+        if plot_mode not in ('show', 'file', 'none'):
+            raise ValueError(f"Unknown plot mode: {plot_mode}")
+        self.plot_mode = plot_mode
+        self.report = ReportGenerator(report_dir, background=background_plots) if plot_mode == 'file' else None
+        # 'frame' passes copied DataFrames between stages, 'columnar' one shared PipelineContext per split
+        if pipeline_mode not in ('frame', 'columnar'):
+            raise ValueError(f"Unknown pipeline mode: {pipeline_mode}")
+        self.pipeline_mode = pipeline_mode
+        # 'float32' holds merged prices and derived columns in single precision, halving their memory;
+        # rolling statistics and cumulative returns are still accumulated in float64. The price store
+        # always keeps full precision, so a float32 run never rounds the history later runs read.
+        if precision not in ('float64', 'float32'):
+            raise ValueError(f"Unknown precision: {precision}")
+        self.precision = precision
+        # Per-stage timing and memory; a disabled profiler costs nothing
+        self.profiler = profiler if profiler is not None else StageProfiler(enabled=False)
+        # Memoized stage outputs, keyed by input hashes and parameters (see cached())
+        self.cache = StageCache(cache_dir, cache_max_bytes) if cache_dir is not None else None
+        self.stage_keys = {}
 
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
 
+        self.json_file = os.path.join(self.data_dir, "all_symbols_data.json")
+        if storage == 'columnar':
+            self.store = ColumnarPriceStore(os.path.join(self.data_dir, 'columnar'))
+        elif storage == 'json':
+            self.store = JsonPriceStore(self.json_file)
+        else:
+            raise ValueError(f"Unknown storage backend: {storage}")
+        self.coverage = CoverageIndex(os.path.join(self.data_dir, f"coverage_{storage}.json"))
+
     def run(self):
         """
         Executes the strategy workflow.
-        """
-        self.fetch_data()
-        self.preprocess_data()
-        self.calculate_hedge_ratio()
-        self.calculate_spread_and_zscore()
-        self.generate_signals()
-        self.backtest_strategy()
-        self.evaluate_strategy()
 
-    def fetch_data(self):
-        """
-        Fetches data for all symbols.
+        Each stage is recorded by self.profiler. Stages that run separately on the training and test
+        splits record each split as a sub-stage and report the rows of both.
         """
-        data_file = os.path.join(self.data_dir, "all_symbols_data.json")
+        stages = [
+            ('fetch_data', self.fetch_data, lambda: sum(len(df) for df in self.data.values())),
+            ('preprocess_data', self.preprocess_data, lambda: len(self.merged_data)),
+            ('calculate_hedge_ratio', self.calculate_hedge_ratio, lambda: len(self.training_data)),
+            ('calculate_spread_and_zscore', self.calculate_spread_and_zscore, None),
+            ('generate_signals', self.generate_signals, None),
+            ('backtest_strategy', self.backtest_strategy, None),
+            ('evaluate_strategy', self.evaluate_strategy, lambda: len(self.test_results)),
+        ]
+        for name, stage, rows in stages:
+            with self.profiler.stage(name) as record:
+                stage()
+                if rows is not None:
+                    record['rows'] = rows()
+        if self.profiler.enabled:
+            print(self.profiler.summary())
 
-        if os.path.exists(data_file):
-            print("Loading data from JSON file.")
-            self.load_all_data_from_json(data_file)
-        else:
-            print("No local data found. Fetching from API...")
-            for symbol in self.symbols:
-                fetcher = DataFetcher(symbol, self.start_date, self.end_date)
-                self.data_fetchers[symbol] = fetcher
-                self.data[symbol] = fetcher.fetch_data()
-
-            self.save_all_data_to_json(data_file)
-
-    def save_all_data_to_json(self, file_path):
+    def fetch_data(self):
         """
-        Saves all fetched data to a single JSON file.
+        Fetches data for all symbols, requesting only the date ranges missing from the local store.
         """
-        all_data = {}
-        for symbol, df in self.data.items():
-            data_to_save = df.reset_index()
-            data_to_save['date'] = data_to_save['date'].astype(str)
-            data_records = data_to_save.to_dict(orient='records')
-            all_data[symbol] = data_records
+        # The legacy JSON cache only ever held daily bars
+        missing_symbols = [symbol for symbol in self.symbols if not self.store.exists(symbol, self.bar_size)]
+        if missing_symbols and not isinstance(self.store, JsonPriceStore) and self.bar_size == '1 day' \
+                and os.path.exists(self.json_file):
+            print("Migrating legacy JSON cache to the columnar store.")
+            migrate_json_to_store(self.json_file, self.store, self.bar_size)
 
-        with open(file_path, 'w') as f:
-            json.dump(all_data, f)
-        print(f"All symbols data saved to {file_path}")
-
-    def load_all_data_from_json(self, file_path):
-        """
-        Loads all data from a JSON file.
-        """
-        with open(file_path, 'r') as f:
-            all_data = json.load(f)
+        if self.max_in_flight > 1:
+            # All symbols share one connection with several chunk requests in flight
+            fetcher = AsyncDataFetcher(max_in_flight=self.max_in_flight)
+            self.data.update(fetcher.fetch_incremental_many(
+                self.symbols, self.start_date, self.end_date, self.store, self.coverage, self.bar_size
+            ))
+            return
 
         for symbol in self.symbols:
-            data_records = all_data.get(symbol, [])
-            if not data_records:
-                print(f"No data found for symbol {symbol} in JSON file.")
-                continue
-            df = pd.DataFrame.from_records(data_records)
-            df['date'] = pd.to_datetime(df['date'])
-            df.set_index('date', inplace=True)
-            self.data[symbol] = df
-
+            fetcher = DataFetcher(symbol, self.start_date, self.end_date)
+            self.data_fetchers[symbol] = fetcher
+            data = fetcher.fetch_incremental(self.store, self.coverage, self.bar_size)
+            if data is not None:
+                self.data[symbol] = data
 
     def preprocess_data(self):
         """
-        Merges and splits the data.
+        Merges, optionally resamples, and splits the data.
         """
-        preprocessor = DataPreprocessor(self.data)
-        merged_data = preprocessor.merge_data()
-        self.training_data, self.test_data = preprocessor.split_data()
+        self.preprocessor = DataPreprocessor(self.data, dtype=self.precision)
+
+        def merge():
+            merged_data = self.preprocessor.merge_data(max_fill=self.max_fill)
+            if self.frequency is not None:
+                merged_data = self.preprocessor.resample(self.frequency)
+                print(f"Resampled {self.bar_size} bars to {self.frequency}: {len(merged_data)} bars.")
+            return merged_data
+
+        self.merged_data = self.cached('merge_data', merge, self.data, max_fill=self.max_fill,
+                                       frequency=self.frequency, precision=self.precision)
+        self.preprocessor.merged_data = self.merged_data
+        self.training_data, self.test_data = self.preprocessor.split_data()
 
     def calculate_hedge_ratio(self):
         """
         Calculates the hedge ratio using training data.
+
+        In 'rolling' and 'kalman' mode a per-bar hedge ratio is estimated over the full merged history
+        instead; every estimate only uses bars up to its own, so the test split stays out-of-sample.
         """
         calculator = HedgeRatioCalculator(
             training_data=self.training_data,
@@ -114,78 +173,279 @@ class PairsTradingStrategy:
             independent_var=f'Price_{self.symbols[1]}',
             downsample_interval=1
         )
-        self.hedge_ratio = calculator.calculate_hedge_ratio()
-        print(f"Hedge Ratio: {self.hedge_ratio}")
+        if self.hedge_mode == 'static':
+            compute = calculator.calculate_hedge_ratio
+        elif self.hedge_mode == 'rolling':
+            compute = lambda: calculator.calculate_rolling_hedge_ratio(self.merged_data, window=self.hedge_window)
+        elif self.hedge_mode == 'kalman':
+            compute = lambda: calculator.calculate_kalman_hedge_ratio(self.merged_data)
+        else:
+            raise ValueError(f"Unknown hedge mode: {self.hedge_mode}")
+
+        self.hedge_ratio = self.cached('hedge_ratio', compute, self.stage_keys.get('merge_data'),
+                                       hedge_mode=self.hedge_mode, hedge_window=self.hedge_window)
+        if self.hedge_mode == 'static':
+            print(f"Hedge Ratio: {self.hedge_ratio}")
+        elif self.hedge_mode == 'rolling':
+            print(f"Rolling Hedge Ratio ({self.hedge_window} bars), latest: {self.hedge_ratio.iloc[-1]}")
+        else:
+            print(f"Kalman Hedge Ratio, latest: {self.hedge_ratio.iloc[-1]}")
+
+    def cached(self, stage, compute, *inputs, **params):
+        """
+        Runs compute() through the stage cache when one is configured.
+
+        inputs are hashed by content; pass self.stage_keys[...] for outputs of earlier stages. Every
+        key also includes the dependent and independent symbols, so a pair run with its legs swapped
+        never reuses the other regression's outputs. In 'columnar' pipeline mode, frames served from
+        the cache are wrapped in a PipelineContext like freshly computed split outputs.
+        """
+        if self.cache is None:
+            return compute()
+        value, self.stage_keys[stage] = self.cache.memoize(stage, compute, *inputs, dependent=self.symbols[0],
+                                                           independent=self.symbols[1], **params)
+        if self.pipeline_mode == 'columnar' and stage.endswith(('_train', '_test')) \
+                and isinstance(value, pd.DataFrame):
+            value = PipelineContext.from_frame(value)
+        return value
+
+    def stage_input(self, data):
+        """
+        Wraps a price split for the spread stage.
+
+        In 'columnar' pipeline mode the later stages share one PipelineContext holding views on the
+        two price columns and write only the columns they own; in 'frame' mode each stage copies.
+        """
+        if self.pipeline_mode == 'columnar':
+            return PipelineContext.from_frame(data, [f'Price_{self.symbols[0]}', f'Price_{self.symbols[1]}'])
+        return data
+
+    @staticmethod
+    def cumulative_returns(results):
+        """
+        The cumulative return series of a results frame or context, for plotting.
+        """
+        if isinstance(results, PipelineContext):
+            return results.series('Cumulative_Return')
+        return results['Cumulative_Return']
 
     def calculate_spread_and_zscore(self):
         """
         Calculates spread and z-score for both training and test data.
+
+        The calculator is built and the spread computed inside the cached stage, so a cache hit does
+        no work on the price split.
         """
+        def compute(data):
+            spread_calculator = SpreadCalculator(
+                data=self.stage_input(data),
+                hedge_ratio=self.hedge_ratio,
+                dependent_var=f'Price_{self.symbols[0]}',
+                independent_var=f'Price_{self.symbols[1]}',
+                window=self.window
+            )
+            spread_calculator.compute_spread()
+            return spread_calculator.compute_zscore()
+
         # Training data
-        spread_calculator_train = SpreadCalculator(
-            data=self.training_data,
-            hedge_ratio=self.hedge_ratio,
-            dependent_var=f'Price_{self.symbols[0]}',
-            independent_var=f'Price_{self.symbols[1]}',
-            window=20
-        )
-        spread_calculator_train.compute_spread()
-        self.training_data = spread_calculator_train.compute_zscore()
+        with self.profiler.stage('train', rows=len(self.training_data)):
+            training_data = self.training_data
+            self.training_data = self.cached('zscore_train', lambda: compute(training_data),
+                                             self.stage_keys.get('merge_data'), self.stage_keys.get('hedge_ratio'),
+                                             window=self.window)
 
         # Test data
-        spread_calculator_test = SpreadCalculator(
-            data=self.test_data,
-            hedge_ratio=self.hedge_ratio,
-            dependent_var=f'Price_{self.symbols[0]}',
-            independent_var=f'Price_{self.symbols[1]}',
-            window=20
-        )
-        spread_calculator_test.compute_spread()
-        self.test_data = spread_calculator_test.compute_zscore()
+        with self.profiler.stage('test', rows=len(self.test_data)):
+            test_data = self.test_data
+            self.test_data = self.cached('zscore_test', lambda: compute(test_data),
+                                         self.stage_keys.get('merge_data'), self.stage_keys.get('hedge_ratio'),
+                                         window=self.window)
 
     def generate_signals(self):
         """
         Generates trading signals for both training and test data.
         """
+        def compute(data):
+            signal_generator = SignalGenerator(data, self.entry_threshold, self.exit_threshold, self.max_position)
+            return signal_generator.generate_signals()
+
         # Training data
-        signal_generator_train = SignalGenerator(self.training_data)
-        self.training_data = signal_generator_train.generate_signals()
+        with self.profiler.stage('train', rows=len(self.training_data)):
+            training_data = self.training_data
+            self.training_data = self.cached('signals_train', lambda: compute(training_data),
+                                             self.stage_keys.get('zscore_train'), entry_threshold=self.entry_threshold,
+                                             exit_threshold=self.exit_threshold, max_position=self.max_position)
 
         # Test data
-        signal_generator_test = SignalGenerator(self.test_data)
-        self.test_data = signal_generator_test.generate_signals()
+        with self.profiler.stage('test', rows=len(self.test_data)):
+            test_data = self.test_data
+            self.test_data = self.cached('signals_test', lambda: compute(test_data),
+                                         self.stage_keys.get('zscore_test'), entry_threshold=self.entry_threshold,
+                                         exit_threshold=self.exit_threshold, max_position=self.max_position)
+
+    def backtester(self, data):
+        return Backtester(
+            data=data,
+            dependent_var=f'Price_{self.symbols[0]}',
+            independent_var=f'Price_{self.symbols[1]}',
+            hedge_ratio=self.hedge_ratio,
+            transaction_cost=self.transaction_cost
+        )
 
     def backtest_strategy(self):
         """
         Backtests the strategy on both training and test data.
+
+        The Backtester (which copies frame inputs) is only built on a cache miss, and again for
+        interactive plots.
         """
         # Training data
-        backtester_train = Backtester(
-            data=self.training_data,
-            dependent_var=f'Price_{self.symbols[0]}',
-            independent_var=f'Price_{self.symbols[1]}',
-            hedge_ratio=self.hedge_ratio
-        )
-        self.training_results = backtester_train.backtest()
-        backtester_train.plot_performance(title='Training Data Performance')
+        with self.profiler.stage('train', rows=len(self.training_data)):
+            training_data = self.training_data
+            self.training_results = self.cached('backtest_train', lambda: self.backtester(training_data).backtest(),
+                                                self.stage_keys.get('signals_train'),
+                                                self.stage_keys.get('hedge_ratio'),
+                                                transaction_cost=self.transaction_cost)
+        if self.plot_mode == 'show':
+            self.backtester(self.training_results).plot_performance(title='Training Data Performance')
+        elif self.plot_mode == 'file':
+            self.report.plot_series(self.cumulative_returns(self.training_results), 'Training Data Performance',
+                                    'training_performance.png', label='Strategy Return')
 
         # Test data
-        backtester_test = Backtester(
-            data=self.test_data,
-            dependent_var=f'Price_{self.symbols[0]}',
-            independent_var=f'Price_{self.symbols[1]}',
-            hedge_ratio=self.hedge_ratio
-        )
-        self.test_results = backtester_test.backtest()
-        backtester_test.plot_performance(title='Test Data Performance')
+        with self.profiler.stage('test', rows=len(self.test_data)):
+            test_data = self.test_data
+            self.test_results = self.cached('backtest_test', lambda: self.backtester(test_data).backtest(),
+                                            self.stage_keys.get('signals_test'), self.stage_keys.get('hedge_ratio'),
+                                            transaction_cost=self.transaction_cost)
+        if self.plot_mode == 'show':
+            self.backtester(self.test_results).plot_performance(title='Test Data Performance')
+        elif self.plot_mode == 'file':
+            self.report.plot_series(self.cumulative_returns(self.test_results), 'Test Data Performance',
+                                    'test_performance.png', label='Strategy Return')
 
     def evaluate_strategy(self):
         """
         Evaluates the strategy performance on test data.
         """
-        evaluator = Evaluator(self.test_results)
+        evaluator = Evaluator(self.test_results, self.periods_per_year)
         sharpe_ratio = evaluator.compute_sharpe_ratio()
         max_drawdown = evaluator.compute_max_drawdown()
         print(f"Sharpe Ratio: {sharpe_ratio:.4f}")
         print(f"Maximum Drawdown: {max_drawdown:.4f}")
-        evaluator.plot_cumulative_returns(title='Cumulative Returns on Test Data')
+        if self.plot_mode == 'show':
+            evaluator.plot_cumulative_returns(title='Cumulative Returns on Test Data')
+        elif self.plot_mode == 'file':
+            self.report.plot_series(self.cumulative_returns(self.test_results), 'Cumulative Returns on Test Data',
+                                    'test_cumulative_returns.png')
+            for path in self.report.close():
+                print(f"Chart written to {path}")
+
+    def bootstrap_robustness(self, n_resamples=10_000, mean_block=None, level=0.95, seed=None):
+        """
+        Confidence intervals of the test Sharpe ratio, maximum drawdown and CAGR from stationary
+        block-bootstrap resamples of the test strategy returns.
+
+        Requires backtest_strategy to have run.
+
+        Returns:
+            pd.DataFrame: Observed value, median and confidence bounds per metric.
+        """
+        bootstrap = BootstrapEvaluator(self.test_results, self.periods_per_year, n_resamples=n_resamples,
+                                       mean_block=mean_block, seed=seed)
+        intervals = bootstrap.confidence_intervals(level)
+        print(f"Bootstrap {level:.0%} confidence intervals over {n_resamples:,} resamples:")
+        print(intervals.to_string(float_format=lambda value: f"{value:.4f}"))
+        return intervals
+
+    def sweep_parameters(self, windows, entry_thresholds, exit_thresholds, on='test'):
+        """
+        Evaluates a grid of z-score windows and entry/exit thresholds on the training or test split.
+
+        Requires fetch_data, preprocess_data and calculate_hedge_ratio to have run; the merged prices
+        and hedge ratio are reused for every combination.
+
+        Returns:
+            pd.DataFrame: Sharpe ratio, max drawdown, total return and trade count per combination.
+        """
+        training_prices, test_prices = self.preprocessor.split_data()
+        sweep = ParameterSweep(
+            data=test_prices if on == 'test' else training_prices,
+            dependent_var=f'Price_{self.symbols[0]}',
+            independent_var=f'Price_{self.symbols[1]}',
+            hedge_ratio=self.hedge_ratio,
+            transaction_cost=self.transaction_cost,
+            periods_per_year=self.periods_per_year,
+            max_position=self.max_position
+        )
+        return sweep.run(windows, entry_thresholds, exit_thresholds)
+
+    def schedule_sweep(self, pairs, param_grid, db_path, walk_forward=None, max_workers=None, retry_failed=False,
+                       data_version=None):
+        """
+        Runs a pairs x parameter grid (x walk-forward folds) sweep as resumable jobs in an SQLite job
+        table (see SweepScheduler); jobs completed by an earlier, interrupted run are skipped.
+
+        Pairs are read from the columnar store with this strategy's bar size, fill and frequency, so
+        their bars must have been fetched before.
+
+        :param param_grid: dict of run_pair_pipeline parameter (window, entry_threshold, hedge_mode, ...)
+                           to the list of values to sweep.
+        :param walk_forward: Optional (train_size, test_size, expanding) to run every walk-forward fold
+                             of each pair instead of the single train/test split.
+        :param data_version: Optional label that reruns every job when changed (see sweep_jobs); jobs
+                             already rerun once bars are added to the store.
+        Returns:
+            pd.DataFrame: Metrics of every completed job.
+        """
+        if not isinstance(self.store, ColumnarPriceStore):
+            raise ValueError("Scheduled sweeps read the columnar store.")
+        folds = None
+        if walk_forward is not None:
+            folds = {}
+            for dependent, independent in pairs:
+                preprocessor = DataPreprocessor({})
+                preprocessor.merged_data = load_pair(self.store.root_dir, self.bar_size, dependent, independent,
+                                                     self.max_fill, self.frequency)
+                folds[(dependent, independent)] = preprocessor.walk_forward_folds(*walk_forward)
+        jobs = sweep_jobs(pairs, param_grid, self.store.root_dir, self.bar_size, folds=folds, max_fill=self.max_fill,
+                          frequency=self.frequency, periods_per_year=self.periods_per_year,
+                          data_version=data_version)
+
+        scheduler = SweepScheduler(db_path, max_workers=max_workers)
+        try:
+            scheduler.add_jobs(jobs)
+            scheduler.run(retry_failed=retry_failed)
+            return scheduler.results()
+        finally:
+            scheduler.close()
+
+    def walk_forward(self, train_size, test_size, expanding=False, max_workers=1):
+        """
+        Runs a walk-forward evaluation over the merged data instead of the single train/test split.
+
+        Requires fetch_data and preprocess_data to have run.
+
+        Returns:
+            WalkForward: The walk-forward run, whose fold cache can be reused for further runs.
+        """
+        walk_forward = WalkForward(
+            data=self.merged_data,
+            dependent_var=f'Price_{self.symbols[0]}',
+            independent_var=f'Price_{self.symbols[1]}',
+            train_size=train_size,
+            test_size=test_size,
+            expanding=expanding,
+            window=self.window,
+            entry_threshold=self.entry_threshold,
+            exit_threshold=self.exit_threshold,
+            max_position=self.max_position,
+            transaction_cost=self.transaction_cost,
+            periods_per_year=self.periods_per_year,
+            max_workers=max_workers
+        )
+        walk_forward.run()
+        sharpe_ratio, max_drawdown = walk_forward.evaluate()
+        print(f"Walk-forward Sharpe Ratio: {sharpe_ratio:.4f}")
+        print(f"Walk-forward Maximum Drawdown: {max_drawdown:.4f}")
+        return walk_forward